@@ -0,0 +1,55 @@
+"""
+compare func.group against its bounds prefiltered variant and group_geometries.
+
+    python -m benchmarks.bench_group --sizes 10 100 1000 5000
+"""
+import argparse
+import time
+from typing import Callable, List
+
+import numpy as np
+from shapely.geometry import box
+
+from shapely_ext.func import group, group_geometries
+
+
+def random_boxes(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    side = np.sqrt(n) * 10  # keeps density constant, about one neighbour per box
+    origins = rng.uniform(0, side, (n, 2))
+    sizes = rng.uniform(1, 5, (n, 2))
+    return [box(x, y, x + w, y + h) for (x, y), (w, h) in zip(origins, sizes)]
+
+
+def timeit(func: Callable[[], List], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 30, 100, 300, 1000, 3000])
+    parser.add_argument("--distance", type=float, default=1.0)
+    parser.add_argument("--max-quadratic-size", type=int, default=3000,
+                        help="skip the plain O(n^2) group above this size")
+    args = parser.parse_args()
+    distance = args.distance
+
+    print(f"{'n':>8} {'group':>10} {'group+bounds':>13} {'group_geometries':>17}")
+    for n in args.sizes:
+        geoms = random_boxes(n)
+        grouping_func = lambda g1, g2: g1.distance(g2) <= distance
+        plain = (timeit(lambda: group(geoms, grouping_func))
+                 if n <= args.max_quadratic_size else float("nan"))
+        expanded_bounds = lambda g: tuple(np.add(g.bounds, (-distance, -distance, distance, distance)))
+        prefiltered = timeit(lambda: group(geoms, grouping_func, bounds_func=expanded_bounds))
+        indexed = timeit(lambda: group_geometries(geoms, distance))
+        print(f"{n:>8} {plain:>10.4f} {prefiltered:>13.4f} {indexed:>17.4f}")
+
+
+if __name__ == "__main__":
+    main()
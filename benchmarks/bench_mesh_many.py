@@ -0,0 +1,45 @@
+"""
+scaling of TriMesher.mesh_many across worker processes.
+
+    python -m benchmarks.bench_mesh_many --polygons 2000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from shapely.geometry import Point
+
+from shapely_ext.mesh import TriMesher
+
+
+def random_polygons(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, 1000, (n, 2))
+    radii = rng.uniform(5, 20, n)
+    return [Point(x, y).buffer(r, resolution=8) for (x, y), r in zip(centers, radii)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--polygons", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--chunksize", type=int, default=32)
+    parser.add_argument("--interpolate-distance", type=float, default=1.0)
+    args = parser.parse_args()
+
+    polygons = random_polygons(args.polygons)
+    mesher = TriMesher(interpolate_distance=args.interpolate_distance, constrained=True, steiner_points=True)
+
+    print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'triangles':>10}")
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        tri_meshes = mesher.mesh_many(polygons, workers=workers, chunksize=args.chunksize)
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        print(f"{workers:>8} {seconds:>9.3f} {baseline / seconds:>8.2f} {sum(map(len, tri_meshes)):>10}")
+
+
+if __name__ == "__main__":
+    main()
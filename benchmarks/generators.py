@@ -0,0 +1,82 @@
+"""
+synthetic geometries of about n vertices for the benchmark suite, all deterministic for a seed
+"""
+import math
+
+import numpy as np
+from shapely.geometry import Polygon, LineString, MultiPolygon, box
+
+
+def star_polygon(n: int, seed: int = 0) -> Polygon:
+    """
+    random radii at evenly spaced angles, a star shaped polygon is always simple
+    """
+    rng = np.random.default_rng(seed)
+    n = max(n, 3)
+    angles = np.linspace(0, 2 * math.pi, n, endpoint=False)
+    radii = rng.uniform(50, 100, n)
+    return Polygon(np.stack([radii * np.cos(angles), radii * np.sin(angles)], axis=1))
+
+
+def dense_ring(n: int, seed: int = 0) -> Polygon:
+    """
+    a square of side 100 with n vertices along its sides, jittered by 1% of their spacing so that
+    simplify keeps them and the only corners above a few degrees are the four of the square
+    """
+    rng = np.random.default_rng(seed)
+    side_count = max(n // 4, 1)
+    along = np.arange(side_count) * (100 / side_count)
+    across = rng.uniform(-0.005, 0.005, (4, side_count)) * (100 / side_count)
+    across[:, 0] = 0
+    sides = [np.stack([along, across[0]], axis=1), np.stack([100 + across[1], along], axis=1),
+             np.stack([100 - along, 100 + across[2]], axis=1), np.stack([across[3], 100 - along], axis=1)]
+    return Polygon(np.concatenate(sides))
+
+
+def holed_multipolygon(n: int, seed: int = 0, vertices_per_part: int = 1000) -> MultiPolygon:
+    """
+    boxes side by side, each with a grid of square holes, about n vertices in total
+    """
+    rng = np.random.default_rng(seed)
+    part_count = max(1, n // vertices_per_part)
+    hole_count = max(1, (n // part_count - 5) // 5)
+    side = math.ceil(math.sqrt(hole_count))
+    parts = []
+    for part_i in range(part_count):
+        origin_x = part_i * (side + 2) * 10
+        holes = []
+        for hole_i in range(hole_count):
+            x = origin_x + 10 * (hole_i % side + 1) + rng.uniform(0, 2)
+            y = 10 * (hole_i // side + 1) + rng.uniform(0, 2)
+            holes.append(list(box(x, y, x + 5, y + 5).exterior.coords))
+        shell = box(origin_x, 0, origin_x + (side + 1) * 10 + 5, (side + 1) * 10 + 5).exterior.coords
+        parts.append(Polygon(shell, holes))
+    return MultiPolygon(parts)
+
+
+def long_linestring(n: int, seed: int = 0) -> LineString:
+    """
+    random walk with one vertex per unit of x
+    """
+    rng = np.random.default_rng(seed)
+    n = max(n, 2)
+    return LineString(np.stack([np.arange(n, dtype=np.float64), np.cumsum(rng.normal(0, 1, n))], axis=1))
+
+
+def boxes(n: int, seed: int = 0):
+    """
+    n // 5 random boxes, about one neighbour per box
+    """
+    rng = np.random.default_rng(seed)
+    count = max(1, n // 5)
+    side = math.sqrt(count) * 10
+    origins = rng.uniform(0, side, (count, 2))
+    sizes = rng.uniform(1, 5, (count, 2))
+    return [box(x, y, x + w, y + h) for (x, y), (w, h) in zip(origins, sizes)]
+
+
+def star_polygons(n: int, seed: int = 0, vertices_per_polygon: int = 20):
+    """
+    star polygons of vertices_per_polygon vertices, about n vertices in total
+    """
+    return [star_polygon(vertices_per_polygon, seed + i) for i in range(max(1, n // vertices_per_polygon))]
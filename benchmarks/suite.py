@@ -0,0 +1,195 @@
+"""
+time and peak memory of the main operations on synthetic inputs of growing size, and regressions between two runs.
+
+    python -m benchmarks.suite run --output before.json
+    python -m benchmarks.suite run --output after.json --sizes 10 1000 100000 --operations interpolate mesh
+    python -m benchmarks.suite compare before.json after.json --threshold 0.2
+
+peak memory is measured with tracemalloc in a separate run, so it counts python and numpy allocations
+but not the memory GEOS allocates
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+
+from benchmarks.generators import star_polygon, dense_ring, holed_multipolygon, long_linestring, boxes, \
+    star_polygons
+from shapely_ext.angle import AngleMeasurer
+from shapely_ext.decompose import Decomposer
+from shapely_ext.func import group, group_geometries
+from shapely_ext.geometry.vector_2d import Vector2D
+from shapely_ext.interpolate import interpolate
+from shapely_ext.mesh import TriMesher
+from shapely_ext.project import Projector
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+
+
+class Case:
+    def __init__(self, setup: Callable[[int], Any], run: Callable[[Any], Any], max_vertices: Optional[int] = None):
+        """
+        setup builds the input of about n vertices outside of the measurement, run is measured.
+        sizes above max_vertices are skipped for cases that are not linear
+        """
+        self.setup = setup
+        self.run = run
+        self.max_vertices = max_vertices
+
+
+def _gap_of(polygon: Polygon) -> float:
+    """
+    a gap about doubling the vertices of polygon
+    """
+    return polygon.exterior.length / len(polygon.exterior.coords) / 2
+
+
+def _projector_inputs(n: int, engine: str):
+    return Projector(long_linestring(n, seed=1), Vector2D(0, -1), engine=engine), long_linestring(n, seed=2)
+
+
+CASES: Dict[str, Case] = {
+    "interpolate": Case(lambda n: star_polygon(n), lambda polygon: interpolate(polygon, _gap_of(polygon))),
+    "interpolate_holes": Case(lambda n: holed_multipolygon(n), lambda polygons: interpolate(polygons, 1)),
+    "decompose": Case(lambda n: dense_ring(n), lambda polygon: Decomposer(5).decompose(polygon)),
+    "decompose_numpy": Case(lambda n: dense_ring(n),
+                            lambda polygon: Decomposer(5, engine="numpy").decompose(polygon)),
+    "decompose_holes": Case(lambda n: holed_multipolygon(n),
+                            lambda polygons: Decomposer(5, engine="numpy").decompose(polygons)),
+    "project_onto": Case(lambda n: _projector_inputs(n, "python"), lambda inputs: inputs[0].project_onto(inputs[1]),
+                         max_vertices=1000),
+    "project_onto_numpy": Case(lambda n: _projector_inputs(n, "numpy"),
+                               lambda inputs: inputs[0].project_onto(inputs[1])),
+    "mesh": Case(lambda n: star_polygon(n), lambda polygon: TriMesher(_gap_of(polygon)).mesh_arrays(polygon)),
+    "mesh_constrained": Case(lambda n: holed_multipolygon(n, vertices_per_part=n).geoms[0],
+                             lambda polygon: TriMesher(5, constrained=True).mesh_arrays(polygon),
+                             max_vertices=10000),
+    "angle": Case(lambda n: star_polygons(n), lambda polygons: [
+        AngleMeasurer().get_polygon_angle_by_bounding_box(polygon) for polygon in polygons]),
+    "angle_batch": Case(lambda n: star_polygons(n),
+                        lambda polygons: AngleMeasurer().get_polygon_angles_by_bounding_box(polygons)),
+    "group": Case(lambda n: boxes(n), lambda geoms: group(geoms, lambda g1, g2: g1.distance(g2) <= 1),
+                  max_vertices=10000),
+    "group_geometries": Case(lambda n: boxes(n), lambda geoms: group_geometries(geoms, 1)),
+}
+
+
+def measure(case: Case, n: int, repeat: int) -> Dict[str, float]:
+    """
+    best wall time of repeat runs and the tracemalloc peak of one more run
+    """
+    inputs = case.setup(n)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run(inputs)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        case.run(inputs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def run(sizes: List[int], operations: List[str], repeat: int, time_budget: float) -> Dict[str, Any]:
+    """
+    sizes of an operation stop growing once one of them takes longer than time_budget seconds or runs out of memory
+    """
+    results = []
+    for operation in operations:
+        case = CASES[operation]
+        for n in sorted(sizes):
+            if case.max_vertices is not None and n > case.max_vertices:
+                break
+            try:
+                result = measure(case, n, repeat)
+            except MemoryError:
+                print(f"{operation:>20} {n:>9} out of memory", file=sys.stderr)
+                break
+            results.append({"operation": operation, "vertices": n, **result})
+            print(f"{operation:>20} {n:>9} {result['seconds']:>10.4f}s {result['peak_bytes'] / 2 ** 20:>9.2f}MB",
+                  file=sys.stderr)
+            if result["seconds"] > time_budget:
+                break
+    return {
+        "meta": {"python": platform.python_version(), "shapely": shapely.__version__, "numpy": np.__version__,
+                 "platform": platform.platform()},
+        "results": results,
+    }
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float, min_seconds: float) -> List[str]:
+    """
+    return a line for every operation and size measured in both runs, regressions are marked.
+    timings under min_seconds in both runs are too noisy to be flagged
+    """
+    base_results = {(result["operation"], result["vertices"]): result for result in base["results"]}
+    lines = []
+    regressions = 0
+    for result in new["results"]:
+        base_result = base_results.get((result["operation"], result["vertices"]))
+        if base_result is None:
+            continue
+        time_ratio = result["seconds"] / max(base_result["seconds"], 1e-12)
+        memory_ratio = result["peak_bytes"] / max(base_result["peak_bytes"], 1)
+        is_slower = time_ratio > 1 + threshold and max(result["seconds"], base_result["seconds"]) >= min_seconds
+        is_larger = memory_ratio > 1 + threshold and result["peak_bytes"] - base_result["peak_bytes"] > 2 ** 20
+        regressions += is_slower or is_larger
+        mark = "REGRESSION" if is_slower or is_larger else ""
+        lines.append(f"{result['operation']:>20} {result['vertices']:>9} "
+                     f"{base_result['seconds']:>10.4f}s {result['seconds']:>10.4f}s {time_ratio:>6.2f}x "
+                     f"{memory_ratio:>6.2f}x {mark}")
+    lines.append(f"{regressions} regression(s)")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--output", default="-", help="json file of the results, - for stdout")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--operations", nargs="+", choices=sorted(CASES), default=list(CASES))
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--time-budget", type=float, default=30,
+                            help="stop growing the size of an operation after a run slower than this")
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="flag ratios above 1 + threshold")
+    compare_parser.add_argument("--min-seconds", type=float, default=1e-3)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        result = run(args.sizes, args.operations, args.repeat, args.time_budget)
+        if args.output == "-":
+            json.dump(result, sys.stdout, indent=2)
+        else:
+            with open(args.output, "w") as f:
+                json.dump(result, f, indent=2)
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    lines = compare(base, new, args.threshold, args.min_seconds)
+    print("\n".join(lines))
+    return 0 if lines[-1].startswith("0 ") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
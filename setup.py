@@ -12,15 +12,18 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/pyeprog/shapely_ext",
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=["benchmarks", "benchmarks.*"]),
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
+    entry_points={
+        "console_scripts": ["shapely-ext=shapely_ext.cli:main"],
+    },
     install_requires=[
-        "Shapely>=1.7.0",
+        "Shapely>=1.7.0,<3",
         "scipy>=1.4.1",
         "numpy>=1.18.4"
     ]
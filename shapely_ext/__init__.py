@@ -0,0 +1,43 @@
+"""
+the public API is loaded lazily on first attribute access, so `import shapely_ext` costs nothing
+and no module pulls in what it does not use. the interpolate function stays in shapely_ext.interpolate,
+its name is taken by the submodule
+"""
+from importlib import import_module
+
+_LAZY_ATTRIBUTES = {
+    "AngleMeasurer": "shapely_ext.angle",
+    "GeometryBatch": "shapely_ext.batch",
+    "DecomposedLines": "shapely_ext.decompose",
+    "Decomposer": "shapely_ext.decompose",
+    "group": "shapely_ext.func",
+    "group_geometries": "shapely_ext.func",
+    "interpolate_many": "shapely_ext.interpolate",
+    "TriMesh": "shapely_ext.mesh",
+    "TriMesher": "shapely_ext.mesh",
+    "ProjectionTarget": "shapely_ext.project",
+    "Projector": "shapely_ext.project",
+    "snap_to": "shapely_ext.snap",
+    "GeometryChanges": "shapely_ext.util",
+    "contains_points": "shapely_ext.util",
+    "flatten": "shapely_ext.util",
+    "is_similar": "shapely_ext.util",
+    "iter_flatten": "shapely_ext.util",
+    "match_similar": "shapely_ext.util",
+    "Vector2D": "shapely_ext.geometry.vector_2d",
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -1,10 +1,19 @@
 import math
-from typing import Tuple, List
+from itertools import islice
+from typing import Tuple, List, Sequence, Union, Iterator
 
+import numpy as np
 from shapely.geometry import LineString, Polygon
 
+from shapely_ext import backend, simplify_cache
+from shapely_ext.batch import GeometryBatch, LINESTRING, POLYGON
+from shapely_ext.index import ragged_arange
+
 
 class AngleMeasurer:
+    BATCH_SIZE = 10000
+    MAX_CALIPER_PAIRS = 1 << 20
+
     def __init__(self, simplify_distance: float = 1e-6):
         self._simplify_distance = simplify_distance
 
@@ -16,27 +25,185 @@ class AngleMeasurer:
             raise ValueError("input line is not a valid lineString")
         coords = list(line.coords)
         endpoint1, endpoint2 = coords[0], coords[-1]
+        return self._to_line_angle(math.atan2(endpoint2[1] - endpoint1[1], endpoint2[0] - endpoint1[0]), in_degree)
 
-        angle_in_radian = (math.atan2(endpoint2[1] - endpoint1[1], endpoint2[0] - endpoint1[0])) % math.pi
-        if angle_in_radian > math.pi / 2:
-            angle_in_radian -= math.pi
-        if in_degree:
-            return math.degrees(angle_in_radian)
-        return angle_in_radian
+    def get_straight_line_angles(self, lines: Union[Sequence[LineString], GeometryBatch],
+                                 in_degree: bool = True) -> np.ndarray:
+        """
+        angles of many lines by their endpoints, return array of angles in range [-90, 90]
+        """
+        if len(lines) == 0:
+            return np.empty(0)
+        if isinstance(lines, GeometryBatch):
+            start_coords, end_coords = self._get_batch_endpoints(lines)
+        else:
+            start_coords, end_coords = backend.line_endpoints(lines)
+        # only a line ending where it starts can be an invalid one
+        for i in np.flatnonzero((start_coords == end_coords).all(axis=1)):
+            if not lines[i].is_valid:
+                raise ValueError("input line is not a valid lineString")
+        return self._to_line_angles(np.arctan2(end_coords[:, 1] - start_coords[:, 1],
+                                               end_coords[:, 0] - start_coords[:, 0]), in_degree)
+
+    @staticmethod
+    def _get_batch_endpoints(lines: GeometryBatch) -> Tuple[np.ndarray, np.ndarray]:
+        if np.any(lines.type_codes != LINESTRING) or np.any(np.diff(lines.geometry_offsets) != 1):
+            raise ValueError("input line is not a valid lineString")
+        rings = lines.part_offsets[lines.geometry_offsets[:-1]]
+        return lines.coords[lines.ring_offsets[rings]], lines.coords[lines.ring_offsets[rings + 1] - 1]
 
     def get_angle_by_coords(self, coord1: Tuple[float, float], coord2: Tuple[float, float],
                             in_degree: bool = True) -> float:
         if coord1 == coord2:
             raise ValueError("coord1 and coord2 should not be equal")
-        line = LineString([coord1, coord2])
-        return self.get_straight_line_angle(line, in_degree=in_degree)
+        return self._to_line_angle(math.atan2(coord2[1] - coord1[1], coord2[0] - coord1[0]), in_degree)
+
+    def get_angles_by_coords(self, coords1: np.ndarray, coords2: np.ndarray, in_degree: bool = True) -> np.ndarray:
+        """
+        angles of the lines from every coord of (N, 2) coords1 to the coord at the same index of coords2
+        """
+        coords1 = np.asarray(coords1, dtype=np.float64).reshape(-1, 2)
+        coords2 = np.asarray(coords2, dtype=np.float64).reshape(-1, 2)
+        if (coords1 == coords2).all(axis=1).any():
+            raise ValueError("coord1 and coord2 should not be equal")
+        return self._to_line_angles(np.arctan2(coords2[:, 1] - coords1[:, 1], coords2[:, 0] - coords1[:, 0]),
+                                    in_degree)
 
     def get_polygon_angle_by_bounding_box(self, polygon: Polygon, in_degree: bool = True) -> float:
         """
         计算polygon的最小外接矩形的长边的角度, return angle in range [-90, 90]
         """
-        rotated_box_coords = list(polygon.minimum_rotated_rectangle.simplify(self._simplify_distance).exterior.coords)
+        rotated_box = simplify_cache.simplify(polygon.minimum_rotated_rectangle, self._simplify_distance)
+        rotated_box_coords = list(rotated_box.exterior.coords)
         edges = [(rotated_box_coords[i], rotated_box_coords[i + 1]) for i in range(2)]
         longest_edge = max(edges,
                            key=lambda coords: (coords[0][0] - coords[1][0]) ** 2 + (coords[0][1] - coords[1][1]) ** 2)
         return self.get_angle_by_coords(*longest_edge, in_degree=in_degree)
+
+    def get_polygon_angles_by_bounding_box(self, polygons: Union[Sequence[Polygon], GeometryBatch],
+                                           in_degree: bool = True) -> np.ndarray:
+        """
+        batch get_polygon_angle_by_bounding_box, giving the same rectangles and the same long sides.
+        with shapely 2 the rectangles come from one vectorized oriented_envelope call per BATCH_SIZE polygons,
+        with shapely 1.x from calipers aligned to every convex hull edge like minimum_rotated_rectangle does.
+        polygons without area get nan. the polygons of a GeometryBatch are not built, their exteriors are used
+        """
+        batch_exteriors = self._iter_batch_exteriors(polygons) if isinstance(polygons, GeometryBatch) else None
+        angles: List[np.ndarray] = []
+        for batch_start in range(0, len(polygons), self.BATCH_SIZE):
+            if batch_exteriors is not None:
+                geoms = list(islice(batch_exteriors, self.BATCH_SIZE))
+            else:
+                geoms = polygons[batch_start:batch_start + self.BATCH_SIZE]
+            if backend.SHAPELY_2:
+                corners = backend.rectangle_corners(geoms, self._simplify_distance)
+            else:
+                corners = self._get_bounding_box_corners(backend.hull_rings(geoms))
+            angles.append(self._get_long_side_angles(corners))
+        if not angles:
+            return np.empty(0)
+        return self._to_line_angles(np.concatenate(angles), in_degree)
+
+    @staticmethod
+    def _iter_batch_exteriors(polygons: GeometryBatch) -> Iterator[LineString]:
+        if np.any(polygons.type_codes != POLYGON):
+            raise ValueError("input geometries should all be polygons")
+        for geometry_i in range(len(polygons)):
+            parts = polygons.geometry_offsets[geometry_i:geometry_i + 2]
+            if parts[0] == parts[1]:
+                yield LineString()
+                continue
+            yield LineString(polygons.ring_coords(polygons.part_offsets[parts[0]]))
+
+    @classmethod
+    def _get_bounding_box_corners(cls, hull_rings: List[np.ndarray]) -> np.ndarray:
+        """
+        (N, 3, 2) first three corners of the minimum rotated rectangle of every hull, nan for hulls without area.
+        every hull edge direction is tried as a side by projecting all vertices of its hull with the arithmetic of
+        minimum_rotated_rectangle, and the first edge giving the smallest area wins as it does there.
+        (edge, vertex) pairs are projected MAX_CALIPER_PAIRS at a time, a hull of h vertices has h * h of them
+        """
+        result = np.full((len(hull_rings), 3, 2), np.nan)
+        vertex_counts = np.array([len(ring) for ring in hull_rings], dtype=np.int64)
+        has_area = vertex_counts >= 3
+        if not has_area.any():
+            return result
+        vertex_counts = vertex_counts[has_area]
+        vertices = np.concatenate([ring for ring, ring_has_area in zip(hull_rings, has_area) if ring_has_area])
+        vertex_offsets = np.cumsum(vertex_counts) - vertex_counts
+
+        # hull i has as many edges as vertices, edge j runs from vertex j to the next one of the same hull
+        edge_hulls = np.repeat(np.arange(len(vertex_counts)), vertex_counts)
+        local_i = ragged_arange(vertex_counts)
+        edge_vectors = vertices[vertex_offsets[edge_hulls] + (local_i + 1) % vertex_counts[edge_hulls]] - vertices
+        # float_power calls pow like x ** 2 on a python float does, it can round apart from x * x
+        edge_lens = np.sqrt(np.float_power(edge_vectors[:, 0], 2) + np.float_power(edge_vectors[:, 1], 2))
+        units = edge_vectors / edge_lens[:, None]
+        normals = np.stack([-units[:, 1], units[:, 0]], axis=1)
+
+        # the bounds of every hull in the frame of every edge of it
+        frame_bounds = np.empty((len(vertices), 4))
+        pair_counts = vertex_counts[edge_hulls]
+        pair_ends = np.cumsum(pair_counts)
+        edge_start = 0
+        while edge_start < len(vertices):
+            pairs_before = pair_ends[edge_start - 1] if edge_start > 0 else 0
+            edge_stop = max(int(np.searchsorted(pair_ends, pairs_before + cls.MAX_CALIPER_PAIRS, side="right")),
+                            edge_start + 1)
+            counts = pair_counts[edge_start:edge_stop]
+            pair_edges = np.repeat(np.arange(edge_start, edge_stop), counts)
+            pair_vertices = np.repeat(vertex_offsets[edge_hulls[edge_start:edge_stop]], counts) + ragged_arange(counts)
+            xs, ys = vertices[pair_vertices, 0], vertices[pair_vertices, 1]
+            along = units[pair_edges, 0] * xs + units[pair_edges, 1] * ys
+            across = normals[pair_edges, 0] * xs + normals[pair_edges, 1] * ys
+            offsets = np.cumsum(counts) - counts
+            frame_bounds[edge_start:edge_stop] = np.stack([
+                np.minimum.reduceat(along, offsets), np.minimum.reduceat(across, offsets),
+                np.maximum.reduceat(along, offsets), np.maximum.reduceat(across, offsets)], axis=1)
+            edge_start = edge_stop
+
+        areas = (frame_bounds[:, 2] - frame_bounds[:, 0]) * (frame_bounds[:, 3] - frame_bounds[:, 1])
+        min_areas = np.minimum.reduceat(areas, vertex_offsets)
+        is_smallest = np.flatnonzero(areas == min_areas[edge_hulls])
+        best_edges = is_smallest[np.unique(edge_hulls[is_smallest], return_index=True)[1]]
+
+        # corners (minx, miny), (maxx, miny) and (maxx, maxy) of the envelope, transformed back
+        min_x, min_y, max_x, max_y = frame_bounds[best_edges].T
+        frame_corners = np.stack([np.stack([min_x, min_y], axis=1), np.stack([max_x, min_y], axis=1),
+                                  np.stack([max_x, max_y], axis=1)], axis=1)
+        best_units, best_normals = units[best_edges][:, None], normals[best_edges][:, None]
+        result[has_area] = np.stack([
+            best_units[..., 0] * frame_corners[..., 0] + best_normals[..., 0] * frame_corners[..., 1],
+            best_units[..., 1] * frame_corners[..., 0] + best_normals[..., 1] * frame_corners[..., 1]], axis=2)
+        return result
+
+    @staticmethod
+    def _get_long_side_angles(corners: np.ndarray) -> np.ndarray:
+        """
+        angle in radian before normalizing of the longer of the first two rectangle edges, the first one on a tie
+        """
+        first_lens = (np.float_power(corners[:, 0, 0] - corners[:, 1, 0], 2)
+                      + np.float_power(corners[:, 0, 1] - corners[:, 1, 1], 2))
+        second_lens = (np.float_power(corners[:, 1, 0] - corners[:, 2, 0], 2)
+                       + np.float_power(corners[:, 1, 1] - corners[:, 2, 1], 2))
+        is_first = (first_lens >= second_lens)[:, None]
+        starts = np.where(is_first, corners[:, 0], corners[:, 1])
+        ends = np.where(is_first, corners[:, 1], corners[:, 2])
+        return np.arctan2(ends[:, 1] - starts[:, 1], ends[:, 0] - starts[:, 0])
+
+    @staticmethod
+    def _to_line_angle(angle_in_radian: float, in_degree: bool) -> float:
+        angle_in_radian %= math.pi
+        if angle_in_radian > math.pi / 2:
+            angle_in_radian -= math.pi
+        if in_degree:
+            return math.degrees(angle_in_radian)
+        return angle_in_radian
+
+    @staticmethod
+    def _to_line_angles(angles_in_radian: np.ndarray, in_degree: bool) -> np.ndarray:
+        angles_in_radian = angles_in_radian % np.pi
+        angles_in_radian[angles_in_radian > np.pi / 2] -= np.pi
+        if in_degree:
+            return np.degrees(angles_in_radian)
+        return angles_in_radian
@@ -0,0 +1,124 @@
+"""
+array level operations over many geometries. shapely 2 runs them as single vectorized calls,
+shapely 1.x falls back to a loop over the geometries
+"""
+from typing import Any, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.geometry.base import BaseGeometry
+
+SHAPELY_2 = int(shapely.__version__.split(".")[0]) >= 2
+
+# shapely 2 type ids of multi part geometries and collections
+_COLLECTION_TYPE_IDS = (4, 5, 6, 7)
+
+
+def as_geometry_array(geoms: Sequence[BaseGeometry]) -> np.ndarray:
+    array = np.empty(len(geoms), dtype=object)
+    for i, geom in enumerate(geoms):
+        array[i] = geom
+    return array
+
+
+def iter_items(items: Iterable[Any]) -> Iterable[Any]:
+    """
+    the parts of a geometry collection, which can not be iterated directly since shapely 2, or the items as they are
+    """
+    if isinstance(items, BaseGeometry):
+        return items.geoms
+    return items
+
+
+def bounds(geoms: Sequence[BaseGeometry]) -> np.ndarray:
+    """
+    (N, 4) array of (minx, miny, maxx, maxy), empty geometries get nan bounds
+    """
+    if SHAPELY_2:
+        return shapely.bounds(as_geometry_array(geoms)).reshape(-1, 4)
+    result = np.full((len(geoms), 4), np.nan)
+    for i, geom in enumerate(geoms):
+        if not geom.is_empty:
+            result[i] = geom.bounds
+    return result
+
+
+def equals_exact(geoms1: Sequence[BaseGeometry], geoms2: Sequence[BaseGeometry], tolerance: float = 0) -> np.ndarray:
+    if SHAPELY_2:
+        return shapely.equals_exact(as_geometry_array(geoms1), as_geometry_array(geoms2), tolerance)
+    return np.array([geom1.equals_exact(geom2, tolerance) for geom1, geom2 in zip(geoms1, geoms2)], dtype=bool)
+
+
+def flatten_parts(geom: BaseGeometry) -> List[BaseGeometry]:
+    """
+    single part geometries of geom in order, every nesting level is unpacked for all parts at once
+    """
+    parts = as_geometry_array([geom])
+    while True:
+        is_collection = np.isin(shapely.get_type_id(parts), _COLLECTION_TYPE_IDS)
+        if not is_collection.any():
+            return parts.tolist()
+        parts = shapely.get_parts(parts)
+
+
+def hull_rings(polygons: Sequence[BaseGeometry]) -> List[np.ndarray]:
+    """
+    xy coords of the convex hull of every polygon without the closing coordinate, empty if the hull has no area
+    """
+    if not SHAPELY_2:
+        return [_hull_ring(polygon) for polygon in polygons]
+
+    hulls = shapely.convex_hull(as_geometry_array(polygons))
+    has_area = (shapely.get_type_id(hulls) == 3) & ~shapely.is_empty(hulls)
+    coords, ring_idx = shapely.get_coordinates(shapely.get_exterior_ring(hulls[has_area]), return_index=True)
+    ring_ends = np.cumsum(np.bincount(ring_idx, minlength=int(has_area.sum())))
+    rings = np.split(coords, ring_ends[:-1])
+    result = [np.empty((0, 2))] * len(polygons)
+    for polygon_i, ring in zip(np.flatnonzero(has_area).tolist(), rings):
+        # without the closing coordinate
+        result[polygon_i] = ring[:-1]
+    return result
+
+
+def _hull_ring(polygon: BaseGeometry) -> np.ndarray:
+    hull = polygon.convex_hull
+    if not isinstance(hull, Polygon) or hull.is_empty:
+        return np.empty((0, 2))
+    return np.asarray(hull.exterior.coords)[:-1, :2]
+
+
+def rectangle_corners(geoms: Sequence[BaseGeometry], simplify_distance: float) -> np.ndarray:
+    """
+    (N, 3, 2) first three corners of the minimum rotated rectangle of every geometry after simplifying it by
+    simplify_distance, nan where the rectangle has no area
+    """
+    result = np.full((len(geoms), 3, 2), np.nan)
+    if not SHAPELY_2:
+        for i, geom in enumerate(geoms):
+            rectangle = geom.minimum_rotated_rectangle.simplify(simplify_distance)
+            if isinstance(rectangle, Polygon) and not rectangle.is_empty:
+                result[i] = np.asarray(rectangle.exterior.coords)[:3, :2]
+        return result
+
+    rectangles = shapely.simplify(shapely.oriented_envelope(as_geometry_array(geoms)), simplify_distance)
+    has_area = (shapely.get_type_id(rectangles) == 3) & ~shapely.is_empty(rectangles)
+    coords, ring_idx = shapely.get_coordinates(shapely.get_exterior_ring(rectangles[has_area]), return_index=True)
+    ring_starts = np.searchsorted(ring_idx, np.arange(int(has_area.sum())))
+    result[has_area] = coords[ring_starts[:, None] + np.arange(3)]
+    return result
+
+
+def line_endpoints(lines: Sequence[BaseGeometry]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    xy of the first and the last coordinate of every line
+    """
+    if SHAPELY_2:
+        lines = as_geometry_array(lines)
+        if shapely.is_empty(lines).any():
+            raise ValueError("input line is not a valid lineString")
+        return (shapely.get_coordinates(shapely.get_point(lines, 0)),
+                shapely.get_coordinates(shapely.get_point(lines, -1)))
+    line_coords = [list(line.coords) for line in lines]
+    endpoints = np.array([(coords[0][:2], coords[-1][:2]) for coords in line_coords], dtype=np.float64)
+    return endpoints[:, 0], endpoints[:, 1]
@@ -0,0 +1,254 @@
+import struct
+from typing import List, Sequence, Iterator, Tuple
+
+import numpy as np
+from shapely.geometry import Point, LineString, LinearRing, Polygon, MultiPoint, MultiLineString, MultiPolygon, \
+    GeometryCollection
+from shapely.geometry.base import BaseGeometry
+
+from shapely_ext.index import ragged_arange
+
+POINT, LINESTRING, POLYGON, MULTIPOINT, MULTILINESTRING, MULTIPOLYGON, GEOMETRYCOLLECTION = range(1, 8)
+
+_TYPE_CODES = {
+    Point: POINT, LineString: LINESTRING, LinearRing: LINESTRING, Polygon: POLYGON,
+    MultiPoint: MULTIPOINT, MultiLineString: MULTILINESTRING, MultiPolygon: MULTIPOLYGON,
+    GeometryCollection: GEOMETRYCOLLECTION,
+}
+_SINGLE_TYPES = {POINT: Point, LINESTRING: LineString, POLYGON: Polygon}
+_MULTI_TYPES = {MULTIPOINT: MultiPoint, MULTILINESTRING: MultiLineString, MULTIPOLYGON: MultiPolygon}
+
+_WKB_Z, _WKB_M, _WKB_SRID = 0x80000000, 0x40000000, 0x20000000
+
+
+class GeometryBatch:
+    """
+    many geometries as flat buffers in the layout of GeoArrow: xy coords, rings as offsets into coords,
+    parts as offsets into rings and geometries as offsets into parts. a point or a line is a part of one ring.
+    type_codes holds the WKB type code of every geometry, collections can only be held when empty.
+    z and m are dropped
+    """
+
+    def __init__(self, coords: np.ndarray, ring_offsets: np.ndarray, part_offsets: np.ndarray,
+                 geometry_offsets: np.ndarray, type_codes: np.ndarray):
+        self.coords = coords
+        self.ring_offsets = ring_offsets
+        self.part_offsets = part_offsets
+        self.geometry_offsets = geometry_offsets
+        self.type_codes = type_codes
+
+    def __len__(self):
+        return len(self.type_codes)
+
+    def __getitem__(self, geometry_i: int) -> BaseGeometry:
+        if not -len(self) <= geometry_i < len(self):
+            raise IndexError("GeometryBatch index out of range")
+        return self.geometry(geometry_i % len(self))
+
+    def __iter__(self) -> Iterator[BaseGeometry]:
+        return map(self.geometry, range(len(self)))
+
+    @property
+    def part_geometry_index(self) -> np.ndarray:
+        """
+        index of the geometry every part belongs to
+        """
+        return np.repeat(np.arange(len(self)), np.diff(self.geometry_offsets))
+
+    @property
+    def ring_part_index(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.part_offsets) - 1), np.diff(self.part_offsets))
+
+    @property
+    def part_type_codes(self) -> np.ndarray:
+        """
+        single type code of every part, POINT, LINESTRING or POLYGON
+        """
+        single_codes = np.where(self.type_codes > POLYGON, self.type_codes - POLYGON, self.type_codes)
+        return single_codes[self.part_geometry_index]
+
+    def ring_coords(self, ring_i: int) -> np.ndarray:
+        return self.coords[self.ring_offsets[ring_i]:self.ring_offsets[ring_i + 1]]
+
+    def geometry(self, geometry_i: int) -> BaseGeometry:
+        type_code = int(self.type_codes[geometry_i])
+        parts = [self._part(type_code if type_code <= POLYGON else type_code - POLYGON, part_i)
+                 for part_i in range(self.geometry_offsets[geometry_i], self.geometry_offsets[geometry_i + 1])]
+        if type_code in _SINGLE_TYPES:
+            return parts[0] if parts else _SINGLE_TYPES[type_code]()
+        if type_code in _MULTI_TYPES:
+            return _MULTI_TYPES[type_code](parts) if parts else _MULTI_TYPES[type_code]()
+        return GeometryCollection()
+
+    def _part(self, single_type_code: int, part_i: int) -> BaseGeometry:
+        rings = [self.ring_coords(ring_i)
+                 for ring_i in range(self.part_offsets[part_i], self.part_offsets[part_i + 1])]
+        if single_type_code == POINT:
+            return Point(rings[0][0])
+        if single_type_code == LINESTRING:
+            return LineString(rings[0])
+        return Polygon(shell=rings[0], holes=rings[1:])
+
+    def to_geometries(self) -> List[BaseGeometry]:
+        return list(self)
+
+    def with_coords(self, coords: np.ndarray, ring_offsets: np.ndarray) -> "GeometryBatch":
+        """
+        same parts and geometries over new ring coords, e.g. densified ones
+        """
+        return GeometryBatch(coords, ring_offsets, self.part_offsets, self.geometry_offsets, self.type_codes)
+
+    def single_parts(self) -> "GeometryBatch":
+        """
+        every part as a geometry of its own, the buffers are shared
+        """
+        return GeometryBatch(self.coords, self.ring_offsets, self.part_offsets,
+                             np.arange(len(self.part_offsets), dtype=np.int64), self.part_type_codes.astype(np.int8))
+
+    @classmethod
+    def from_geometries(cls, geometries: Sequence[BaseGeometry]) -> "GeometryBatch":
+        rings: List[np.ndarray] = []
+        ring_counts: List[int] = []
+        part_counts: List[int] = []
+        type_codes: List[int] = []
+        for geometry in geometries:
+            type_code = _TYPE_CODES.get(type(geometry))
+            if type_code is None or (type_code == GEOMETRYCOLLECTION and not geometry.is_empty):
+                raise ValueError(f"{geometry.geom_type} can not be held by a GeometryBatch")
+            type_codes.append(type_code)
+            parts = [] if geometry.is_empty else (geometry.geoms if type_code > POLYGON else [geometry])
+            part_counts.append(len(parts))
+            for part in parts:
+                part_rings = ([part.exterior.coords] + [interior.coords for interior in part.interiors]
+                              if isinstance(part, Polygon) else [part.coords])
+                ring_counts.append(len(part_rings))
+                rings.extend(np.asarray(ring)[:, :2] for ring in part_rings)
+
+        coords = np.concatenate(rings) if rings else np.empty((0, 2))
+        return cls(coords.astype(np.float64, copy=False), _to_offsets([len(ring) for ring in rings]),
+                   _to_offsets(ring_counts), _to_offsets(part_counts), np.array(type_codes, dtype=np.int8))
+
+    @classmethod
+    def from_wkb(cls, wkbs: Sequence[bytes]) -> "GeometryBatch":
+        """
+        headers are read one by one, but no geometry object is built and all coords are gathered from
+        the joined WKB in one vectorized copy. ISO and extended WKB with z, m and srid are accepted
+        """
+        buffer = b"".join(wkbs)
+        reader = _WkbReader(buffer)
+        starts = np.cumsum([0] + [len(wkb) for wkb in wkbs[:-1]]) if len(wkbs) > 0 else []
+        type_codes = [reader.read_geometry(int(start)) for start in starts]
+
+        ring_lens = np.array(reader.ring_lens, dtype=np.int64)
+        coord_bytes = (np.repeat(np.array(reader.ring_starts, dtype=np.int64), ring_lens)
+                       + ragged_arange(ring_lens) * np.repeat(np.array(reader.ring_strides, dtype=np.int64), ring_lens))
+        raw = np.frombuffer(buffer, dtype=np.uint8)[coord_bytes[:, None] + np.arange(16)]
+        is_big_endian = np.repeat(np.array(reader.ring_big_endian, dtype=bool), ring_lens)
+        coords = np.empty((len(coord_bytes), 2))
+        coords[~is_big_endian] = raw[~is_big_endian].copy().view("<f8")
+        coords[is_big_endian] = raw[is_big_endian].copy().view(">f8")
+        return cls(coords, _to_offsets(ring_lens), _to_offsets(reader.part_ring_counts),
+                   _to_offsets(reader.geometry_part_counts), np.array(type_codes, dtype=np.int8))
+
+
+def as_geometry_batch(geometries) -> GeometryBatch:
+    if isinstance(geometries, GeometryBatch):
+        return geometries
+    return GeometryBatch.from_geometries(geometries)
+
+
+def _to_offsets(counts) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(counts)
+    return offsets
+
+
+class _WkbReader:
+    """
+    walks WKB headers and records where the coords of every ring start, without reading the coords
+    """
+
+    def __init__(self, buffer: bytes):
+        self._buffer = buffer
+        self.ring_starts: List[int] = []
+        self.ring_lens: List[int] = []
+        self.ring_strides: List[int] = []
+        self.ring_big_endian: List[bool] = []
+        self.part_ring_counts: List[int] = []
+        self.geometry_part_counts: List[int] = []
+
+    def _read_header(self, pos: int) -> Tuple[int, str, int, int]:
+        """
+        return the base type code, struct byte order, coord size in bytes and position after the header
+        """
+        byte_order = "<" if self._buffer[pos] == 1 else ">"
+        raw_type = struct.unpack_from(byte_order + "I", self._buffer, pos + 1)[0]
+        pos += 5
+        iso_dims = (raw_type & 0xffff) // 1000
+        has_z = bool(raw_type & _WKB_Z) or iso_dims in (1, 3)
+        has_m = bool(raw_type & _WKB_M) or iso_dims in (2, 3)
+        if raw_type & _WKB_SRID:
+            pos += 4
+        return (raw_type & 0xffff) % 1000, byte_order, 8 * (2 + has_z + has_m), pos
+
+    def _read_count(self, byte_order: str, pos: int) -> int:
+        return struct.unpack_from(byte_order + "I", self._buffer, pos)[0]
+
+    def _add_ring(self, pos: int, length: int, stride: int, byte_order: str) -> int:
+        self.ring_starts.append(pos)
+        self.ring_lens.append(length)
+        self.ring_strides.append(stride)
+        self.ring_big_endian.append(byte_order == ">")
+        return pos + length * stride
+
+    def _read_part(self, type_code: int, byte_order: str, stride: int, pos: int) -> Tuple[bool, int]:
+        """
+        record one point, line or polygon, return whether it is non empty and the position after it
+        """
+        if type_code == POINT:
+            x, y = struct.unpack_from(byte_order + "dd", self._buffer, pos)
+            if np.isnan(x) and np.isnan(y):
+                return False, pos + stride
+            self._add_ring(pos, 1, stride, byte_order)
+            self.part_ring_counts.append(1)
+            return True, pos + stride
+
+        count = self._read_count(byte_order, pos)
+        pos += 4
+        if type_code == LINESTRING:
+            if count == 0:
+                return False, pos
+            pos = self._add_ring(pos, count, stride, byte_order)
+            self.part_ring_counts.append(1)
+            return True, pos
+        if type_code == POLYGON:
+            if count == 0:
+                return False, pos
+            for _ in range(count):
+                ring_len = self._read_count(byte_order, pos)
+                pos = self._add_ring(pos + 4, ring_len, stride, byte_order)
+            self.part_ring_counts.append(count)
+            return True, pos
+        raise ValueError(f"unsupported WKB geometry type {type_code}")
+
+    def read_geometry(self, pos: int) -> int:
+        type_code, byte_order, stride, pos = self._read_header(pos)
+        if type_code in _SINGLE_TYPES:
+            is_non_empty, _ = self._read_part(type_code, byte_order, stride, pos)
+            self.geometry_part_counts.append(int(is_non_empty))
+            return type_code
+
+        count = self._read_count(byte_order, pos)
+        pos += 4
+        if type_code == GEOMETRYCOLLECTION and count > 0:
+            raise ValueError("non empty GeometryCollection can not be held by a GeometryBatch")
+        if type_code not in _MULTI_TYPES and type_code != GEOMETRYCOLLECTION:
+            raise ValueError(f"unsupported WKB geometry type {type_code}")
+
+        part_count = 0
+        for _ in range(count):
+            part_type_code, part_byte_order, part_stride, pos = self._read_header(pos)
+            is_non_empty, pos = self._read_part(part_type_code, part_byte_order, part_stride, pos)
+            part_count += is_non_empty
+        self.geometry_part_counts.append(part_count)
+        return type_code
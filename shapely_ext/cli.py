@@ -0,0 +1,193 @@
+"""
+shapely-ext command, apply one operation to a stream of geometries with bounded memory.
+
+    shapely-ext interpolate --gap 1 < polygons.wkb > interpolated.wkb
+    shapely-ext decompose --format geojson --workers 4 --input roads.geojsonl --output lines.geojsonl
+
+every input line is a hex WKB or a GeoJSON geometry or feature, every output line is the result of the input line
+at the same position in the same format. decompose writes a MultiLineString and mesh a MultiPolygon of triangles.
+a record failing to parse or to process stops the stream by default, with --on-error skip it is dropped and with
+--on-error emit it gets an error line, an empty GeometryCollection in WKB or a Feature without geometry in GeoJSON,
+so input and output lines stay aligned. skipped and emitted errors are reported on stderr with their line number
+"""
+import argparse
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from shapely.geometry import GeometryCollection, MultiLineString, MultiPolygon, shape, mapping
+from shapely.geometry.base import BaseGeometry
+from shapely.wkb import loads as wkb_loads
+
+from shapely_ext.decompose import Decomposer
+from shapely_ext.interpolate import interpolate
+from shapely_ext.mesh import TriMesher
+
+FORMATS = ("wkb", "geojson")
+ON_ERRORS = ("raise", "skip", "emit")
+
+ErrorCallback = Callable[[str], None]
+
+
+def _interpolate(geometry: BaseGeometry, gap: float, simplify_distance: float) -> BaseGeometry:
+    return interpolate(geometry, gap, simplify_distance=simplify_distance)
+
+
+def _decompose(geometry: BaseGeometry, decomposer: Decomposer) -> BaseGeometry:
+    return MultiLineString(decomposer.decompose(geometry))
+
+
+def _mesh(geometry: BaseGeometry, mesher: TriMesher) -> BaseGeometry:
+    return MultiPolygon(mesher.mesh(geometry))
+
+
+def _get_operation(args: argparse.Namespace) -> Callable[[BaseGeometry], BaseGeometry]:
+    if args.operation == "interpolate":
+        return partial(_interpolate, gap=args.gap, simplify_distance=args.simplify_distance)
+    if args.operation == "decompose":
+        return partial(_decompose, decomposer=Decomposer(min_corner_angle_degree=args.min_corner_angle,
+                                                         simplify_distance=args.simplify_distance,
+                                                         engine=args.engine))
+    return partial(_mesh, mesher=TriMesher(interpolate_distance=args.interpolate_distance,
+                                           simplify_distance=args.simplify_distance,
+                                           constrained=args.constrained, steiner_points=args.steiner_points,
+                                           max_area=args.max_area, min_angle_degree=args.min_angle))
+
+
+def _process_line(operation: Callable[[BaseGeometry], BaseGeometry], line: str, input_format: str) -> str:
+    if input_format == "wkb":
+        return operation(wkb_loads(line, hex=True)).wkb_hex
+
+    obj = json.loads(line)
+    if obj.get("type") == "Feature":
+        obj["geometry"] = mapping(operation(shape(obj["geometry"])))
+        return json.dumps(obj)
+    return json.dumps(mapping(operation(shape(obj))))
+
+
+def _error_line(message: str, input_format: str) -> str:
+    if input_format == "wkb":
+        return GeometryCollection().wkb_hex
+    return json.dumps({"type": "Feature", "geometry": None, "properties": {"error": message}})
+
+
+def _process_record(operation: Callable[[BaseGeometry], BaseGeometry], line_number: int, line: str,
+                    input_format: str, on_error: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    output line and error message of one input line, a skipped record has no output line
+    """
+    try:
+        return _process_line(operation, line, input_format), None
+    except Exception as error:
+        if on_error == "raise":
+            raise
+        message = f"line {line_number}: {type(error).__name__}: {error}"
+        return (_error_line(message, input_format) if on_error == "emit" else None), message
+
+
+def _process_chunk(operation: Callable[[BaseGeometry], BaseGeometry], records: List[Tuple[int, str]],
+                   input_format: str, on_error: str) -> List[Tuple[Optional[str], Optional[str]]]:
+    return [_process_record(operation, line_number, line, input_format, on_error) for line_number, line in records]
+
+
+def process_lines(lines: Iterable[str], operation: Callable[[BaseGeometry], BaseGeometry], input_format: str = "wkb",
+                  chunksize: int = 256, workers: Optional[int] = None, on_error: str = "raise",
+                  error_callback: Optional[ErrorCallback] = None) -> Iterator[str]:
+    """
+    yield the output line of every non blank input line in order. lines are read chunk by chunk and with workers
+    at most two chunks per worker are in flight, so memory does not grow with the input.
+    on_error decides what a failing record does, see the module doc, error_callback gets the message of every
+    skipped or emitted error
+    """
+    if input_format not in FORMATS:
+        raise ValueError(f"input_format should be one of {FORMATS}, got {input_format}")
+    if on_error not in ON_ERRORS:
+        raise ValueError(f"on_error should be one of {ON_ERRORS}, got {on_error}")
+    records = ((line_number, line.strip()) for line_number, line in enumerate(lines, 1))
+    records = ((line_number, line) for line_number, line in records if line)
+    if not workers or workers <= 1:
+        results = (_process_record(operation, line_number, line, input_format, on_error)
+                   for line_number, line in records)
+    else:
+        results = _iter_results_in_pool(operation, records, input_format, on_error, chunksize, workers)
+    for output_line, message in results:
+        if message is not None and error_callback is not None:
+            error_callback(message)
+        if output_line is not None:
+            yield output_line
+
+
+def _iter_results_in_pool(operation: Callable[[BaseGeometry], BaseGeometry], records: Iterator[Tuple[int, str]],
+                          input_format: str, on_error: str, chunksize: int,
+                          workers: int) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(islice(records, chunksize))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_process_chunk, operation, chunk, input_format, on_error))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="shapely-ext", description="apply a shapely_ext operation to every "
+                                                                     "geometry of a hex WKB or GeoJSON lines stream")
+    io_parser = argparse.ArgumentParser(add_help=False)
+    io_parser.add_argument("--input", default="-", help="input file, - for stdin")
+    io_parser.add_argument("--output", default="-", help="output file, - for stdout")
+    io_parser.add_argument("--format", choices=FORMATS, default="wkb", help="format of input and output lines")
+    io_parser.add_argument("--chunksize", type=int, default=256, help="lines sent to a worker at a time")
+    io_parser.add_argument("--workers", type=int, default=None, help="size of the process pool")
+    io_parser.add_argument("--simplify-distance", type=float, default=1e-6)
+    io_parser.add_argument("--on-error", choices=ON_ERRORS, default="raise",
+                           help="stop at a failing record, skip it or write an error line in its place")
+
+    operations = parser.add_subparsers(dest="operation")
+    operations.required = True
+    interpolate_parser = operations.add_parser("interpolate", parents=[io_parser])
+    interpolate_parser.add_argument("--gap", type=float, required=True)
+
+    decompose_parser = operations.add_parser("decompose", parents=[io_parser])
+    decompose_parser.add_argument("--min-corner-angle", type=float, default=0)
+    decompose_parser.add_argument("--engine", choices=Decomposer.ENGINES, default="python")
+
+    mesh_parser = operations.add_parser("mesh", parents=[io_parser])
+    mesh_parser.add_argument("--interpolate-distance", type=float, required=True)
+    mesh_parser.add_argument("--constrained", action="store_true")
+    mesh_parser.add_argument("--steiner-points", action="store_true")
+    mesh_parser.add_argument("--max-area", type=float, default=None)
+    mesh_parser.add_argument("--min-angle", type=float, default=None)
+    return parser
+
+
+def _report_error(message: str) -> None:
+    print(f"shapely-ext: {message}", file=sys.stderr)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _build_parser().parse_args(argv)
+    input_file = sys.stdin if args.input == "-" else open(args.input)
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for line in process_lines(input_file, _get_operation(args), input_format=args.format,
+                                  chunksize=args.chunksize, workers=args.workers, on_error=args.on_error,
+                                  error_callback=_report_error):
+            output_file.write(line + "\n")
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+        if output_file is not sys.stdout:
+            output_file.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
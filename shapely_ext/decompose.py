@@ -1,43 +1,162 @@
 from itertools import chain
-from typing import List
+from typing import List, Tuple, Sequence, Iterator, Union
 
+import numpy as np
 from shapely.geometry import Polygon, LineString, LinearRing, MultiPolygon, MultiLineString, GeometryCollection
 from shapely.geometry.base import BaseGeometry
 
+from shapely_ext import simplify_cache, instrument
+from shapely_ext.batch import GeometryBatch, POINT, POLYGON
 from shapely_ext.geometry.vector_2d import Vector2D
+from shapely_ext.geometry.vector_2d_array import Vector2DArray
+from shapely_ext.index import ragged_arange
+
+
+class DecomposedLines:
+    """
+    columnar result of Decomposer.decompose_many, line i is coords[offsets[i]:offsets[i + 1]]
+    and is decomposed from the geometry at geometry_index[i]. LineStrings are only built on request
+    """
+
+    def __init__(self, coords: np.ndarray, offsets: np.ndarray, geometry_index: np.ndarray):
+        self.coords = coords
+        self.offsets = offsets
+        self.geometry_index = geometry_index
+
+    def __len__(self):
+        return len(self.geometry_index)
+
+    def __getitem__(self, i: int) -> LineString:
+        return LineString(self.coords[self.offsets[i]:self.offsets[i + 1]])
+
+    def __iter__(self) -> Iterator[LineString]:
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def start_coords(self) -> np.ndarray:
+        return self.coords[self.offsets[:-1]]
+
+    @property
+    def end_coords(self) -> np.ndarray:
+        return self.coords[self.offsets[1:] - 1]
+
+    def lines(self) -> List[LineString]:
+        return list(self)
+
+    def lines_of(self, geometry_i: int) -> List[LineString]:
+        return [self[i] for i in np.flatnonzero(self.geometry_index == geometry_i)]
 
 
 class Decomposer:
-    def __init__(self, min_corner_angle_degree: float = 0, simplify_distance: float = 1e-6):
+    ENGINES = ("python", "numpy")
+
+    def __init__(self, min_corner_angle_degree: float = 0, simplify_distance: float = 1e-6, engine: str = "python"):
+        """
+        engine "numpy" finds the corners of a whole ring at once instead of vertex by vertex
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine should be one of {self.ENGINES}, got {engine}")
         self._min_corner_angle_degree = min_corner_angle_degree
         self._simplify_distance = simplify_distance
+        self._engine = engine
 
     def decompose(self, geometry: BaseGeometry) -> List[LineString]:
-        geometry = geometry.simplify(self._simplify_distance)
+        return list(self.iter_decompose(geometry))
+
+    def iter_decompose(self, geometry: BaseGeometry) -> Iterator[LineString]:
+        """
+        yield the lines of decompose part by part, nested collections are walked with a stack of part iterators
+        """
+        with instrument.stage("decompose.simplify", geometry):
+            simplified = simplify_cache.simplify(geometry, self._simplify_distance)
+        stack: List[Iterator[BaseGeometry]] = [iter([simplified])]
+        while stack:
+            sub_geometry = next(stack[-1], None)
+            if sub_geometry is None:
+                stack.pop()
+            elif isinstance(sub_geometry, (MultiPolygon, MultiLineString, GeometryCollection)):
+                stack.append(iter(sub_geometry.geoms))
+            elif isinstance(sub_geometry, (Polygon, LineString)):
+                with instrument.stage("decompose.split", sub_geometry):
+                    lines = self._decompose_single_part(sub_geometry)
+                yield from lines
+
+    def _decompose_single_part(self, geometry: Union[Polygon, LineString]) -> List[LineString]:
         if isinstance(geometry, Polygon):
             return self.decompose_polygon(polygon=geometry)
-        elif isinstance(geometry, MultiPolygon):
-            lines_list: List[List[LineString]] = [
-                self.decompose_polygon(polygon=sub_polygon)
-                for sub_polygon in list(geometry)]
-            return list(chain.from_iterable(lines_list))
-        elif isinstance(geometry, LinearRing):
+        if isinstance(geometry, LinearRing):
             return self.decompose_linearRing(ring=geometry)
+        return self.decompose_lineString(lineString=geometry)
+
+    def decompose_many(self, geometries: Union[Sequence[BaseGeometry], GeometryBatch]) -> DecomposedLines:
+        """
+        decompose every geometry into one flat DecomposedLines of xy coords, corners are always found with numpy.
+        the rings of a GeometryBatch are split as they are without simplifying
+        """
+        if isinstance(geometries, GeometryBatch):
+            return self._decompose_batch(geometries)
+        parts_coords: List[np.ndarray] = []
+        is_ring_list: List[bool] = []
+        geometry_of_part: List[int] = []
+        for geometry_i, geometry in enumerate(geometries):
+            with instrument.stage("decompose.simplify", geometry):
+                simplified = simplify_cache.simplify(geometry, self._simplify_distance)
+            for part, is_ring in self._iter_parts(simplified):
+                part_coords = np.asarray(part.coords)[:, :2]
+                parts_coords.append(part_coords[:-1] if is_ring else part_coords)
+                is_ring_list.append(is_ring)
+                geometry_of_part.append(geometry_i)
+
+        if not parts_coords:
+            return DecomposedLines(np.empty((0, 2)), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64))
+        coords = np.concatenate(parts_coords)
+        part_offsets = np.zeros(len(parts_coords) + 1, dtype=np.int64)
+        part_offsets[1:] = np.cumsum([len(part_coords) for part_coords in parts_coords])
+        with instrument.stage("decompose.split", coords):
+            coord_indices, line_offsets, line_parts = self._split_parts(coords, part_offsets, np.array(is_ring_list))
+        return DecomposedLines(coords[coord_indices], line_offsets, np.array(geometry_of_part)[line_parts])
+
+    def _decompose_batch(self, batch: GeometryBatch) -> DecomposedLines:
+        ring_parts = batch.ring_part_index
+        ring_lens = np.diff(batch.ring_offsets)
+        # points are not decomposed and polygon rings lose their closing coordinate
+        part_type_codes = batch.part_type_codes
+        is_ring = part_type_codes[ring_parts] == POLYGON
+        has_lines = part_type_codes[ring_parts] != POINT
+        keep_coords = np.repeat(has_lines, ring_lens)
+        keep_coords[(batch.ring_offsets[1:] - 1)[is_ring & (ring_lens > 0)]] = False
+        new_lens = np.where(is_ring, ring_lens - 1, ring_lens)[has_lines]
+        if len(new_lens) == 0:
+            return DecomposedLines(np.empty((0, 2)), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64))
+
+        coords = batch.coords[keep_coords]
+        part_offsets = np.zeros(len(new_lens) + 1, dtype=np.int64)
+        part_offsets[1:] = np.cumsum(new_lens)
+        with instrument.stage("decompose.split", coords):
+            coord_indices, line_offsets, line_parts = self._split_parts(coords, part_offsets, is_ring[has_lines])
+        geometry_of_part = batch.part_geometry_index[ring_parts[has_lines]]
+        return DecomposedLines(coords[coord_indices], line_offsets, geometry_of_part[line_parts])
+
+    def _iter_parts(self, geometry: BaseGeometry) -> Iterator[Tuple[LineString, bool]]:
+        """
+        yield the rings and lineStrings decompose would split, with whether they are rings
+        """
+        if isinstance(geometry, Polygon):
+            yield geometry.exterior, True
+            for interior in geometry.interiors:
+                yield interior, True
+        elif isinstance(geometry, LinearRing):
+            yield geometry, True
         elif isinstance(geometry, LineString):
-            return self.decompose_lineString(lineString=geometry)
-        elif isinstance(geometry, MultiLineString):
-            lines_list: List[List[LineString]] = [
-                self.decompose_lineString(lineString=sub_lineString)
-                for sub_lineString in list(geometry)]
-            return list(chain.from_iterable(lines_list))
-        elif isinstance(geometry, GeometryCollection):
-            lines_list: List[List[LineString]] = [
-                self.decompose(geometry=sub_geometry) for sub_geometry in list(geometry)]
-            return list(chain.from_iterable(lines_list))
-        else:
-            return []
+            yield geometry, False
+        elif isinstance(geometry, (MultiPolygon, MultiLineString, GeometryCollection)):
+            for sub_geometry in geometry.geoms:
+                yield from self._iter_parts(sub_geometry)
 
     def decompose_lineString(self, lineString: LineString):
+        if self._engine == "numpy":
+            return self._decompose_part_with_numpy(np.asarray(lineString.coords), is_ring=False)
+
         coords = list(lineString.coords)
         lines: List[LineString] = []
         cur_line_coords = []
@@ -63,6 +182,9 @@ class Decomposer:
         return exterior_lines + list(chain.from_iterable(interior_lines_list))
 
     def decompose_linearRing(self, ring: LinearRing) -> List[LineString]:
+        if self._engine == "numpy":
+            return self._decompose_part_with_numpy(np.asarray(ring.coords), is_ring=True)
+
         coords = list(ring.coords)[:-1]
         corner_i = self._find_first_corner_index(coords)
         lines: List[LineString] = []
@@ -99,3 +221,67 @@ class Decomposer:
         next_vec = Vector2D.from_coordinates(cur_coord, next_coord)
         angle_in_degree = prev_vec.angle_to(next_vec)
         return angle_in_degree >= min_corner_angle_degree
+
+    def _corner_mask(self, prev_coords: np.ndarray, cur_coords: np.ndarray, next_coords: np.ndarray) -> np.ndarray:
+        prev_vecs = Vector2DArray.from_coordinates(prev_coords, cur_coords)
+        next_vecs = Vector2DArray.from_coordinates(cur_coords, next_coords)
+        return prev_vecs.angle_to(next_vecs) >= self._min_corner_angle_degree
+
+    def _split_parts(self, coords: np.ndarray, part_offsets: np.ndarray,
+                     is_ring: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        split every part packed in coords at its corners, rings come without their closing coordinate.
+        return the coordinate indices of all lines, the line offsets into them and the part of every line
+        """
+        part_lens = np.diff(part_offsets)
+        part_of_coord = np.repeat(np.arange(len(part_lens)), part_lens)
+        local_i = ragged_arange(part_lens)
+        lens = part_lens[part_of_coord]
+        prev_i = part_offsets[:-1][part_of_coord] + (local_i - 1) % lens
+        next_i = part_offsets[:-1][part_of_coord] + (local_i + 1) % lens
+        is_corner = self._corner_mask(coords[prev_i], coords, coords[next_i])
+        is_corner &= is_ring[part_of_coord] | ((local_i > 0) & (local_i < lens - 1))
+
+        corner_i = np.flatnonzero(is_corner)
+        corner_part = part_of_coord[corner_i]
+        corner_counts = np.bincount(corner_part, minlength=len(part_lens))
+        if np.any(is_ring & (corner_counts == 0)):
+            raise ValueError("Polygon has no corner")
+
+        # rings start at the same corner as _find_first_corner_index, which checks the last vertex first
+        has_corner = corner_counts > 0
+        first_local_i = local_i[corner_i[(np.cumsum(corner_counts) - corner_counts)[has_corner]]]
+        last_local_i = local_i[corner_i[(np.cumsum(corner_counts) - 1)[has_corner]]]
+        start_local_i = np.zeros(len(part_lens), dtype=np.int64)
+        start_local_i[has_corner] = np.where(last_local_i == part_lens[has_corner] - 1, last_local_i, first_local_i)
+        start_local_i[~is_ring] = 0
+
+        # split positions counted from the start of every part, rings end where they started
+        line_part_i = np.flatnonzero(~is_ring)
+        split_parts = np.concatenate((corner_part, np.arange(len(part_lens)), line_part_i))
+        split_positions = np.concatenate(((local_i[corner_i] - start_local_i[corner_part]) % part_lens[corner_part],
+                                          np.where(is_ring, part_lens, part_lens - 1),
+                                          np.zeros(len(line_part_i), dtype=np.int64)))
+        order = np.lexsort((split_positions, split_parts))
+        split_parts, split_positions = split_parts[order], split_positions[order]
+
+        in_same_part = split_parts[1:] == split_parts[:-1]
+        line_parts = split_parts[:-1][in_same_part]
+        line_starts = split_positions[:-1][in_same_part]
+        line_lens = split_positions[1:][in_same_part] - line_starts + 1
+
+        coord_parts = np.repeat(line_parts, line_lens)
+        positions = np.repeat(line_starts, line_lens) + ragged_arange(line_lens)
+        coord_indices = (part_offsets[:-1][coord_parts]
+                         + (start_local_i[coord_parts] + positions) % part_lens[coord_parts])
+        line_offsets = np.zeros(len(line_lens) + 1, dtype=np.int64)
+        line_offsets[1:] = np.cumsum(line_lens)
+        return coord_indices, line_offsets, line_parts
+
+    def _decompose_part_with_numpy(self, coords: np.ndarray, is_ring: bool) -> List[LineString]:
+        coords = coords[:-1] if is_ring else coords
+        # corners are found on xy, the lines keep z if there is one
+        coord_indices, line_offsets, _ = self._split_parts(coords[:, :2], np.array([0, len(coords)]),
+                                                           np.array([is_ring]))
+        line_coords = coords[coord_indices]
+        return [LineString(line_coords[start:end]) for start, end in zip(line_offsets[:-1], line_offsets[1:])]
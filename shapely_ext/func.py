@@ -1,11 +1,31 @@
-from typing import List, Any, Callable, Set, Tuple, Dict, Union, TypeVar
+from typing import List, Any, Callable, Set, Tuple, Dict, Union, TypeVar, Optional, Sequence
 from collections import OrderedDict
 
+import numpy as np
+from shapely.geometry.base import BaseGeometry
+
+from shapely_ext.backend import iter_items
+from shapely_ext.index import GridIndex, geometry_bounds
+
 Discrete = TypeVar("discrete", int, bool, str)
+Bounds = Tuple[float, float, float, float]
 
 
-def group(items: List[Any], grouping_func: Callable[[Any, Any], bool]) -> List[List[Any]]:
+def group(items: List[Any],
+          grouping_func: Callable[[Any, Any], bool],
+          bounds_func: Optional[Callable[[Any], Bounds]] = None) -> List[List[Any]]:
+    """
+    bounds_func is an optional prefilter, grouping_func is only called on items whose bounds intersect,
+    so grouping_func must be False for every pair of items with disjoint bounds
+    """
     result: List[List[Any]] = []
+    neighbours: Optional[Dict[int, List[int]]] = None
+    if bounds_func is not None:
+        bounds = np.array([bounds_func(item) for item in items], dtype=np.float64).reshape(-1, 4)
+        query_idx, item_idx = GridIndex(bounds).query_bulk(bounds)
+        neighbours = {}
+        for i, j in zip(query_idx.tolist(), item_idx.tolist()):
+            neighbours.setdefault(i, []).append(j)
 
     ungrouped_index: Set[int] = set(range(len(items)))
     seen: Set[int] = set()
@@ -19,9 +39,11 @@ def group(items: List[Any], grouping_func: Callable[[Any, Any], bool]) -> List[L
             cand_idx = group_candidate.pop()
             seen.add(cand_idx)
             cur_group.append(items[cand_idx])
+            candidates = ungrouped_index if neighbours is None else ungrouped_index.intersection(
+                neighbours.get(cand_idx, []))
             idx_nearby_of_cand = set(
                 idx
-                for idx in ungrouped_index
+                for idx in candidates
                 if grouping_func(items[idx], items[cand_idx]) and idx not in seen
             )
             ungrouped_index.difference_update(idx_nearby_of_cand)
@@ -31,9 +53,38 @@ def group(items: List[Any], grouping_func: Callable[[Any, Any], bool]) -> List[L
     return result
 
 
+def group_geometries(geoms: Sequence[BaseGeometry], distance: float = 0) -> List[List[BaseGeometry]]:
+    """
+    group geometries whose distance to each other is not larger than distance, transitively.
+    groups are ordered by their first geometry, geometries in a group keep the input order
+    """
+    # scipy takes hundreds of milliseconds to import, it is only loaded once geometries are grouped
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    if len(geoms) == 0:
+        return []
+    bounds = geometry_bounds(geoms)
+    index = GridIndex(bounds)
+    query_idx, item_idx = index.query_bulk(bounds + np.array([-distance, -distance, distance, distance]))
+    upper = query_idx < item_idx
+    query_idx, item_idx = query_idx[upper], item_idx[upper]
+    near = np.fromiter((geoms[i].distance(geoms[j]) <= distance for i, j in zip(query_idx, item_idx)),
+                       dtype=bool, count=len(query_idx))
+
+    graph = coo_matrix((np.ones(near.sum(), dtype=np.int8), (query_idx[near], item_idx[near])),
+                       shape=(len(geoms), len(geoms)))
+    _, labels = connected_components(graph, directed=False)
+    _, first_of_label, group_of_geom = np.unique(labels, return_index=True, return_inverse=True)
+    groups: List[List[BaseGeometry]] = [[] for _ in first_of_label]
+    for geom, group_i in zip(geoms, np.argsort(np.argsort(first_of_label))[group_of_geom]):
+        groups[group_i].append(geom)
+    return groups
+
+
 def classify(items: List[Any], func: Callable[[Any], Discrete]) -> Tuple:
     label_items_map: Dict[Discrete, List[Any]] = OrderedDict()
-    for item in items:
+    for item in iter_items(items):
         label = func(item)
         label_items_map.setdefault(label, []).append(item)
     return tuple(label_items_map.values())
@@ -41,7 +92,7 @@ def classify(items: List[Any], func: Callable[[Any], Discrete]) -> Tuple:
 
 def separate(items: List[Any], func: Callable[[Any], bool]) -> Tuple[list, list]:
     positives, negatives = [], []
-    for item in items:
+    for item in iter_items(items):
         if func(item):
             positives.append(item)
         else:
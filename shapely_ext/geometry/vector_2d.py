@@ -8,12 +8,24 @@ Num = TypeVar('Num', float, int)
 
 
 class Vector2D:
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y):
         if not isinstance(x, (float, int)) or not isinstance(y, (float, int)):
             raise TypeError("x, y should be number")
         self.x = x
         self.y = y
 
+    @classmethod
+    def _from_xy_unchecked(cls, x, y):
+        """
+        skip the type check of __init__, for internal callers whose x, y are known to be numbers
+        """
+        vector = object.__new__(cls)
+        vector.x = x
+        vector.y = y
+        return vector
+
     @staticmethod
     def is_valid_2d_coordinate(coord: Sequence[Num]):
         return (isinstance(coord, Sequence)
@@ -25,7 +37,7 @@ class Vector2D:
     def from_coordinate(cls, coord: Sequence[Num]):
         if not cls.is_valid_2d_coordinate(coord):
             raise ValueError(f"{coord} is not valid coordinates")
-        return cls(x=coord[0], y=coord[1])
+        return cls._from_xy_unchecked(coord[0], coord[1])
 
     @classmethod
     def from_coordinates(cls, from_coord: Sequence[Num], to_coord: Sequence[Num]):
@@ -33,7 +45,7 @@ class Vector2D:
             raise ValueError(f"{from_coord} is not valid from_coordinates")
         if not cls.is_valid_2d_coordinate(to_coord):
             raise ValueError(f"{to_coord} is not valid from_coordinates")
-        return cls(x=to_coord[0] - from_coord[0], y=to_coord[1] - from_coord[1])
+        return cls._from_xy_unchecked(to_coord[0] - from_coord[0], to_coord[1] - from_coord[1])
 
     @property
     def length(self):
@@ -49,7 +61,7 @@ class Vector2D:
 
     def plus(self, vector):
         self.raise_if_not_vector(vector)
-        return Vector2D(self.x + vector.x, self.y + vector.y)
+        return Vector2D._from_xy_unchecked(self.x + vector.x, self.y + vector.y)
 
     def dot(self, vector) -> Num:
         self.raise_if_not_vector(vector)
@@ -93,7 +105,7 @@ class Vector2D:
         length = math.sqrt(self.x ** 2 + self.y ** 2)
         if length == 0:
             raise ValueError('x and y cannot be both 0')
-        return Vector2D(self.x / length, self.y / length)
+        return Vector2D._from_xy_unchecked(self.x / length, self.y / length)
 
     def reverse(self):
-        return Vector2D(-self.x, -self.y)
+        return Vector2D._from_xy_unchecked(-self.x, -self.y)
@@ -0,0 +1,121 @@
+import math
+from typing import Sequence, Union
+
+import numpy as np
+
+from shapely_ext.geometry.vector_2d import Vector2D
+
+
+class Vector2DArray:
+    """
+    N vectors in one contiguous (N, 2) float64 buffer, the vectorized counterpart of Vector2D
+    """
+    __slots__ = ("_xy",)
+
+    def __init__(self, xy):
+        xy = np.ascontiguousarray(xy, dtype=np.float64)
+        if xy.ndim != 2 or xy.shape[1] != 2:
+            raise ValueError(f"expect array of shape (N, 2), got {xy.shape}")
+        self._xy = xy
+
+    @classmethod
+    def from_coords(cls, coords):
+        """
+        from shapely coordinate sequence or (N, >=2) array, float64 xy arrays are used without copy
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        if coords.ndim != 2 or coords.shape[1] < 2:
+            raise ValueError(f"{coords.shape} is not valid shape of coordinates")
+        return cls(coords[:, :2])
+
+    @classmethod
+    def from_coordinates(cls, from_coords, to_coords):
+        return cls(np.asarray(to_coords, dtype=np.float64)[:, :2] - np.asarray(from_coords, dtype=np.float64)[:, :2])
+
+    @classmethod
+    def from_vectors(cls, vectors: Sequence[Vector2D]):
+        return cls(np.array([(vector.x, vector.y) for vector in vectors], dtype=np.float64).reshape(-1, 2))
+
+    @property
+    def xy(self) -> np.ndarray:
+        return self._xy
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._xy[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._xy[:, 1]
+
+    def __len__(self):
+        return len(self._xy)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            x, y = self._xy[item]
+            return Vector2D._from_xy_unchecked(float(x), float(y))
+        return Vector2DArray(self._xy[item])
+
+    def __iter__(self):
+        return (Vector2D._from_xy_unchecked(x, y) for x, y in self._xy.tolist())
+
+    def __eq__(self, other):
+        return isinstance(other, Vector2DArray) and np.array_equal(self._xy, other._xy)
+
+    @staticmethod
+    def _xy_of(vectors: Union[Vector2D, "Vector2DArray"]) -> np.ndarray:
+        if isinstance(vectors, Vector2DArray):
+            return vectors._xy
+        if isinstance(vectors, Vector2D):
+            return np.array([[vectors.x, vectors.y]], dtype=np.float64)
+        raise TypeError(f"{vectors} is of type {type(vectors)}, expect Vector2D or Vector2DArray")
+
+    @property
+    def length(self) -> np.ndarray:
+        return np.sqrt(self._xy[:, 0] ** 2 + self._xy[:, 1] ** 2)
+
+    def plus(self, vectors):
+        return Vector2DArray(self._xy + self._xy_of(vectors))
+
+    def dot(self, vectors) -> np.ndarray:
+        other_xy = self._xy_of(vectors)
+        return self._xy[:, 0] * other_xy[:, 0] + self._xy[:, 1] * other_xy[:, 1]
+
+    def cross(self, vectors) -> np.ndarray:
+        other_xy = self._xy_of(vectors)
+        return self._xy[:, 0] * other_xy[:, 1] - self._xy[:, 1] * other_xy[:, 0]
+
+    def angle_ccw_rotating_to(self, vectors, in_degree: bool = True) -> np.ndarray:
+        """
+        in range of [0, 360) degree
+        """
+        angles_in_radian = np.arctan2(self.cross(vectors), self.dot(vectors)) % (math.pi * 2)
+        if in_degree:
+            return np.degrees(angles_in_radian)
+        return angles_in_radian
+
+    def angle_to(self, vectors, in_degree: bool = True) -> np.ndarray:
+        """
+        in range of [0, 180]
+        """
+        angles_in_radian = np.abs(np.arctan2(self.cross(vectors), self.dot(vectors)))
+        if in_degree:
+            return np.degrees(angles_in_radian)
+        return angles_in_radian
+
+    def multiply(self, multiple):
+        multiple = np.asarray(multiple, dtype=np.float64)
+        return Vector2DArray(self._xy * (multiple[:, None] if multiple.ndim == 1 else multiple))
+
+    def __mul__(self, other):
+        return self.multiply(other)
+
+    def unit(self):
+        lengths = self.length
+        if np.any(lengths == 0):
+            raise ValueError('x and y cannot be both 0')
+        return Vector2DArray(self._xy / lengths[:, None])
+
+    def reverse(self):
+        return Vector2DArray(-self._xy)
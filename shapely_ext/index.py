@@ -0,0 +1,278 @@
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from shapely.geometry import Polygon, LineString, LinearRing, MultiPolygon, MultiLineString, GeometryCollection
+from shapely.geometry.base import BaseGeometry
+
+from shapely_ext import backend
+from shapely_ext.geometry.vector_2d import Vector2D
+
+
+def ragged_arange(counts: np.ndarray) -> np.ndarray:
+    """
+    concatenation of arange(count) for every count, e.g. [2, 3] -> [0, 1, 0, 1, 2]
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    total = int(counts.sum())
+    starts = np.cumsum(counts) - counts
+    return np.arange(total, dtype=np.int64) - np.repeat(starts, counts)
+
+
+def geometry_bounds(geoms: Sequence[BaseGeometry]) -> np.ndarray:
+    """
+    (N, 4) array of (minx, miny, maxx, maxy), empty geometries get nan bounds
+    """
+    return backend.bounds(geoms)
+
+
+class GridIndex:
+    """
+    uniform grid over bounding boxes, every box is registered in each cell it covers.
+    queries return indices of boxes whose bounds intersect the query bounds.
+    """
+
+    def __init__(self, bounds: np.ndarray, cell_size: Optional[float] = None):
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        self._bounds = bounds
+        valid = ~np.isnan(bounds).any(axis=1)
+        valid_idx = np.flatnonzero(valid)
+
+        if len(valid_idx) == 0:
+            self._origin = np.zeros(2)
+            self._cell_size = 1.0
+            self._cell_extent = np.zeros(4, dtype=np.int64)
+            self._cell_keys = np.empty(0, dtype=np.int64)
+            self._cell_starts = np.zeros(1, dtype=np.int64)
+            self._items = np.empty(0, dtype=np.int64)
+            return
+
+        valid_bounds = bounds[valid_idx]
+        self._origin = valid_bounds[:, :2].min(axis=0)
+        self._cell_size = cell_size if cell_size else self._default_cell_size(valid_bounds)
+
+        ix0, iy0, ix1, iy1 = self._cell_range(valid_bounds)
+        self._cell_extent = np.array([ix0.min(), iy0.min(), ix1.max(), iy1.max()])
+        keys, items = self._expand(ix0, iy0, ix1, iy1, valid_idx)
+        order = np.argsort(keys, kind="stable")
+        keys, items = keys[order], items[order]
+        self._cell_keys, first = np.unique(keys, return_index=True)
+        self._cell_starts = np.append(first, len(keys)).astype(np.int64)
+        self._items = items
+
+    def __len__(self):
+        return len(self._bounds)
+
+    @property
+    def bounds(self) -> np.ndarray:
+        return self._bounds
+
+    @staticmethod
+    def _default_cell_size(bounds: np.ndarray) -> float:
+        """
+        median box size, but at least the size a uniform spread of the boxes gives,
+        so a few tiny boxes can not make the large ones cover an enormous number of cells
+        """
+        extents = np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1])
+        total_extent = bounds[:, 2:].max(axis=0) - bounds[:, :2].min(axis=0)
+        cell_size = max(float(np.median(extents)), float(total_extent.max()) / np.sqrt(len(bounds)))
+        return cell_size if cell_size > 0 else 1.0
+
+    def _cell_range(self, bounds: np.ndarray) -> Tuple[np.ndarray, ...]:
+        cells = np.floor((bounds - np.tile(self._origin, 2)) / self._cell_size).astype(np.int64)
+        return cells[:, 0], cells[:, 1], cells[:, 2], cells[:, 3]
+
+    @staticmethod
+    def _cell_key(ix: np.ndarray, iy: np.ndarray) -> np.ndarray:
+        # cell coordinates are shifted to be non negative and packed into one int64
+        return ((ix + (1 << 31)) << 32) | (iy + (1 << 31))
+
+    def _expand(self, ix0, iy0, ix1, iy1, ids) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        pair every id with the key of every cell its cell range covers
+        """
+        nx = ix1 - ix0 + 1
+        ny = iy1 - iy0 + 1
+        counts = nx * ny
+        local = ragged_arange(counts)
+        rep_ny = np.repeat(ny, counts)
+        ix = np.repeat(ix0, counts) + local // rep_ny
+        iy = np.repeat(iy0, counts) + local % rep_ny
+        return self._cell_key(ix, iy), np.repeat(ids, counts)
+
+    def query(self, bounds: Tuple[float, float, float, float]) -> np.ndarray:
+        """
+        indices of boxes intersecting bounds, sorted ascending
+        """
+        _, item_idx = self.query_bulk(np.asarray(bounds, dtype=np.float64).reshape(1, 4))
+        return item_idx
+
+    def query_bulk(self, bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        all (query index, item index) pairs whose boxes intersect, sorted by query then item
+        """
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        empty = np.empty(0, dtype=np.int64)
+        valid_idx = np.flatnonzero(~np.isnan(bounds).any(axis=1))
+        if len(valid_idx) == 0 or len(self._items) == 0:
+            return empty, empty
+
+        # cells outside of the indexed extent are empty, clip to keep huge query boxes cheap
+        ix0, iy0, ix1, iy1 = self._cell_range(bounds[valid_idx])
+        min_ix, min_iy, max_ix, max_iy = self._cell_extent
+        ix0, ix1 = np.maximum(ix0, min_ix), np.minimum(ix1, max_ix)
+        iy0, iy1 = np.maximum(iy0, min_iy), np.minimum(iy1, max_iy)
+        overlapping = (ix0 <= ix1) & (iy0 <= iy1)
+        ix0, iy0, ix1, iy1 = ix0[overlapping], iy0[overlapping], ix1[overlapping], iy1[overlapping]
+        valid_idx = valid_idx[overlapping]
+        keys, query_idx = self._expand(ix0, iy0, ix1, iy1, valid_idx)
+
+        pos = np.searchsorted(self._cell_keys, keys)
+        pos = np.minimum(pos, len(self._cell_keys) - 1)
+        hit = self._cell_keys[pos] == keys
+        pos, query_idx = pos[hit], query_idx[hit]
+
+        counts = self._cell_starts[pos + 1] - self._cell_starts[pos]
+        item_pos = np.repeat(self._cell_starts[pos], counts) + ragged_arange(counts)
+        item_idx = self._items[item_pos]
+        query_idx = np.repeat(query_idx, counts)
+
+        # a box spanning several cells shows up once per shared cell. queries within one cell, such as rays,
+        # already come sorted by query then item
+        if (ix0 != ix1).any() or (iy0 != iy1).any():
+            pair_keys = np.unique(query_idx * len(self._bounds) + item_idx)
+            query_idx, item_idx = np.divmod(pair_keys, len(self._bounds))
+
+        query_bounds, item_bounds = bounds[query_idx], self._bounds[item_idx]
+        intersects = ((query_bounds[:, 0] <= item_bounds[:, 2]) & (item_bounds[:, 0] <= query_bounds[:, 2])
+                      & (query_bounds[:, 1] <= item_bounds[:, 3]) & (item_bounds[:, 1] <= query_bounds[:, 3]))
+        return query_idx[intersects], item_idx[intersects]
+
+
+def as_xy(coords) -> np.ndarray:
+    """
+    (N, 2) float array of the x and y of coords, z is dropped
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    return coords[:, :2] if len(coords) > 0 else np.empty((0, 2))
+
+
+def get_segments(geom: BaseGeometry) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    start and end xy of every boundary segment of geom, as two (M, 2) arrays
+    """
+    rings: List[np.ndarray] = []
+
+    def collect(sub_geom):
+        if isinstance(sub_geom, Polygon):
+            rings.append(as_xy(sub_geom.exterior.coords))
+            rings.extend(as_xy(interior.coords) for interior in sub_geom.interiors)
+        elif isinstance(sub_geom, (LineString, LinearRing)):
+            rings.append(as_xy(sub_geom.coords))
+        elif isinstance(sub_geom, (MultiPolygon, MultiLineString, GeometryCollection)):
+            for part in sub_geom.geoms:
+                collect(part)
+
+    collect(geom)
+    rings = [ring for ring in rings if len(ring) > 1]
+    if not rings:
+        return np.empty((0, 2)), np.empty((0, 2))
+    return np.concatenate([ring[:-1] for ring in rings]), np.concatenate([ring[1:] for ring in rings])
+
+
+class RayCaster:
+    """
+    casts parallel rays against a fixed set of segments. segments are rotated into the frame where rays run
+    along +x and indexed by their y range, so a ray only meets the segments its y falls in
+    """
+
+    def __init__(self, segment_starts: np.ndarray, segment_ends: np.ndarray, direction: Vector2D,
+                 max_length: float):
+        unit = direction.unit()
+        self._rotation = np.array([[unit.x, -unit.y], [unit.y, unit.x]])
+        self._direction = np.array([unit.x, unit.y])
+        self._max_length = max_length
+        self._starts = self._rotate(segment_starts)
+        self._ends = self._rotate(segment_ends)
+        min_ys = np.minimum(self._starts[:, 1], self._ends[:, 1])
+        max_ys = np.maximum(self._starts[:, 1], self._ends[:, 1])
+        self._index = GridIndex(np.stack([np.zeros(len(self._starts)), min_ys, np.zeros(len(self._starts)), max_ys],
+                                         axis=1), cell_size=self._default_cell_size(min_ys, max_ys))
+
+    @staticmethod
+    def _default_cell_size(min_ys: np.ndarray, max_ys: np.ndarray) -> Optional[float]:
+        """
+        the index only spans y, where a uniform spread of n segments fills n cells rather than sqrt(n)
+        """
+        if len(min_ys) == 0:
+            return None
+        cell_size = max(float(np.median(max_ys - min_ys)), float(max_ys.max() - min_ys.min()) / len(min_ys))
+        return cell_size if cell_size > 0 else None
+
+    def _rotate(self, coords: np.ndarray) -> np.ndarray:
+        return as_xy(coords) @ self._rotation
+
+    def candidate_hits(self, origins: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        every (ray, segment) hit as arrays of ray index, segment index, segment parameter in [0, 1],
+        near and far distance along the ray. near and far only differ for segments lying on the ray
+        """
+        origins = self._rotate(origins)
+        ray_idx, seg_idx = self._index.query_bulk(
+            np.stack([np.zeros(len(origins)), origins[:, 1], np.zeros(len(origins)), origins[:, 1]], axis=1))
+        ray_xs, ray_ys = origins[ray_idx, 0], origins[ray_idx, 1]
+        starts, ends = self._starts[seg_idx], self._ends[seg_idx]
+        dys = ends[:, 1] - starts[:, 1]
+
+        dxs = ends[:, 0] - starts[:, 0]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            params = np.where(dys != 0, (ray_ys - starts[:, 1]) / dys, 0)
+        crossing_xs = starts[:, 0] + params * dxs
+        near = np.where(dys != 0, crossing_xs, np.minimum(starts[:, 0], ends[:, 0])) - ray_xs
+        far = np.where(dys != 0, crossing_xs, np.maximum(starts[:, 0], ends[:, 0])) - ray_xs
+        # segments lying on the ray are hit from wherever they start in front of the origin
+        near = np.maximum(near, 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            params = np.where(dys != 0, params, np.where(dxs != 0, (ray_xs + near - starts[:, 0]) / dxs, 0))
+
+        hit = (far >= 0) & (near <= self._max_length)
+        return ray_idx[hit], seg_idx[hit], params[hit], near[hit], far[hit]
+
+    def cast(self, origins: np.ndarray,
+             hits: Optional[Tuple[np.ndarray, ...]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        nearest hit of every ray as distance, segment index and segment parameter.
+        rays hitting nothing get inf, -1 and nan. hits are the candidate_hits of origins, if already computed
+        """
+        n_rays = len(origins)
+        ray_idx, seg_idx, params, near, _ = hits if hits is not None else self.candidate_hits(origins)
+        distances = np.full(n_rays, np.inf)
+        segment_indices = np.full(n_rays, -1, dtype=np.int64)
+        segment_params = np.full(n_rays, np.nan)
+        if len(ray_idx) == 0:
+            return distances, segment_indices, segment_params
+        # hits come grouped by ray, the first of the nearest hits of every group wins
+        group_starts = np.flatnonzero(np.diff(ray_idx, prepend=-1))
+        group_nears = np.minimum.reduceat(near, group_starts)
+        is_nearest = near == np.repeat(group_nears, np.diff(group_starts, append=len(near)))
+        nearest = np.flatnonzero(is_nearest)
+        first = nearest[np.diff(ray_idx[nearest], prepend=-1) != 0]
+        distances[ray_idx[first]] = near[first]
+        segment_indices[ray_idx[first]] = seg_idx[first]
+        segment_params[ray_idx[first]] = params[first]
+        return distances, segment_indices, segment_params
+
+    def count_crossings(self, origins: np.ndarray, hits: Optional[Tuple[np.ndarray, ...]] = None) -> np.ndarray:
+        """
+        number of segments every ray crosses, odd counts mean the origin is inside a polygonal target.
+        hits are the candidate_hits of origins, if already computed
+        """
+        rotated = self._rotate(origins)
+        ray_idx, seg_idx, _, near, _ = hits if hits is not None else self.candidate_hits(origins)
+        starts, ends = self._starts[seg_idx], self._ends[seg_idx]
+        # half open on y, so a ray through a vertex counts its two segments once
+        crossing = (((starts[:, 1] > rotated[ray_idx, 1]) != (ends[:, 1] > rotated[ray_idx, 1]))
+                    & (near > 0))
+        return np.bincount(ray_idx[crossing], minlength=len(rotated))
+
+    def points_at(self, origins: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        return as_xy(origins) + distances[:, None] * self._direction
@@ -0,0 +1,113 @@
+"""
+opt-in timing of the stages inside shapely_ext.
+
+    from shapely_ext import instrument
+    instrument.enable()
+    ...
+    instrument.stats()  # {"mesh.delaunay": {"calls": 3, "seconds": 0.01, "vertices": 120}, ...}
+
+every stage records its call count, cumulative wall time and the vertex count of its input.
+when disabled, a stage is a shared no-op context and the input vertices are never counted
+"""
+from time import perf_counter
+from typing import Callable, Dict, Optional, Union
+
+import numpy as np
+from shapely.geometry.base import BaseGeometry
+
+StageCallback = Callable[[str, float, int], None]
+
+_enabled = False
+_callback: Optional[StageCallback] = None
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+def enable(callback: Optional[StageCallback] = None) -> None:
+    """
+    callback is called with the stage name, its seconds and its input vertex count every time a stage ends
+    """
+    global _enabled, _callback
+    _enabled = True
+    _callback = callback
+
+
+def disable() -> None:
+    global _enabled, _callback
+    _enabled = False
+    _callback = None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    _stats.clear()
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    return {name: dict(stage_stats) for name, stage_stats in _stats.items()}
+
+
+def count_vertices(geometry: Union[BaseGeometry, np.ndarray, None]) -> int:
+    if geometry is None:
+        return 0
+    if isinstance(geometry, np.ndarray):
+        return len(geometry)
+    if geometry.is_empty:
+        return 0
+    if hasattr(geometry, "exterior"):
+        return len(geometry.exterior.coords) + sum(len(interior.coords) for interior in geometry.interiors)
+    if hasattr(geometry, "geoms"):
+        return sum(count_vertices(sub_geometry) for sub_geometry in geometry.geoms)
+    return len(geometry.coords)
+
+
+def _record(name: str, seconds: float, vertices: int) -> None:
+    stage_stats = _stats.get(name)
+    if stage_stats is None:
+        stage_stats = _stats[name] = {"calls": 0, "seconds": 0.0, "vertices": 0}
+    stage_stats["calls"] += 1
+    stage_stats["seconds"] += seconds
+    stage_stats["vertices"] += vertices
+    if _callback is not None:
+        _callback(name, seconds, vertices)
+
+
+class _Stage:
+    __slots__ = ("_name", "_vertices", "_start")
+
+    def __init__(self, name: str, vertices: int):
+        self._name = name
+        self._vertices = vertices
+
+    def __enter__(self):
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _record(self._name, perf_counter() - self._start, self._vertices)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str, geometry: Union[BaseGeometry, np.ndarray, None] = None):
+    """
+    context timing one stage, geometry is its input whose vertices are counted only when enabled
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, count_vertices(geometry))
+
@@ -1,10 +1,14 @@
 import math
-from typing import Tuple, List
+from typing import Tuple, List, Union, Sequence
 
+import numpy as np
 from shapely.geometry import Polygon, Point, MultiPoint, LineString, LinearRing, MultiPolygon, MultiLineString, \
     GeometryCollection
 from shapely.geometry.base import BaseGeometry
 
+from shapely_ext import simplify_cache, instrument
+from shapely_ext.batch import GeometryBatch
+
 
 def interpolate_coords_by_len(coord1: Tuple[float, float],
                               coord2: Tuple[float, float],
@@ -22,30 +26,151 @@ def interpolate_coords_by_len(coord1: Tuple[float, float],
     return result
 
 
+def interpolate_rings(coords: np.ndarray, ring_offsets: np.ndarray,
+                      gaps: Union[float, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    densify many rings packed in one (N, 2) coords buffer in a single vectorized pass.
+    ring i is coords[ring_offsets[i]:ring_offsets[i + 1]], gaps is a scalar or one gap per ring.
+    return the densified coords buffer and its ring offsets
+    """
+    coords = np.asarray(coords, dtype=np.float64)[:, :2]
+    ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+    ring_lens = np.diff(ring_offsets)
+    gaps = np.broadcast_to(np.asarray(gaps, dtype=np.float64), ring_lens.shape)
+    if len(coords) == 0:
+        return coords.copy(), ring_offsets.copy()
+
+    # every coordinate starts a segment except the last one of its ring, which is emitted as is
+    is_ring_end = np.zeros(len(coords), dtype=bool)
+    is_ring_end[ring_offsets[1:][ring_lens > 0] - 1] = True
+    coord_gaps = np.repeat(gaps, ring_lens)
+    vectors = np.zeros_like(coords)
+    vectors[:-1] = coords[1:] - coords[:-1]
+    vectors[is_ring_end] = 0
+    seg_lens = np.sqrt(vectors[:, 0] ** 2 + vectors[:, 1] ** 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        unit_vectors = np.where(seg_lens[:, None] > 0, vectors / seg_lens[:, None], 0)
+
+    # np.rint rounds half to even like the builtin round, every segment keeps at least its start
+    counts = np.maximum(np.rint(seg_lens / coord_gaps), 1).astype(np.int64)
+    counts[is_ring_end] = 1
+    coord_idx = np.repeat(np.arange(len(coords)), counts)
+    steps = np.arange(len(coord_idx)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    result = coords[coord_idx] + unit_vectors[coord_idx] * steps[:, None] * coord_gaps[coord_idx][:, None]
+    result_offsets = np.zeros(len(ring_offsets), dtype=np.int64)
+    result_offsets[1:] = np.cumsum(np.bincount(np.repeat(np.arange(len(ring_lens)), ring_lens),
+                                               weights=counts, minlength=len(ring_lens))).astype(np.int64)
+    return result, result_offsets
+
+
+def interpolate_coords_array(coords: np.ndarray, gap: float) -> np.ndarray:
+    """
+    vectorized interpolate_coords_by_len over every segment of coords, (N, 2) array in, (M, 2) array out.
+    the last coordinate is kept, so closed rings stay closed
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    return interpolate_rings(coords, np.array([0, len(coords)]), gap)[0]
+
+
 def interpolate(geometry: BaseGeometry, gap: float, simplify_distance: float = 1e-6) -> BaseGeometry:
     def interpolate_coords(coords):
-        new_coords: List[Tuple[float, float]] = []
-        for i in range(len(coords) - 2):
-            new_coords.extend(interpolate_coords_by_len(coords[i], coords[i + 1], gap, result_include_coord2=False))
-        new_coords.extend(interpolate_coords_by_len(coords[-2], coords[-1], gap, result_include_coord2=True))
-        return new_coords
+        coords = np.asarray(coords)
+        with instrument.stage("interpolate.densify", coords):
+            return interpolate_coords_array(coords, gap)
 
     if isinstance(geometry, (Point, MultiPoint)):
         return geometry
     elif isinstance(geometry, (Polygon, LineString, LinearRing)):
-        geometry_simplified = geometry.simplify(simplify_distance)
+        with instrument.stage("interpolate.simplify", geometry):
+            geometry_simplified = simplify_cache.simplify(geometry, simplify_distance)
         if isinstance(geometry, Polygon):
-            exterior_coords = list(geometry_simplified.exterior.coords)
-            interior_coords_list = [list(interior.coords) for interior in geometry_simplified.interiors]
+            exterior_coords = geometry_simplified.exterior.coords
+            interior_coords_list = [interior.coords for interior in geometry_simplified.interiors]
             interpolated_exterior = interpolate_coords(exterior_coords)
             interpolated_interiors = [interpolate_coords(interior_coords) for interior_coords in interior_coords_list]
             return Polygon(shell=interpolated_exterior, holes=interpolated_interiors)
         else:  # LineString or LinearRing
-            coords = list(geometry_simplified.coords)
-            return type(geometry)(interpolate_coords(coords))
+            return type(geometry)(interpolate_coords(geometry_simplified.coords))
     elif isinstance(geometry, (MultiPolygon, MultiLineString, GeometryCollection)):
-        geoms = list(geometry)
-        interpolated_geoms = [interpolate(geom, gap) for geom in geoms]
+        interpolated_geoms = [interpolate(geom, gap, simplify_distance) for geom in geometry.geoms]
         return type(geometry)(interpolated_geoms)
 
     return geometry  # return origin geometry if not match any type
+
+
+def interpolate_many(geometries: Union[Sequence[BaseGeometry], GeometryBatch],
+                     gap: Union[float, Sequence[float]],
+                     simplify_distance: float = 1e-6) -> Union[List[BaseGeometry], GeometryBatch]:
+    """
+    interpolate every geometry, gap is a scalar or one gap per geometry.
+    the rings of all geometries are densified together in one flat buffer.
+    a GeometryBatch is densified as it is without simplifying and a GeometryBatch is returned
+    """
+    gaps = np.broadcast_to(np.asarray(gap, dtype=np.float64), (len(geometries),))
+    if isinstance(geometries, GeometryBatch):
+        ring_counts = np.diff(geometries.part_offsets[geometries.geometry_offsets])
+        with instrument.stage("interpolate.densify", geometries.coords):
+            return geometries.with_coords(*interpolate_rings(geometries.coords, geometries.ring_offsets,
+                                                             np.repeat(gaps, ring_counts)))
+    simplified = [_simplify_parts(geometry, simplify_distance) for geometry in geometries]
+
+    rings: List[np.ndarray] = []
+    ring_counts = np.zeros(len(simplified), dtype=np.int64)
+    for i, geometry in enumerate(simplified):
+        ring_count_before = len(rings)
+        _collect_rings(geometry, rings)
+        ring_counts[i] = len(rings) - ring_count_before
+    if not rings:
+        return list(simplified)
+
+    ring_offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    ring_offsets[1:] = np.cumsum([len(ring) for ring in rings])
+    coords = np.concatenate(rings)
+    with instrument.stage("interpolate.densify", coords):
+        coords, new_ring_offsets = interpolate_rings(coords, ring_offsets, np.repeat(gaps, ring_counts))
+    new_rings = iter(np.split(coords, new_ring_offsets[1:-1]))
+    return [_rebuild_from_rings(geometry, new_rings) for geometry in simplified]
+
+
+def _simplify_parts(geometry: BaseGeometry, simplify_distance: float) -> BaseGeometry:
+    """
+    simplify every polygon and line of geometry the way interpolate does when it recurses into parts
+    """
+    if geometry.is_empty:
+        return geometry
+    if isinstance(geometry, (Polygon, LineString, LinearRing)):
+        with instrument.stage("interpolate.simplify", geometry):
+            return simplify_cache.simplify(geometry, simplify_distance)
+    elif isinstance(geometry, (MultiPolygon, MultiLineString, GeometryCollection)):
+        return type(geometry)([_simplify_parts(sub_geometry, simplify_distance) for sub_geometry in geometry.geoms])
+    return geometry
+
+
+def _collect_rings(geometry: BaseGeometry, rings: List[np.ndarray]) -> None:
+    if geometry.is_empty or isinstance(geometry, (Point, MultiPoint)):
+        return
+    if isinstance(geometry, Polygon):
+        rings.append(np.asarray(geometry.exterior.coords)[:, :2])
+        rings.extend(np.asarray(interior.coords)[:, :2] for interior in geometry.interiors)
+    elif isinstance(geometry, (LineString, LinearRing)):
+        rings.append(np.asarray(geometry.coords)[:, :2])
+    elif isinstance(geometry, (MultiPolygon, MultiLineString, GeometryCollection)):
+        for sub_geometry in geometry.geoms:
+            _collect_rings(sub_geometry, rings)
+
+
+def _rebuild_from_rings(geometry: BaseGeometry, rings) -> BaseGeometry:
+    """
+    consume the rings _collect_rings took from geometry, in the same order
+    """
+    if geometry.is_empty or isinstance(geometry, (Point, MultiPoint)):
+        return geometry
+    if isinstance(geometry, Polygon):
+        shell = next(rings)
+        return Polygon(shell=shell, holes=[next(rings) for _ in geometry.interiors])
+    elif isinstance(geometry, (LineString, LinearRing)):
+        return type(geometry)(next(rings))
+    elif isinstance(geometry, (MultiPolygon, MultiLineString, GeometryCollection)):
+        return type(geometry)([_rebuild_from_rings(sub_geometry, rings) for sub_geometry in geometry.geoms])
+    return geometry
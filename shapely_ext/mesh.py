@@ -1,22 +1,300 @@
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Tuple, Optional, Iterable, Iterator, Union
 
 import numpy as np
-from scipy.spatial import Delaunay
 from shapely.geometry import Polygon
+from shapely.wkb import loads as wkb_loads
 
-from shapely_ext.interpolate import interpolate
+from shapely_ext import simplify_cache, instrument
+from shapely_ext.batch import GeometryBatch
+from shapely_ext.index import GridIndex
+from shapely_ext.interpolate import interpolate_coords_array, interpolate_rings
+from shapely_ext.util import contains_points
+
+
+class TriMesh:
+    """
+    triangle mesh as a shared (V, 2) vertex array and a (T, 3) int32 face array,
+    per-face areas and centroids are computed on first access and Polygons only when asked for
+    """
+
+    def __init__(self, vertices: np.ndarray, faces: np.ndarray):
+        self.vertices = vertices
+        self.faces = faces.astype(np.int32, copy=False)
+        self._areas: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+
+    def __len__(self):
+        return len(self.faces)
+
+    @property
+    def areas(self) -> np.ndarray:
+        if self._areas is None:
+            tri_coords = self.vertices[self.faces]
+            edges1 = tri_coords[:, 1] - tri_coords[:, 0]
+            edges2 = tri_coords[:, 2] - tri_coords[:, 0]
+            self._areas = np.abs(edges1[:, 0] * edges2[:, 1] - edges1[:, 1] * edges2[:, 0]) / 2
+        return self._areas
+
+    @property
+    def centroids(self) -> np.ndarray:
+        if self._centroids is None:
+            self._centroids = self.vertices[self.faces].mean(axis=1)
+        return self._centroids
+
+    @property
+    def min_angles(self) -> np.ndarray:
+        """
+        smallest inner angle of every face in degree
+        """
+        tri_coords = self.vertices[self.faces]
+        edge_lens = np.stack([np.linalg.norm(tri_coords[:, (i + 1) % 3] - tri_coords[:, (i + 2) % 3], axis=1)
+                              for i in range(3)], axis=1)
+        # the smallest angle is opposite to the shortest edge
+        edge_lens.sort(axis=1)
+        shortest, middle, longest = edge_lens[:, 0], edge_lens[:, 1], edge_lens[:, 2]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cos_vals = (middle ** 2 + longest ** 2 - shortest ** 2) / (2 * middle * longest)
+        return np.degrees(np.arccos(np.clip(np.nan_to_num(cos_vals, nan=1), -1, 1)))
+
+    def polygons(self) -> List[Polygon]:
+        return list(map(lambda tri_coords: Polygon(tri_coords), self.vertices[self.faces]))
 
 
 class TriMesher:
-    def __init__(self, interpolate_distance: float):
+    MAX_REFINE_ITERATIONS = 64
+
+    def __init__(self, interpolate_distance: float, simplify_distance: float = 1e-6,
+                 constrained: bool = False, steiner_points: bool = False,
+                 max_area: Optional[float] = None, min_angle_degree: Optional[float] = None,
+                 target_count: Optional[int] = None):
+        """
+        constrained mode triangulates the interpolated exterior and interior rings together and drops triangles
+        whose centroid is outside the polygon, so concave polygons and holes are respected as long as
+        interpolate_distance is small against the features of the polygon.
+        steiner_points adds a grid of interior points every interpolate_distance, only in constrained mode.
+
+        max_area, min_angle_degree and target_count turn on refinement, which implies constrained mode:
+        points are added only where triangles are too large or too thin, largest first,
+        until every triangle is fine or the mesh has target_count triangles.
+        with only target_count, the largest triangles are refined until the count is reached.
+        min_angle_degree up to about 20 is reached unless the polygon itself has sharper corners,
+        without it the angles are kept reasonable but not guaranteed
+        """
         self._interpolate_distance = interpolate_distance
+        self._simplify_distance = simplify_distance
+        self._max_area = max_area
+        self._min_angle_degree = min_angle_degree
+        self._target_count = target_count
+        self._refining = max_area is not None or min_angle_degree is not None or target_count is not None
+        self._constrained = constrained or self._refining
+        self._steiner_points = steiner_points
 
     def mesh(self, polygon: Polygon) -> List[Polygon]:
+        return self.mesh_arrays(polygon).polygons()
+
+    def mesh_many(self, polygons: Union[Iterable[Polygon], GeometryBatch], workers: Optional[int] = None,
+                  chunksize: int = 16) -> List[TriMesh]:
+        return list(self.iter_mesh_many(polygons, workers=workers, chunksize=chunksize))
+
+    def iter_mesh_many(self, polygons: Union[Iterable[Polygon], GeometryBatch], workers: Optional[int] = None,
+                       chunksize: int = 16) -> Iterator[TriMesh]:
+        """
+        yield the mesh of every polygon in input order. with workers, chunks of polygons are sent as WKB to
+        a process pool and at most two chunks per worker are in flight, so polygons are consumed lazily.
+        the polygons of a GeometryBatch are built one at a time when they are meshed
+        """
+        if not workers or workers <= 1:
+            yield from map(self.mesh_arrays, polygons)
+            return
+
+        polygons = iter(polygons)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = [polygon.wkb for polygon in islice(polygons, chunksize)]
+                    if not chunk:
+                        break
+                    pending.append(executor.submit(_mesh_wkb_chunk, self, chunk))
+                if not pending:
+                    return
+                for vertices, faces in pending.popleft().result():
+                    yield TriMesh(vertices, faces)
+
+    def mesh_arrays(self, polygon: Polygon) -> TriMesh:
         if not isinstance(polygon, Polygon):
             raise NotImplementedError("only polygon can be meshed")
-        interpolated_polygon = interpolate(polygon, gap=self._interpolate_distance)
-        exterior_coords = np.array(list(interpolated_polygon.exterior.coords))
-        delaunay = Delaunay(exterior_coords)
-        mesh_faces: List[Polygon] = list(
-            map(lambda tri_coords: Polygon(tri_coords), exterior_coords[delaunay.simplices]))
-        return mesh_faces
+        with instrument.stage("mesh.simplify", polygon):
+            simplified_polygon = simplify_cache.simplify(polygon, self._simplify_distance)
+        if self._refining:
+            with instrument.stage("mesh.refine", simplified_polygon):
+                return self._refine(simplified_polygon)
+        if self._constrained:
+            return TriMesh(*self._constrained_triangulate(simplified_polygon))
+
+        with instrument.stage("mesh.interpolate", simplified_polygon.exterior):
+            exterior_coords = interpolate_coords_array(np.asarray(simplified_polygon.exterior.coords),
+                                                       gap=self._interpolate_distance)
+        with instrument.stage("mesh.delaunay", exterior_coords):
+            faces = _delaunay_faces(exterior_coords)
+        return TriMesh(exterior_coords, faces)
+
+    def _constrained_triangulate(self, polygon: Polygon) -> Tuple[np.ndarray, np.ndarray]:
+        vertices, _ = self._get_boundary_vertices(polygon)
+        if self._steiner_points:
+            vertices = np.concatenate((vertices, self._get_steiner_points(polygon)))
+        return vertices, self._triangulate_inside(polygon, vertices)
+
+    def _get_boundary_vertices(self, polygon: Polygon) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        interpolated vertices of all rings without their closing coordinates, and the offset of every ring
+        """
+        rings = [np.asarray(polygon.exterior.coords)[:, :2]]
+        rings.extend(np.asarray(interior.coords)[:, :2] for interior in polygon.interiors)
+        ring_offsets = np.concatenate(([0], np.cumsum([len(ring) for ring in rings])))
+        coords = np.concatenate(rings)
+        with instrument.stage("mesh.interpolate", coords):
+            coords, ring_offsets = interpolate_rings(coords, ring_offsets, self._interpolate_distance)
+        # the closing coordinate of every ring duplicates its first one
+        vertices = np.delete(coords, ring_offsets[1:] - 1, axis=0)
+        return vertices, ring_offsets - np.arange(len(ring_offsets))
+
+    @staticmethod
+    def _triangulate_inside(polygon: Polygon, vertices: np.ndarray) -> np.ndarray:
+        with instrument.stage("mesh.delaunay", vertices):
+            tri_mesh = TriMesh(vertices, _delaunay_faces(vertices))
+        # points on a straight boundary can leave flat faces along it
+        with instrument.stage("mesh.filter_inside", tri_mesh.centroids):
+            is_kept = contains_points(polygon, tri_mesh.centroids) & (tri_mesh.min_angles > 1e-6)
+        return tri_mesh.faces[is_kept]
+
+    def _refine(self, polygon: Polygon) -> TriMesh:
+        """
+        delaunay refinement in the way of Ruppert: circumcenters of bad triangles are inserted largest first,
+        a circumcenter lying in the diametral circle of a boundary segment splits that segment instead
+        """
+        vertices, ring_offsets = self._get_boundary_vertices(polygon)
+        segment_starts = np.arange(len(vertices))
+        segment_ends = segment_starts + 1
+        segment_ends[ring_offsets[1:] - 1] = ring_offsets[:-1]
+        segments = np.stack([segment_starts, segment_ends], axis=1)
+        if self._steiner_points:
+            vertices = np.concatenate((vertices, self._get_steiner_points(polygon)))
+
+        tri_mesh = TriMesh(vertices, self._triangulate_inside(polygon, vertices))
+        for _ in range(self.MAX_REFINE_ITERATIONS):
+            bad_faces = self._get_bad_faces(tri_mesh)
+            if len(bad_faces) == 0:
+                break
+
+            # a boundary segment missing from the triangulation is encroached by some vertex
+            _, encroached_segments = self._get_encroachments(vertices, segments, vertices, exclude_ends=True)
+            if len(encroached_segments) > 0:
+                centers = np.empty((0, 2))
+                encroaching = np.empty(0, dtype=np.int64)
+            else:
+                centers, radii = self._get_circumcircles(tri_mesh, bad_faces)
+                centers = centers[self._get_uncrowded_indices(centers, radii)]
+                encroaching, encroached_segments = self._get_encroachments(vertices, segments, centers)
+            is_inserted = np.ones(len(centers), dtype=bool)
+            is_inserted[encroaching] = False
+            is_inserted[is_inserted] = contains_points(polygon, centers[is_inserted])
+            if not is_inserted.any() and len(encroached_segments) == 0:
+                break
+
+            split_segments = segments[encroached_segments]
+            midpoints = (vertices[split_segments[:, 0]] + vertices[split_segments[:, 1]]) / 2
+            midpoint_indices = len(vertices) + is_inserted.sum() + np.arange(len(midpoints))
+            segments = np.concatenate((np.delete(segments, encroached_segments, axis=0),
+                                       np.stack([split_segments[:, 0], midpoint_indices], axis=1),
+                                       np.stack([midpoint_indices, split_segments[:, 1]], axis=1)))
+            vertices = np.concatenate((vertices, centers[is_inserted], midpoints))
+            tri_mesh = TriMesh(vertices, self._triangulate_inside(polygon, vertices))
+        return tri_mesh
+
+    def _get_bad_faces(self, tri_mesh: TriMesh) -> np.ndarray:
+        """
+        indices of faces to refine, largest first and no more than target_count leaves room for
+        """
+        is_bad = np.zeros(len(tri_mesh), dtype=bool)
+        if self._max_area is not None:
+            is_bad |= tri_mesh.areas > self._max_area
+        if self._min_angle_degree is not None:
+            is_bad |= tri_mesh.min_angles < self._min_angle_degree
+        if self._max_area is None and self._min_angle_degree is None:
+            is_bad[:] = True
+
+        bad_faces = np.flatnonzero(is_bad)
+        bad_faces = bad_faces[np.argsort(-tri_mesh.areas[bad_faces], kind="stable")]
+        if self._target_count is not None:
+            # every inserted point adds about two triangles
+            room = self._target_count - len(tri_mesh)
+            bad_faces = bad_faces[:max(room // 2, 1) if room > 0 else 0]
+        return bad_faces
+
+    @staticmethod
+    def _get_circumcircles(tri_mesh: TriMesh, face_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        a, b, c = (tri_mesh.vertices[tri_mesh.faces[face_indices, i]] for i in range(3))
+        b_rel, c_rel = b - a, c - a
+        denominators = 2 * (b_rel[:, 0] * c_rel[:, 1] - b_rel[:, 1] * c_rel[:, 0])
+        b_sq, c_sq = (b_rel ** 2).sum(axis=1), (c_rel ** 2).sum(axis=1)
+        center_offsets = np.stack([c_rel[:, 1] * b_sq - b_rel[:, 1] * c_sq,
+                                   b_rel[:, 0] * c_sq - c_rel[:, 0] * b_sq], axis=1) / denominators[:, None]
+        return a + center_offsets, np.linalg.norm(center_offsets, axis=1)
+
+    @staticmethod
+    def _get_uncrowded_indices(centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """
+        drop every center closer than half a radius to a center that comes before it
+        """
+        half_radii = radii / 2
+        index = GridIndex(np.concatenate((centers - half_radii[:, None], centers + half_radii[:, None]), axis=1))
+        query_idx, item_idx = index.query_bulk(index.bounds)
+        is_earlier = item_idx < query_idx
+        query_idx, item_idx = query_idx[is_earlier], item_idx[is_earlier]
+        distances = np.linalg.norm(centers[query_idx] - centers[item_idx], axis=1)
+        is_crowded = np.zeros(len(centers), dtype=bool)
+        is_crowded[query_idx[distances < np.minimum(half_radii[query_idx], half_radii[item_idx])]] = True
+        return np.flatnonzero(~is_crowded)
+
+    @staticmethod
+    def _get_encroachments(vertices: np.ndarray, segments: np.ndarray, points: np.ndarray,
+                           exclude_ends: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        indices of points lying in the diametral circle of any segment, and indices of those segments.
+        with exclude_ends, points are vertices and a segment is not encroached by its own ends
+        """
+        midpoints = (vertices[segments[:, 0]] + vertices[segments[:, 1]]) / 2
+        half_lengths = np.linalg.norm(vertices[segments[:, 1]] - vertices[segments[:, 0]], axis=1) / 2
+        radii = half_lengths[:, None]
+        index = GridIndex(np.concatenate((midpoints - radii, midpoints + radii), axis=1))
+        point_idx, segment_idx = index.query_bulk(np.concatenate((points, points), axis=1))
+        if exclude_ends:
+            is_end = (segments[segment_idx, 0] == point_idx) | (segments[segment_idx, 1] == point_idx)
+            point_idx, segment_idx = point_idx[~is_end], segment_idx[~is_end]
+        is_inside = np.linalg.norm(points[point_idx] - midpoints[segment_idx], axis=1) < half_lengths[segment_idx]
+        return np.unique(point_idx[is_inside]), np.unique(segment_idx[is_inside])
+
+    def _get_steiner_points(self, polygon: Polygon) -> np.ndarray:
+        """
+        grid points inside polygon, at least half of interpolate_distance away from its boundary
+        """
+        gap = self._interpolate_distance
+        minx, miny, maxx, maxy = polygon.bounds
+        xs, ys = np.meshgrid(np.arange(minx + gap / 2, maxx, gap), np.arange(miny + gap / 2, maxy, gap))
+        grid_points = np.stack([xs.ravel(), ys.ravel()], axis=1)
+        return grid_points[contains_points(polygon.buffer(-gap / 2), grid_points)]
+
+
+def _delaunay_faces(points: np.ndarray) -> np.ndarray:
+    # scipy takes hundreds of milliseconds to import, it is only loaded once something is meshed
+    from scipy.spatial import Delaunay
+    return Delaunay(points).simplices
+
+
+def _mesh_wkb_chunk(mesher: TriMesher, polygon_wkbs: List[bytes]) -> List[Tuple[np.ndarray, np.ndarray]]:
+    tri_meshes = [mesher.mesh_arrays(wkb_loads(polygon_wkb)) for polygon_wkb in polygon_wkbs]
+    return [(tri_mesh.vertices, tri_mesh.faces) for tri_mesh in tri_meshes]
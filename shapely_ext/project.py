@@ -1,26 +1,42 @@
 import math
 from copy import deepcopy
-from typing import Union, Optional, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union, Optional, List, Tuple, Sequence, Dict
 
-from shapely.geometry import Polygon, LineString, LinearRing, Point
+import numpy as np
+from shapely.geometry import Polygon, LineString, LinearRing, Point, MultiPolygon
 from shapely.geometry.base import BaseGeometry
 from shapely.ops import nearest_points
+from shapely.prepared import prep
+from shapely.wkb import loads as wkb_loads
 
+from shapely_ext import simplify_cache, instrument
 from shapely_ext.geometry.vector_2d import Vector2D
+from shapely_ext.index import RayCaster, get_segments, as_xy
 
 
 class Projector:
+    ENGINES = ("python", "numpy")
+
     def __init__(
             self,
             geom: Union[Polygon, LineString, LinearRing, Point],
             projecting_vector: Vector2D,
             max_projecting_length: float = 1e6,
             eps: float = 1e-6,
+            engine: str = "python",
     ):
-        self._geom = geom.simplify(eps)
+        """
+        engine "numpy" casts the rays of all vertices at once instead of one shapely ray per vertex
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"engine should be one of {self.ENGINES}, got {engine}")
+        with instrument.stage("project.simplify", geom):
+            self._geom = simplify_cache.simplify(geom, eps)
         self._projecting_vector = projecting_vector
         self._max_projecting_length = max_projecting_length
         self._eps = eps
+        self._engine = engine
 
     def _get_coords(self, geom: BaseGeometry):
         if isinstance(geom, Polygon):
@@ -31,20 +47,52 @@ class Projector:
         other_point = projecting_vector.multiply(self._max_projecting_length).apply(point)
         return geom.intersection(LineString([point, other_point])).length < self._eps
 
-    def project_onto(self, other_geom: BaseGeometry):
+    def project_onto(self, other_geom: Union[BaseGeometry, "ProjectionTarget"]):
+        """
+        other_geom can be a ProjectionTarget built with the same projecting vector, max_projecting_length and eps,
+        to reuse its precomputation.
+        a vertex of geom that a coord of other_geom was projected onto projects back onto that coord, unless its ray
+        hits other_geom at least eps before. the ray only grazes the coord, so otherwise rounding would decide
+        whether it is hit, differently in either engine
+        """
+        target: Optional[ProjectionTarget] = None
+        if isinstance(other_geom, ProjectionTarget):
+            target, other_geom = other_geom, other_geom.geom
+            if target.projecting_vector != self._projecting_vector:
+                raise ValueError("target is built with another projecting vector")
+            if (target.max_projecting_length != self._max_projecting_length
+                    or target.eps != self._eps):
+                raise ValueError("target is built with another max_projecting_length or eps")
+            if not target.is_reachable_from(self._geom):
+                return None
+
         if isinstance(self._geom, Point):
             return self.get_projection_point(self._geom, other_geom, self._projecting_vector)
 
-        geom = self._insert_other_geom_projections_into_geom(other_geom, self._projecting_vector.reverse(), self._geom)
+        with instrument.stage("project.insert_projections", other_geom):
+            geom, sources = self._insert_projections_into_geom(other_geom, self._projecting_vector.reverse(),
+                                                               self._geom)
 
-        points = [Point(coord) for coord in self._get_coords(geom)]
-        optional_projecting_points: List[Optional[Point]] = []
-        for point in points:
-            if self._is_facing_point(point, self._projecting_vector, geom):
-                projecting_point = self.get_projection_point(point, other_geom, self._projecting_vector)
-                optional_projecting_points.append(projecting_point)
-            else:
-                optional_projecting_points.append(None)
+        if self._engine == "numpy":
+            other_caster = (target.ray_caster if target is not None
+                            else self._get_ray_caster(other_geom, self._projecting_vector))
+            with instrument.stage("project.find_projecting_points", geom):
+                optional_projecting_points = self._get_optional_projecting_points_with_numpy(geom, other_geom,
+                                                                                             other_caster, sources)
+        else:
+            with instrument.stage("project.find_projecting_points", geom):
+                points = [Point(coord) for coord in self._get_coords(geom)]
+                optional_projecting_points: List[Optional[Point]] = []
+                for point in points:
+                    if self._is_facing_point(point, self._projecting_vector, geom):
+                        projecting_point = self.get_projection_point(point, other_geom, self._projecting_vector)
+                        source = sources.get(point.coords[0][:2])
+                        if source is not None and (projecting_point is None or point.distance(projecting_point)
+                                                   > point.distance(Point(source)) - self._eps):
+                            projecting_point = Point(source)
+                        optional_projecting_points.append(projecting_point)
+                    else:
+                        optional_projecting_points.append(None)
 
         # find consecutive projecting points
         projecting_points = self.find_consecutive_projecting_points(
@@ -56,15 +104,125 @@ class Projector:
             return projecting_points[0]
         return None
 
+    def _get_ray_caster(self, target_geom: BaseGeometry, projecting_vector: Vector2D) -> RayCaster:
+        with instrument.stage("project.build_ray_caster", target_geom):
+            return RayCaster(*get_segments(target_geom), direction=projecting_vector,
+                             max_length=self._max_projecting_length * projecting_vector.length)
+
+    def _get_optional_projecting_points_with_numpy(self, geom, other_geom, other_caster: RayCaster,
+                                                   sources: Dict[Tuple[float, float], Tuple[float, float]]
+                                                   ) -> List[Optional[Point]]:
+        coords = as_xy(self._get_coords(geom))
+
+        # a vertex faces other_geom if its ray does not run through geom itself
+        ray_idx, _, _, near, far = self._get_ray_caster(geom, self._projecting_vector).candidate_hits(coords)
+        blocked_length = far if isinstance(geom, (Polygon, MultiPolygon)) else far - near
+        is_facing = np.bincount(ray_idx[blocked_length >= self._eps], minlength=len(coords)) == 0
+
+        hits = other_caster.candidate_hits(coords)
+        distances, _, _ = other_caster.cast(coords, hits)
+        if isinstance(other_geom, (Polygon, MultiPolygon)):
+            distances[other_caster.count_crossings(coords, hits) % 2 == 1] = 0
+        has_projection = is_facing & np.isfinite(distances)
+        projecting_coords = other_caster.points_at(coords, np.where(has_projection, distances, 0))
+
+        # vertices with a source coord project back onto it, see project_onto
+        source_idx = [i for i, coord in enumerate(coords.tolist()) if tuple(coord) in sources]
+        if source_idx:
+            source_idx = np.array(source_idx)
+            source_coords = np.array([sources[tuple(coord)] for coord in coords[source_idx].tolist()])
+            offsets = source_coords - coords[source_idx]
+            source_distances = np.sqrt(offsets[:, 0] ** 2 + offsets[:, 1] ** 2)
+            is_source_nearer = ~(distances[source_idx] <= source_distances - self._eps)
+            is_source_nearer &= is_facing[source_idx]
+            projecting_coords[source_idx[is_source_nearer]] = source_coords[is_source_nearer]
+            has_projection[source_idx[is_source_nearer]] = True
+        return [Point(coord) if projected else None
+                for coord, projected in zip(projecting_coords.tolist(), has_projection.tolist())]
+
     def _insert_other_geom_projections_into_geom(self, other_geom, projecting_vector, geom):
+        return self._insert_projections_into_geom(other_geom, projecting_vector, geom)[0]
+
+    def _insert_projections_into_geom(self, other_geom, projecting_vector, geom):
+        """
+        geom with the projections of the coords of other_geom inserted, and the sources of its vertices:
+        the nearest coord of other_geom projected onto each vertex, inserted or landing within eps of it
+        """
+        if self._engine == "numpy":
+            return self._insert_projections_into_geom_with_numpy(other_geom, projecting_vector, geom)
+
         other_geom_coords = self._get_coords(other_geom)
         geom_coords = self._get_coords(geom)
         geom_coords_copy = deepcopy(geom_coords)
+        landed_coords, source_coords = [], []
         for coord_of_other in other_geom_coords:
             projection_point = self.get_projection_point(Point(coord_of_other), geom, projecting_vector)
             if projection_point:
-                self._insert_into_coords(geom_coords_copy, list(projection_point.coords)[0])
-        return self._construct_by_coords_according_to(geom, geom_coords_copy)
+                landed_coord = self._insert_into_coords(geom_coords_copy, list(projection_point.coords)[0],
+                                                        self._eps)
+                if landed_coord is not None:
+                    landed_coords.append(landed_coord[:2])
+                    source_coords.append(coord_of_other[:2])
+        return (self._construct_by_coords_according_to(geom, geom_coords_copy),
+                self._get_sources(landed_coords, source_coords))
+
+    def _insert_projections_into_geom_with_numpy(self, other_geom, projecting_vector, geom):
+        """
+        project all coords of other_geom at once, then merge the projections sorted by edge and position on edge
+        """
+        other_geom_coords = as_xy(self._get_coords(other_geom))
+        geom_coords = as_xy(self._get_coords(geom))
+        caster = self._get_ray_caster(geom, projecting_vector)
+        hits = caster.candidate_hits(other_geom_coords)
+        distances, segment_indices, params = caster.cast(other_geom_coords, hits)
+
+        # only projections onto the coords being rebuilt count, segments of interiors come after them
+        is_inserted = np.isfinite(distances) & (segment_indices < len(geom_coords) - 1)
+        if isinstance(geom, Polygon):
+            is_inserted &= caster.count_crossings(other_geom_coords, hits) % 2 == 0
+        source_coords = other_geom_coords[is_inserted]
+        segment_indices, params = segment_indices[is_inserted], params[is_inserted]
+        segment_vectors = geom_coords[segment_indices + 1] - geom_coords[segment_indices]
+        segment_lens = np.sqrt(segment_vectors[:, 0] ** 2 + segment_vectors[:, 1] ** 2)
+        # projections landing on a vertex add nothing
+        is_near_start = params * segment_lens < self._eps
+        is_inside_segment = ~is_near_start & ((1 - params) * segment_lens >= self._eps)
+        landed_coords = geom_coords[np.where(is_near_start, segment_indices, segment_indices + 1)]
+        inside_idx = np.flatnonzero(is_inside_segment)
+        inside_idx = inside_idx[np.lexsort((params[inside_idx], segment_indices[inside_idx]))]
+        # coincident projections, e.g. of the corners of a box projected along its side, add one vertex
+        is_repeated = np.zeros(len(inside_idx), dtype=bool)
+        is_repeated[1:] = ((segment_indices[inside_idx[1:]] == segment_indices[inside_idx[:-1]])
+                           & ((params[inside_idx[1:]] - params[inside_idx[:-1]]) * segment_lens[inside_idx[1:]]
+                              < self._eps))
+        kept_idx = inside_idx[~is_repeated]
+        segment_indices, params = segment_indices[kept_idx], params[kept_idx]
+        inserted_coords = geom_coords[segment_indices] + params[:, None] * segment_vectors[kept_idx]
+        landed_coords[inside_idx] = inserted_coords[np.cumsum(~is_repeated) - 1]
+
+        # every vertex is followed by the sorted projections on the segment starting at it
+        positions = np.arange(len(geom_coords)) + np.concatenate(
+            ([0], np.cumsum(np.bincount(segment_indices, minlength=len(geom_coords) - 1))))
+        merged_coords = np.empty((len(geom_coords) + len(inserted_coords), 2))
+        merged_coords[positions] = geom_coords
+        is_vertex = np.zeros(len(merged_coords), dtype=bool)
+        is_vertex[positions] = True
+        merged_coords[~is_vertex] = inserted_coords
+        return (self._construct_by_coords_according_to(geom, merged_coords.tolist()),
+                self._get_sources(landed_coords.tolist(), source_coords.tolist()))
+
+    @staticmethod
+    def _get_sources(landed_coords, source_coords) -> Dict[Tuple[float, float], Tuple[float, float]]:
+        """
+        the nearest source coord of every landed coord
+        """
+        sources: Dict[Tuple[float, float], Tuple[float, float]] = {}
+        for landed_coord, source_coord in zip(landed_coords, source_coords):
+            landed_coord, source_coord = tuple(landed_coord), tuple(source_coord)
+            current = sources.get(landed_coord)
+            if current is None or _distance(landed_coord, source_coord) < _distance(landed_coord, current):
+                sources[landed_coord] = source_coord
+        return sources
 
     def _construct_by_coords_according_to(self, ref_geom, coords):
         if isinstance(ref_geom, Polygon):
@@ -97,13 +255,100 @@ class Projector:
         return projecting_points
 
     @staticmethod
-    def _insert_into_coords(coords: List[Tuple[float, float]], coord: Tuple[float, float]) -> None:
-        for i in range(len(coords)):
+    def _insert_into_coords(coords: List[Tuple[float, float]], coord: Tuple[float, float],
+                            eps: float = 0) -> Optional[Tuple[float, float]]:
+        """
+        insert coord into the first segment of coords it lies on. returns the coord standing for it in coords,
+        the vertex it is within eps of or coord itself, None if it lies on no segment
+        """
+        for i in range(1, len(coords)):
             prev_coord = coords[i - 1]
             cur_coord = coords[i]
             origin_len = math.sqrt((prev_coord[0] - cur_coord[0]) ** 2 + (prev_coord[1] - cur_coord[1]) ** 2)
             segment1_len = math.sqrt((prev_coord[0] - coord[0]) ** 2 + (prev_coord[1] - coord[1]) ** 2)
             segment2_len = math.sqrt((cur_coord[0] - coord[0]) ** 2 + (cur_coord[1] - coord[1]) ** 2)
             if abs(segment1_len + segment2_len - origin_len) < 1e-6:
+                # a projection landing on a vertex adds nothing, the same as in the numpy engine
+                if segment1_len < eps:
+                    return prev_coord
+                if segment2_len < eps:
+                    return cur_coord
                 coords.insert(i, coord)
-                break
+                return coord
+        return None
+
+
+class ProjectionTarget:
+    """
+    other_geom shared by many projections along one projecting vector. its prepared geometry,
+    segment index and rotated frame are built once and reused by every projection onto it
+    """
+
+    def __init__(
+            self,
+            geom: BaseGeometry,
+            projecting_vector: Vector2D,
+            max_projecting_length: float = 1e6,
+            eps: float = 1e-6,
+            engine: str = "numpy",
+    ):
+        self.geom = geom
+        self.projecting_vector = projecting_vector
+        self.max_projecting_length = max_projecting_length
+        self.eps = eps
+        self._engine = engine
+        self._prepared = prep(geom)
+        self.ray_caster = RayCaster(*get_segments(geom), direction=projecting_vector,
+                                    max_length=max_projecting_length * projecting_vector.length)
+
+    def is_reachable_from(self, geom: BaseGeometry) -> bool:
+        """
+        whether geom swept along the projecting vector touches the target at all
+        """
+        hull = geom.convex_hull
+        swept = hull.union(self.projecting_vector.multiply(self.max_projecting_length).apply(hull)).convex_hull
+        return self._prepared.intersects(swept)
+
+    def _get_projector(self, geom: BaseGeometry) -> Projector:
+        return Projector(geom, self.projecting_vector, max_projecting_length=self.max_projecting_length,
+                         eps=self.eps, engine=self._engine)
+
+    def project(self, geom: BaseGeometry) -> Optional[BaseGeometry]:
+        return self._get_projector(geom).project_onto(self)
+
+    def project_many(self, geoms: Sequence[BaseGeometry], workers: Optional[int] = None,
+                     chunksize: int = 64) -> List[Optional[BaseGeometry]]:
+        """
+        project every geom onto the target, results are in input order.
+        with workers, chunks of geoms are projected in a process pool, each process builds the target once
+        """
+        if not workers or workers <= 1:
+            return [self.project(geom) for geom in geoms]
+
+        target_args = (self.geom.wkb, self.projecting_vector.x, self.projecting_vector.y,
+                       self.max_projecting_length, self.eps, self._engine)
+        chunks = [[geom.wkb for geom in geoms[i:i + chunksize]] for i in range(0, len(geoms), chunksize)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_projection_worker,
+                                 initargs=(target_args,)) as executor:
+            return [wkb_loads(result) if result is not None else None
+                    for chunk_results in executor.map(_project_wkb_chunk, chunks)
+                    for result in chunk_results]
+
+
+_worker_target: Optional[ProjectionTarget] = None
+
+
+def _init_projection_worker(target_args):
+    global _worker_target
+    geom_wkb, vector_x, vector_y, max_projecting_length, eps, engine = target_args
+    _worker_target = ProjectionTarget(wkb_loads(geom_wkb), Vector2D(vector_x, vector_y),
+                                      max_projecting_length=max_projecting_length, eps=eps, engine=engine)
+
+
+def _project_wkb_chunk(geom_wkbs: List[bytes]) -> List[Optional[bytes]]:
+    results = [_worker_target.project(wkb_loads(geom_wkb)) for geom_wkb in geom_wkbs]
+    return [result.wkb if result is not None else None for result in results]
+
+
+def _distance(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
+    return math.hypot(coord1[0] - coord2[0], coord1[1] - coord2[1])
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Dict, Optional, Tuple
+
+from shapely.geometry.base import BaseGeometry
+
+
+class SimplifyCache:
+    """
+    LRU cache of simplified geometries keyed on a digest of the input WKB, its type and the tolerance.
+    the type is part of the key because a LinearRing has the WKB of a LineString.
+    the size of an entry is counted as the WKB size of its input plus its result
+    """
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[bytes, str, float], Tuple[BaseGeometry, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def simplify(self, geometry: BaseGeometry, tolerance: float) -> BaseGeometry:
+        wkb = geometry.wkb
+        key = (blake2b(wkb, digest_size=16).digest(), geometry.geom_type, tolerance)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        simplified = geometry.simplify(tolerance)
+        size = len(wkb) + len(simplified.wkb)
+        if size > self._max_bytes:
+            return simplified
+        self._entries[key] = (simplified, size)
+        self._bytes += size
+        while self._bytes > self._max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+        return simplified
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._bytes}
+
+
+_cache: Optional[SimplifyCache] = None
+
+
+def enable(max_bytes: int = 64 * 1024 * 1024) -> None:
+    """
+    share simplified geometries between every module of shapely_ext in this process, replacing any cache before
+    """
+    global _cache
+    _cache = SimplifyCache(max_bytes)
+
+
+def disable() -> None:
+    global _cache
+    _cache = None
+
+
+def is_enabled() -> bool:
+    return _cache is not None
+
+
+def clear() -> None:
+    if _cache is not None:
+        _cache.clear()
+
+
+def stats() -> Dict[str, int]:
+    if _cache is None:
+        return {"hits": 0, "misses": 0, "entries": 0, "bytes": 0}
+    return _cache.stats()
+
+
+def simplify(geometry: BaseGeometry, tolerance: float) -> BaseGeometry:
+    """
+    geometry.simplify(tolerance), served from the shared cache when it is enabled
+    """
+    if _cache is None or geometry.is_empty:
+        return geometry.simplify(tolerance)
+    return _cache.simplify(geometry, tolerance)
@@ -0,0 +1,152 @@
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+from shapely.geometry import Polygon, Point, MultiPoint, LineString, LinearRing, MultiPolygon, MultiLineString, \
+    GeometryCollection
+from shapely.geometry.base import BaseGeometry
+
+from shapely_ext import instrument
+from shapely_ext.batch import GeometryBatch
+from shapely_ext.index import GridIndex
+
+
+def snap_to(geoms: Union[Sequence[BaseGeometry], GeometryBatch],
+            reference_geoms: Sequence[BaseGeometry],
+            tolerance: float,
+            chunksize: int = 100000) -> Union[List[BaseGeometry], GeometryBatch]:
+    """
+    move every vertex of geoms lying within tolerance of reference_geoms onto them, onto the nearest reference vertex
+    if one is within tolerance, otherwise onto the nearest point of the nearest reference segment.
+    the reference is indexed once and the vertices of all geoms are snapped chunksize at a time,
+    so memory stays bounded however many vertices there are. a snapped polygon is repaired by buffer(0),
+    a GeometryBatch is snapped as it is and a GeometryBatch is returned
+    """
+    reference = SnapReference(reference_geoms, tolerance)
+    if isinstance(geoms, GeometryBatch):
+        return geoms.with_coords(reference.snap_coords(geoms.coords, chunksize), geoms.ring_offsets)
+
+    rings: List[np.ndarray] = []
+    for geom in geoms:
+        _collect_rings(geom, rings)
+    if not rings:
+        return list(geoms)
+    ring_ends = np.cumsum([len(ring) for ring in rings])
+    coords = reference.snap_coords(np.concatenate(rings), chunksize)
+    new_rings = iter(np.split(coords, ring_ends[:-1]))
+    return [_construct_by_rings_according_to(geom, new_rings) for geom in geoms]
+
+
+class SnapReference:
+    """
+    vertices and segments of the reference geometries, each indexed by its bounds grown by tolerance,
+    so finding the candidates of a vertex is a point query
+    """
+
+    def __init__(self, reference_geoms: Sequence[BaseGeometry], tolerance: float):
+        self._tolerance = tolerance
+        rings: List[np.ndarray] = []
+        for geom in reference_geoms:
+            _collect_rings(geom, rings)
+        coords = np.concatenate(rings) if rings else np.empty((0, 2))
+        with instrument.stage("snap.index", coords):
+            is_segment_start = np.ones(len(coords), dtype=bool)
+            is_segment_start[np.cumsum([len(ring) for ring in rings], dtype=np.int64) - 1] = False
+            self._segment_starts = coords[is_segment_start]
+            self._segment_ends = coords[np.flatnonzero(is_segment_start) + 1]
+            self._vertices = np.unique(coords, axis=0) if len(coords) > 0 else coords
+
+            grown = np.array([-tolerance, -tolerance, tolerance, tolerance])
+            self._vertex_index = GridIndex(np.concatenate((self._vertices, self._vertices), axis=1) + grown)
+            self._segment_index = GridIndex(
+                np.concatenate((np.minimum(self._segment_starts, self._segment_ends),
+                                np.maximum(self._segment_starts, self._segment_ends)), axis=1) + grown)
+
+    def snap_coords(self, coords: np.ndarray, chunksize: int = 100000) -> np.ndarray:
+        """
+        snapped copy of a (N, 2) coords buffer
+        """
+        result = np.array(coords, dtype=np.float64).reshape(-1, 2)
+        with instrument.stage("snap.vertices", result):
+            for chunk_start in range(0, len(result), chunksize):
+                chunk = result[chunk_start:chunk_start + chunksize]
+                chunk[:] = self._snap_chunk(chunk)
+        return result
+
+    def _snap_chunk(self, coords: np.ndarray) -> np.ndarray:
+        snapped = coords.copy()
+        point_bounds = np.concatenate((coords, coords), axis=1)
+
+        query_idx, vertex_idx = self._vertex_index.query_bulk(point_bounds)
+        candidates = self._vertices[vertex_idx]
+        query_idx, nearest_idx = self._nearest(coords, query_idx, candidates)
+        snapped[query_idx] = candidates[nearest_idx]
+        is_remaining = np.ones(len(coords), dtype=bool)
+        is_remaining[query_idx] = False
+
+        remaining_idx = np.flatnonzero(is_remaining)
+        query_idx, segment_idx = self._segment_index.query_bulk(point_bounds[remaining_idx])
+        query_idx = remaining_idx[query_idx]
+        candidates = self._nearest_segment_points(coords[query_idx], segment_idx)
+        query_idx, nearest_idx = self._nearest(coords, query_idx, candidates)
+        snapped[query_idx] = candidates[nearest_idx]
+        return snapped
+
+    def _nearest(self, coords: np.ndarray, query_idx: np.ndarray,
+                 candidates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        every coord with a candidate within tolerance, and the position of its nearest candidate
+        """
+        offsets = candidates - coords[query_idx]
+        distances = np.sqrt(offsets[:, 0] ** 2 + offsets[:, 1] ** 2)
+        order = np.lexsort((distances, query_idx))
+        order = order[distances[order] <= self._tolerance]
+        first = order[np.unique(query_idx[order], return_index=True)[1]]
+        return query_idx[first], first
+
+    def _nearest_segment_points(self, coords: np.ndarray, segment_idx: np.ndarray) -> np.ndarray:
+        starts = self._segment_starts[segment_idx]
+        vectors = self._segment_ends[segment_idx] - starts
+        squared_lens = vectors[:, 0] ** 2 + vectors[:, 1] ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            params = ((coords - starts) * vectors).sum(axis=1) / squared_lens
+        params = np.clip(np.where(squared_lens > 0, params, 0), 0, 1)
+        return starts + params[:, None] * vectors
+
+
+def _collect_rings(geom: BaseGeometry, rings: List[np.ndarray]) -> None:
+    """
+    xy coords of every ring and line of geom, a point is a ring of one coord
+    """
+    if geom.is_empty:
+        return
+    if isinstance(geom, Polygon):
+        rings.append(np.asarray(geom.exterior.coords)[:, :2])
+        rings.extend(np.asarray(interior.coords)[:, :2] for interior in geom.interiors)
+    elif isinstance(geom, (Point, LineString, LinearRing)):
+        rings.append(np.asarray(geom.coords)[:, :2])
+    elif isinstance(geom, (MultiPoint, MultiPolygon, MultiLineString, GeometryCollection)):
+        for sub_geom in geom.geoms:
+            _collect_rings(sub_geom, rings)
+
+
+def _construct_by_rings_according_to(ref_geom: BaseGeometry, rings) -> BaseGeometry:
+    """
+    consume the rings _collect_rings took from ref_geom, in the same order
+    """
+    geom = _rebuild_from_rings(ref_geom, rings)
+    if isinstance(geom, (Polygon, MultiPolygon)) and not geom.is_valid:
+        return geom.buffer(0)
+    return geom
+
+
+def _rebuild_from_rings(ref_geom: BaseGeometry, rings) -> BaseGeometry:
+    if ref_geom.is_empty:
+        return ref_geom
+    if isinstance(ref_geom, Polygon):
+        shell = next(rings)
+        return Polygon(shell=shell, holes=[next(rings) for _ in ref_geom.interiors])
+    elif isinstance(ref_geom, Point):
+        return Point(next(rings)[0])
+    elif isinstance(ref_geom, (LineString, LinearRing)):
+        return type(ref_geom)(next(rings))
+    return type(ref_geom)([_rebuild_from_rings(sub_geom, rings) for sub_geom in ref_geom.geoms])
@@ -1,17 +1,36 @@
-from typing import List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List, Optional, Sequence, Iterator, Tuple, Union
 
+import numpy as np
 from shapely.geometry import MultiLineString, LineString, Point, MultiPoint, Polygon, MultiPolygon, GeometryCollection, \
     LinearRing
 from shapely.geometry.base import BaseGeometry
 from shapely.ops import unary_union
+from shapely.wkb import loads as wkb_loads
 
+from shapely_ext import backend, instrument
+from shapely_ext.batch import GeometryBatch
 from shapely_ext.func import separate
+from shapely_ext.geometry.vector_2d import Vector2D
+from shapely_ext.index import GridIndex, RayCaster, geometry_bounds, get_segments, as_xy
 
 
 def is_similar(geom1: BaseGeometry, geom2: BaseGeometry, eps: float = 1e-6) -> bool:
     if type(geom1) is not type(geom2):
         return False
 
+    with instrument.stage("is_similar.quick_check", geom1):
+        quick_result = _get_quick_similarity(geom1, geom2, eps)
+    if quick_result is not None:
+        return quick_result
+
+    with instrument.stage("is_similar.overlay", geom1):
+        return _is_similar_by_overlay(geom1, geom2, eps)
+
+
+def _is_similar_by_overlay(geom1: BaseGeometry, geom2: BaseGeometry, eps: float) -> bool:
     if isinstance(geom1, (LineString, MultiLineString, Point, MultiPoint)):
         return (geom1.buffer(eps).contains(geom2)
                 and geom2.buffer(eps).contains(geom1))
@@ -31,12 +50,171 @@ def is_similar(geom1: BaseGeometry, geom2: BaseGeometry, eps: float = 1e-6) -> b
                 and non_polygon_union2.buffer(eps).contains(non_polygon_union1))
 
 
-def flatten(geom: BaseGeometry) -> List[BaseGeometry]:
-    if isinstance(geom, (Polygon, LineString, LinearRing, Point)):
-        return [geom]
-    elif isinstance(geom, (MultiPolygon, MultiLineString, MultiPoint, GeometryCollection)):
-        flattened: List[BaseGeometry] = []
-        for sub_geom in list(geom):
-            flattened.extend(flatten(sub_geom))
-        return flattened
-    return []
+# the discrete hausdorff distance compares every vertex pair, above this it costs more than buffering
+_MAX_HAUSDORFF_VERTEX_PAIRS = 4096
+
+
+def _get_quick_similarity(geom1: BaseGeometry, geom2: BaseGeometry, eps: float) -> Optional[bool]:
+    """
+    answer of is_similar from cheap checks that never disagree with the overlay ones, None if they can not tell.
+    area and bounds differences bound the symmetric difference and the distance from below,
+    so does the distance from vertices to the other geometry, while equal coords need no overlay at all
+    """
+    if eps <= 0 or geom1.is_empty or geom2.is_empty:
+        return None
+    is_areal = isinstance(geom1, (Polygon, MultiPolygon))
+    is_non_areal = isinstance(geom1, (LineString, MultiLineString, Point, MultiPoint))
+    if not (is_areal or is_non_areal or isinstance(geom1, GeometryCollection)):
+        return None
+    if geom1.equals_exact(geom2, 0):
+        return True
+
+    if is_areal and abs(geom1.area - geom2.area) >= eps:
+        return False
+    if is_non_areal and max(abs(bound1 - bound2) for bound1, bound2 in zip(geom1.bounds, geom2.bounds)) > eps:
+        return False
+    if _is_equal_normalized(geom1, geom2):
+        return True
+
+    if (is_non_areal and _count_vertices(geom1) * _count_vertices(geom2) <= _MAX_HAUSDORFF_VERTEX_PAIRS
+            and geom1.hausdorff_distance(geom2) > eps):
+        return False
+    return None
+
+
+def _is_equal_normalized(geom1: BaseGeometry, geom2: BaseGeometry) -> bool:
+    # normalize is only there since shapely 1.8
+    if not hasattr(geom1, "normalize"):
+        return False
+    return geom1.normalize().equals_exact(geom2.normalize(), 0)
+
+
+def _count_vertices(geom: BaseGeometry) -> int:
+    if isinstance(geom, (Point, LineString)):
+        return len(geom.coords)
+    return sum(_count_vertices(sub_geom) for sub_geom in geom.geoms)
+
+
+class GeometryChanges:
+    """
+    result of match_similar. matched and modified are (K, 2) arrays of (old index, new index),
+    added holds indices of new geometries and deleted indices of old ones without counterpart
+    """
+
+    def __init__(self, matched: np.ndarray, modified: np.ndarray, added: np.ndarray, deleted: np.ndarray):
+        self.matched = matched
+        self.modified = modified
+        self.added = added
+        self.deleted = deleted
+
+
+def match_similar(old_geoms: Sequence[BaseGeometry], new_geoms: Sequence[BaseGeometry], eps: float = 1e-6,
+                  workers: Optional[int] = None, chunksize: int = 1024) -> GeometryChanges:
+    """
+    pair every new geometry with a similar old one, among the old geometries whose bounds are within eps.
+    the rest are paired with the unmatched old geometry of the closest bounds as modified, or else added.
+    with workers, is_similar of chunks of candidate pairs runs in a process pool
+    """
+    old_bounds, new_bounds = geometry_bounds(old_geoms), geometry_bounds(new_geoms)
+    new_idx, old_idx = GridIndex(old_bounds).query_bulk(new_bounds + np.array([-eps, -eps, eps, eps]))
+    pairs = list(zip(old_idx.tolist(), new_idx.tolist()))
+    similar = np.zeros(len(pairs), dtype=bool)
+    # with shapely 2 the equal pairs are found in one vectorized call, is_similar would find them the same way
+    is_unknown = np.ones(len(pairs), dtype=bool)
+    if backend.SHAPELY_2 and eps > 0 and pairs:
+        old_candidates = [old_geoms[old_i] for old_i, _ in pairs]
+        is_equal = backend.equals_exact(old_candidates, [new_geoms[new_i] for _, new_i in pairs])
+        is_equal &= ~np.isnan(backend.bounds(old_candidates)[:, 0])
+        similar[is_equal] = True
+        is_unknown = ~is_equal
+    unknown_pairs = [pairs[i] for i in np.flatnonzero(is_unknown)]
+    if not workers or workers <= 1:
+        similar[is_unknown] = [is_similar(old_geoms[old_i], new_geoms[new_i], eps) for old_i, new_i in unknown_pairs]
+    else:
+        similar[is_unknown] = list(_iter_is_similar_in_pool(old_geoms, new_geoms, unknown_pairs, eps, workers,
+                                                            chunksize))
+
+    old_used = np.zeros(len(old_geoms), dtype=bool)
+    new_used = np.zeros(len(new_geoms), dtype=bool)
+    matched = _pair_greedily([pair for pair, is_pair_similar in zip(pairs, similar) if is_pair_similar],
+                             old_used, new_used)
+
+    # the closest bounds go first, pairs are sorted by new then old index for equal distances
+    bounds_distances = np.abs(old_bounds[old_idx] - new_bounds[new_idx]).sum(axis=1)
+    modified = _pair_greedily([pairs[i] for i in np.argsort(bounds_distances, kind="stable")], old_used, new_used)
+    return GeometryChanges(matched, modified, np.flatnonzero(~new_used), np.flatnonzero(~old_used))
+
+
+def _pair_greedily(pairs: List[Tuple[int, int]], old_used: np.ndarray, new_used: np.ndarray) -> np.ndarray:
+    """
+    take every pair whose old and new geometries are both still free, in order, and mark them used
+    """
+    taken: List[Tuple[int, int]] = []
+    for old_i, new_i in pairs:
+        if not old_used[old_i] and not new_used[new_i]:
+            old_used[old_i] = new_used[new_i] = True
+            taken.append((old_i, new_i))
+    return np.array(taken, dtype=np.int64).reshape(-1, 2)
+
+
+def _iter_is_similar_in_pool(old_geoms: Sequence[BaseGeometry], new_geoms: Sequence[BaseGeometry],
+                             pairs: List[Tuple[int, int]], eps: float, workers: int, chunksize: int) -> Iterator[bool]:
+    """
+    is_similar of every pair in order, at most two chunks of WKB pairs per worker are in flight
+    """
+    pairs = iter(pairs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        while True:
+            while len(pending) < workers * 2:
+                chunk = [(old_geoms[old_i].wkb, new_geoms[new_i].wkb) for old_i, new_i in islice(pairs, chunksize)]
+                if not chunk:
+                    break
+                pending.append(executor.submit(_is_similar_wkb_chunk, chunk, eps))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def _is_similar_wkb_chunk(wkb_pairs: List[Tuple[bytes, bytes]], eps: float) -> List[bool]:
+    return [is_similar(wkb_loads(old_wkb), wkb_loads(new_wkb), eps) for old_wkb, new_wkb in wkb_pairs]
+
+
+def flatten(geom: Union[BaseGeometry, GeometryBatch]) -> Union[List[BaseGeometry], GeometryBatch]:
+    """
+    a GeometryBatch is flattened into a GeometryBatch of its non empty parts sharing its buffers
+    """
+    if isinstance(geom, GeometryBatch):
+        return geom.single_parts()
+    if backend.SHAPELY_2:
+        return backend.flatten_parts(geom)
+    return list(iter_flatten(geom))
+
+
+def iter_flatten(geom: BaseGeometry) -> Iterator[BaseGeometry]:
+    """
+    yield the single part geometries of geom in order. nested collections are walked with a stack of
+    part iterators instead of recursion, so depth is not limited and no intermediate list is built
+    """
+    stack: List[Iterator[BaseGeometry]] = [iter([geom])]
+    while stack:
+        sub_geom = next(stack[-1], None)
+        if sub_geom is None:
+            stack.pop()
+        elif isinstance(sub_geom, (Polygon, LineString, LinearRing, Point)):
+            yield sub_geom
+        elif isinstance(sub_geom, (MultiPolygon, MultiLineString, MultiPoint, GeometryCollection)):
+            stack.append(iter(sub_geom.geoms))
+
+
+def contains_points(polygon: BaseGeometry, points: np.ndarray) -> np.ndarray:
+    """
+    vectorized even-odd test of (N, 2) points against a Polygon or MultiPolygon, points on boundary are undefined
+    """
+    points = as_xy(points)
+    if polygon.is_empty or len(points) == 0:
+        return np.zeros(len(points), dtype=bool)
+    minx, _, maxx, _ = polygon.bounds
+    caster = RayCaster(*get_segments(polygon), direction=Vector2D(1, 0),
+                       max_length=maxx - min(minx, points[:, 0].min()) + 1)
+    return caster.count_crossings(points) % 2 == 1
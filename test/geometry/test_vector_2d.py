@@ -137,3 +137,10 @@ class TestVector2D(TestCase):
         vector1 = Vector2D(2, 1)
         reversed_vec = vector1.reverse()
         self.assertEqual(Vector2D(-2, -1), reversed_vec)
+
+    def test_from_xy_unchecked(self):
+        vector = Vector2D._from_xy_unchecked(1, 2.5)
+        self.assertEqual(Vector2D(1, 2.5), vector)
+        self.assertFalse(hasattr(vector, "__dict__"))
+        with self.assertRaises(AttributeError):
+            vector.z = 1
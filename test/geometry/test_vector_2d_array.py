@@ -0,0 +1,80 @@
+import math
+from unittest import TestCase
+
+import numpy as np
+from shapely.geometry import LineString
+
+from shapely_ext.geometry.vector_2d import Vector2D
+from shapely_ext.geometry.vector_2d_array import Vector2DArray
+from test.constant import MATH_EPS
+
+
+class TestVector2DArray(TestCase):
+    def test_construct(self):
+        xy = np.array([[0., 1.], [2., 3.]])
+        vectors = Vector2DArray(xy)
+        self.assertEqual(2, len(vectors))
+        self.assertTrue(np.shares_memory(xy, vectors.xy))
+        self.assertListEqual([0, 2], vectors.x.tolist())
+        self.assertListEqual([1, 3], vectors.y.tolist())
+
+        with self.assertRaises(ValueError):
+            Vector2DArray(np.zeros((2, 3)))
+        with self.assertRaises(ValueError):
+            Vector2DArray(np.zeros(2))
+
+    def test_from_coords(self):
+        vectors = Vector2DArray.from_coords(LineString([(0, 1), (2, 3), (4, 5)]).coords)
+        self.assertEqual(Vector2DArray([[0, 1], [2, 3], [4, 5]]), vectors)
+
+        vectors_3d = Vector2DArray.from_coords([(0, 1, 9), (2, 3, 9)])
+        self.assertEqual(Vector2DArray([[0, 1], [2, 3]]), vectors_3d)
+
+        with self.assertRaises(ValueError):
+            Vector2DArray.from_coords([1, 2])
+
+    def test_from_coordinates(self):
+        vectors = Vector2DArray.from_coordinates([(0, 0), (1, 1)], [(1, 1), (3, 1)])
+        self.assertEqual(Vector2DArray([[1, 1], [2, 0]]), vectors)
+
+    def test_from_vectors_and_getitem(self):
+        vectors = Vector2DArray.from_vectors([Vector2D(1, 2), Vector2D(3, 4)])
+        self.assertEqual(Vector2D(3, 4), vectors[1])
+        self.assertEqual(Vector2DArray([[1, 2]]), vectors[:1])
+        self.assertListEqual([Vector2D(1, 2), Vector2D(3, 4)], list(vectors))
+        self.assertEqual(0, len(Vector2DArray.from_vectors([])))
+
+    def test_length_dot_unit(self):
+        vectors = Vector2DArray([[3, 4], [1, 0]])
+        np.testing.assert_allclose([5, 1], vectors.length)
+        np.testing.assert_allclose([3, 1], vectors.dot(Vector2D(1, 0)))
+        np.testing.assert_allclose([4, 0], vectors.dot(Vector2DArray([[0, 1], [0, 1]])))
+        np.testing.assert_allclose([1, 1], vectors.unit().length)
+        np.testing.assert_allclose([[0.6, 0.8], [1, 0]], vectors.unit().xy)
+        with self.assertRaises(ValueError):
+            Vector2DArray([[0, 0]]).unit()
+        with self.assertRaises(TypeError):
+            vectors.dot((1, 0))
+
+    def test_angles_match_vector_2d(self):
+        rng = np.random.default_rng(0)
+        vectors = Vector2DArray(rng.uniform(-1, 1, (100, 2)))
+        others = Vector2DArray(rng.uniform(-1, 1, (100, 2)))
+        ccw_angles = vectors.angle_ccw_rotating_to(others)
+        angles = vectors.angle_to(others, in_degree=False)
+        for i in range(len(vectors)):
+            self.assertAlmostEqual(vectors[i].angle_ccw_rotating_to(others[i]), ccw_angles[i], delta=MATH_EPS)
+            self.assertAlmostEqual(vectors[i].angle_to(others[i], in_degree=False), angles[i], delta=MATH_EPS)
+
+        self.assertAlmostEqual(315, Vector2DArray([[1, 0]]).angle_ccw_rotating_to(Vector2D(1, -1))[0],
+                               delta=MATH_EPS)
+        self.assertAlmostEqual(math.pi / 4, Vector2DArray([[1, 0]]).angle_to(Vector2D(1, -1), in_degree=False)[0],
+                               delta=MATH_EPS)
+
+    def test_plus_multiply_reverse(self):
+        vectors = Vector2DArray([[1, 2], [3, 4]])
+        self.assertEqual(Vector2DArray([[2, 2], [4, 4]]), vectors.plus(Vector2D(1, 0)))
+        self.assertEqual(Vector2DArray([[2, 4], [6, 8]]), vectors * 2)
+        self.assertEqual(Vector2DArray([[1, 2], [6, 8]]), vectors.multiply([1, 2]))
+        self.assertEqual(Vector2DArray([[-1, -2], [-3, -4]]), vectors.reverse())
+        self.assertEqual(Vector2DArray([[1, 2], [3, 4]]), vectors)
@@ -1,9 +1,12 @@
 import math
 from unittest import TestCase
 
-from shapely.geometry import LineString, Polygon
+import numpy as np
+from shapely import affinity
+from shapely.geometry import LineString, Polygon, Point
 
 from shapely_ext.angle import AngleMeasurer
+from shapely_ext.batch import GeometryBatch
 
 
 class Test(TestCase):
@@ -41,3 +44,69 @@ class Test(TestCase):
         self.assertAlmostEqual(-math.pi / 4,
                                self.angle_measurer.get_polygon_angle_by_bounding_box(polygon4, in_degree=False),
                                delta=1e-6)
+
+    def test_get_straight_line_angles(self):
+        lines = [LineString([(0, 0), (1, 1)]), LineString([(0, 0), (1, 0)]), LineString([(0, 0), (5, 3), (-1, 1)]),
+                 LineString([(0, 0, 1), (0, 1, 2)])]
+        expected = [self.angle_measurer.get_straight_line_angle(line) for line in lines]
+        np.testing.assert_allclose(expected, self.angle_measurer.get_straight_line_angles(lines))
+        np.testing.assert_allclose(np.radians(expected),
+                                   self.angle_measurer.get_straight_line_angles(lines, in_degree=False))
+        self.assertEqual(0, len(self.angle_measurer.get_straight_line_angles([])))
+        with self.assertRaises(ValueError):
+            self.angle_measurer.get_straight_line_angles([LineString([(0, 0), (0, 0)])])
+
+        np.testing.assert_allclose(expected, self.angle_measurer.get_straight_line_angles(
+            GeometryBatch.from_geometries(lines)))
+        with self.assertRaises(ValueError):
+            self.angle_measurer.get_straight_line_angles(GeometryBatch.from_geometries([Point(0, 0)]))
+
+    def test_get_angles_by_coords(self):
+        coords1 = np.array([(0, 0), (0, 0), (1, 1), (0, 0)])
+        coords2 = np.array([(1, 1), (1, 0), (0, 0), (0, -1)])
+        np.testing.assert_allclose([45, 0, 45, 90], self.angle_measurer.get_angles_by_coords(coords1, coords2))
+        with self.assertRaises(ValueError):
+            self.angle_measurer.get_angles_by_coords(coords1, coords1)
+
+    def test_get_polygon_angles_by_bounding_box(self):
+        l_shape = Polygon([(0, 0), (10, 0), (10, 6), (5, 6), (5, 3), (0, 3)])
+        polygons = [affinity.rotate(l_shape, angle) for angle in range(-180, 180, 7)]
+        polygons += [Polygon([(0, 0), (100, 0), (100, 10), (0, 10)]), Polygon([(0, 0), (10, 0), (10, 100), (0, 100)]),
+                     Polygon([(1, 0), (11, -10), (10, -11), (0, -1)])]
+        expected = [self.angle_measurer.get_polygon_angle_by_bounding_box(polygon) for polygon in polygons]
+        result = self.angle_measurer.get_polygon_angles_by_bounding_box(polygons)
+        differences = np.abs(np.array(expected) - result)
+        # -90 and 90 are the same direction
+        np.testing.assert_allclose(0, np.minimum(differences, 180 - differences), atol=1e-6)
+
+        measurer = AngleMeasurer()
+        measurer.BATCH_SIZE = 4
+        np.testing.assert_allclose(result, measurer.get_polygon_angles_by_bounding_box(polygons))
+        result = self.angle_measurer.get_polygon_angles_by_bounding_box([Polygon(), Point(0, 0).buffer(1), l_shape])
+        self.assertTrue(np.isnan(result[0]))
+        self.assertAlmostEqual(0, result[2])
+
+        batch = GeometryBatch.from_geometries([Polygon(), Point(0, 0).buffer(1), l_shape] + polygons)
+        np.testing.assert_allclose(np.concatenate((result, measurer.get_polygon_angles_by_bounding_box(polygons))),
+                                   measurer.get_polygon_angles_by_bounding_box(batch))
+
+    def test_get_polygon_angles_by_bounding_box_on_equal_areas(self):
+        # every edge of these hulls gives a rectangle of the same area, up to rounding
+        rng = np.random.default_rng(0)
+        polygons = [Polygon([(0, 0), (2, 0), (2, 2), (0, 2)]), Polygon([(0, 0), (4, 0), (2, 3)]),
+                    affinity.rotate(Polygon([(0, 0), (2, 0), (2, 2), (0, 2)]), 30)]
+        polygons += [Polygon(rng.uniform(0, 10, (3, 2))) for _ in range(300)]
+        polygons = [polygon for polygon in polygons if polygon.area > 1e-3]
+        expected = np.array([self.angle_measurer.get_polygon_angle_by_bounding_box(polygon) for polygon in polygons])
+        for geoms in [polygons, GeometryBatch.from_geometries(polygons)]:
+            differences = np.abs(expected - self.angle_measurer.get_polygon_angles_by_bounding_box(geoms))
+            np.testing.assert_allclose(0, np.minimum(differences, 180 - differences), atol=1e-6)
+
+    def test_get_polygon_angles_by_bounding_box_of_large_hull(self):
+        ellipse = affinity.rotate(affinity.scale(Point(0, 0).buffer(10, 250), 2, 1), 20)
+        measurer = AngleMeasurer()
+        # the (edge, vertex) pairs of the 1000 hull edges are projected in many rounds
+        measurer.MAX_CALIPER_PAIRS = 100000
+        result = measurer.get_polygon_angles_by_bounding_box([ellipse, Point(0, 0).buffer(1)])
+        self.assertAlmostEqual(measurer.get_polygon_angle_by_bounding_box(ellipse), result[0], delta=1e-6)
+        self.assertAlmostEqual(20, result[0], delta=0.1)
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+import numpy as np
+from shapely.geometry import box, Point, LineString, MultiPolygon, GeometryCollection, Polygon
+
+from shapely_ext import backend
+
+
+class TestBackend(TestCase):
+    def test_iter_items(self):
+        collection = GeometryCollection([Point(0, 0), box(0, 0, 1, 1)])
+        self.assertEqual(2, len(list(backend.iter_items(collection))))
+        items = [1, 2, 3]
+        self.assertIs(items, backend.iter_items(items))
+
+    def test_bounds(self):
+        bounds = backend.bounds([box(0, 0, 1, 2), Polygon(), Point(3, 4)])
+        np.testing.assert_array_equal([0, 0, 1, 2], bounds[0])
+        self.assertTrue(np.isnan(bounds[1]).all())
+        np.testing.assert_array_equal([3, 4, 3, 4], bounds[2])
+        self.assertTupleEqual((0, 4), backend.bounds([]).shape)
+
+    def test_equals_exact(self):
+        is_equal = backend.equals_exact([box(0, 0, 1, 1), box(0, 0, 1, 1)], [box(0, 0, 1, 1), box(0, 0, 1, 1.1)], 0.01)
+        np.testing.assert_array_equal([True, False], is_equal)
+
+    def test_flatten_parts(self):
+        if not backend.SHAPELY_2:
+            self.skipTest("shapely 2 only")
+        multi_polygon = MultiPolygon([box(0, 0, 1, 1), box(2, 2, 3, 3)])
+        collection = GeometryCollection([multi_polygon, Point(0, 0), LineString([(0, 0), (1, 1)])])
+        parts = backend.flatten_parts(collection)
+        self.assertListEqual(["Polygon", "Polygon", "Point", "LineString"], [part.geom_type for part in parts])
+        self.assertTrue(parts[1].equals(box(2, 2, 3, 3)))
+
+    def test_hull_rings(self):
+        polygon = Polygon([(0, 0), (2, 0), (1, 1), (2, 2), (0, 2)])
+        rings = backend.hull_rings([polygon, LineString([(0, 0), (1, 1)]), Polygon()])
+        self.assertEqual(4, len(rings[0]))
+        self.assertTrue(Polygon(rings[0]).equals(box(0, 0, 2, 2)))
+        self.assertTupleEqual((0, 2), rings[1].shape)
+        self.assertTupleEqual((0, 2), rings[2].shape)
+
+    def test_rectangle_corners(self):
+        corners = backend.rectangle_corners([box(0, 0, 4, 2), LineString([(0, 0), (1, 1)])], 1e-6)
+        self.assertAlmostEqual(8, Polygon(corners[0]).area * 2)
+        self.assertTrue(np.isnan(corners[1]).all())
+
+    def test_line_endpoints(self):
+        start_coords, end_coords = backend.line_endpoints([LineString([(0, 0), (1, 1), (2, 3)]),
+                                                           LineString([(5, 5), (4, 4)])])
+        np.testing.assert_array_equal([[0, 0], [5, 5]], start_coords)
+        np.testing.assert_array_equal([[2, 3], [4, 4]], end_coords)
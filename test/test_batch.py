@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+import numpy as np
+from shapely import wkb
+from shapely.geometry import box, Point, LineString, Polygon, MultiPoint, MultiLineString, MultiPolygon, \
+    GeometryCollection
+
+from shapely_ext.batch import GeometryBatch, as_geometry_batch, POINT, LINESTRING, POLYGON, MULTIPOLYGON
+
+
+class TestGeometryBatch(TestCase):
+    def setUp(self) -> None:
+        self.geoms = [
+            Point(1, 2),
+            LineString([(0, 0), (3, 0), (3, 3)]),
+            Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (4, 6), (6, 6), (6, 4)]]),
+            MultiPoint([(1, 1), (2, 2)]),
+            MultiLineString([[(0, 0), (1, 1)], [(2, 2), (3, 3), (4, 2)]]),
+            MultiPolygon([box(0, 0, 1, 1), box(5, 5, 6, 6)]),
+        ]
+
+    def assertBatchEqual(self, expected: GeometryBatch, batch: GeometryBatch):
+        for name in ["coords", "ring_offsets", "part_offsets", "geometry_offsets", "type_codes"]:
+            np.testing.assert_array_equal(getattr(expected, name), getattr(batch, name))
+
+    def test_from_geometries(self):
+        batch = GeometryBatch.from_geometries(self.geoms)
+        self.assertEqual(6, len(batch))
+        self.assertListEqual([1, 2, 3, 4, 5, 6], batch.type_codes.tolist())
+        self.assertListEqual([0, 1, 2, 3, 5, 7, 9], batch.geometry_offsets.tolist())
+        self.assertListEqual([0, 1, 2, 4, 5, 6, 7, 8, 9, 10], batch.part_offsets.tolist())
+        self.assertEqual((31, 2), batch.coords.shape)
+        for geom, batch_geom in zip(self.geoms, batch.to_geometries()):
+            self.assertTrue(type(geom) is type(batch_geom))
+            self.assertTrue(geom.equals_exact(batch_geom, 0))
+
+        self.assertIs(batch, as_geometry_batch(batch))
+        self.assertEqual(0, len(GeometryBatch.from_geometries([])))
+        with self.assertRaises(ValueError):
+            GeometryBatch.from_geometries([GeometryCollection([Point(0, 0)])])
+
+    def test_from_wkb(self):
+        expected = GeometryBatch.from_geometries(self.geoms)
+        self.assertBatchEqual(expected, GeometryBatch.from_wkb([geom.wkb for geom in self.geoms]))
+        self.assertBatchEqual(expected, GeometryBatch.from_wkb([wkb.dumps(geom, big_endian=True, srid=4326)
+                                                                for geom in self.geoms]))
+        self.assertEqual(0, len(GeometryBatch.from_wkb([])))
+
+        # z is dropped
+        polygon_z = Polygon([(0, 0, 1), (2, 0, 1), (2, 2, 1)])
+        batch = GeometryBatch.from_wkb([polygon_z.wkb, Point(1, 2, 3).wkb])
+        np.testing.assert_array_equal([[0, 0], [2, 0], [2, 2], [0, 0], [1, 2]], batch.coords)
+
+        # ISO WKB of a LineString Z with big endian coords
+        iso_wkb = bytes.fromhex("00000003ea00000002" + "3ff0000000000000" * 3 + "4000000000000000" * 3)
+        self.assertTrue(LineString([(1, 1), (2, 2)]).equals_exact(GeometryBatch.from_wkb([iso_wkb])[0], 0))
+
+        batch = GeometryBatch.from_wkb([Polygon().wkb, box(0, 0, 1, 1).wkb])
+        self.assertListEqual([0, 0, 1], batch.geometry_offsets.tolist())
+        self.assertTrue(batch[0].is_empty)
+        with self.assertRaises(ValueError):
+            GeometryBatch.from_wkb([GeometryCollection([Point(0, 0)]).wkb])
+
+    def test_single_parts(self):
+        batch = GeometryBatch.from_geometries(self.geoms)
+        parts = batch.single_parts()
+        self.assertIs(batch.coords, parts.coords)
+        self.assertListEqual([POINT, LINESTRING, POLYGON, POINT, POINT, LINESTRING, LINESTRING, POLYGON, POLYGON],
+                             parts.type_codes.tolist())
+        self.assertTrue(box(5, 5, 6, 6).equals_exact(parts[-1], 0))
+        self.assertListEqual([0, 1, 2, 3, 3, 4, 4, 5, 5], batch.part_geometry_index.tolist())
+        self.assertEqual(MULTIPOLYGON, batch.type_codes[-1])
@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import redirect_stderr
+from unittest import TestCase
+
+from shapely.geometry import box, Point, LineString, shape
+from shapely.wkb import loads as wkb_loads
+
+from shapely_ext.cli import main, process_lines, _get_operation, _build_parser
+from shapely_ext.decompose import Decomposer
+from shapely_ext.interpolate import interpolate
+from shapely_ext.mesh import TriMesher
+
+
+class TestCli(TestCase):
+    def setUp(self) -> None:
+        self.geoms = [box(0, 0, 10, 10), Point(0, 0).buffer(5), LineString([(0, 0), (10, 0), (10, 5)])]
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _run(self, argv, lines):
+        input_path = os.path.join(self.tmp_dir.name, "input")
+        output_path = os.path.join(self.tmp_dir.name, "output")
+        with open(input_path, "w") as f:
+            f.write("\n".join(lines) + "\n\n")
+        self.assertEqual(0, main(argv + ["--input", input_path, "--output", output_path]))
+        with open(output_path) as f:
+            return f.read().splitlines()
+
+    def test_interpolate_wkb(self):
+        for workers in ["1", "2"]:
+            output = self._run(["interpolate", "--gap", "1", "--workers", workers, "--chunksize", "2"],
+                               [geom.wkb_hex for geom in self.geoms])
+            self.assertEqual(len(self.geoms), len(output))
+            for geom, line in zip(self.geoms, output):
+                self.assertTrue(interpolate(geom, 1).equals_exact(wkb_loads(line, hex=True), 0))
+
+    def test_decompose_geojson(self):
+        features = [json.dumps({"type": "Feature", "properties": {"id": 1},
+                                "geometry": box(0, 0, 1, 1).__geo_interface__}),
+                    json.dumps(LineString([(0, 0), (1, 0), (1, 1)]).__geo_interface__)]
+        output = self._run(["decompose", "--format", "geojson"], features)
+        feature = json.loads(output[0])
+        self.assertDictEqual({"id": 1}, feature["properties"])
+        self.assertEqual(4, len(shape(feature["geometry"]).geoms))
+        expected = Decomposer().decompose(LineString([(0, 0), (1, 0), (1, 1)]))
+        self.assertEqual(len(expected), len(shape(json.loads(output[1])).geoms))
+
+    def test_mesh(self):
+        output = self._run(["mesh", "--interpolate-distance", "2", "--constrained"], [box(0, 0, 10, 10).wkb_hex])
+        triangles = wkb_loads(output[0], hex=True)
+        self.assertEqual(len(TriMesher(interpolate_distance=2, constrained=True).mesh(box(0, 0, 10, 10))),
+                         len(triangles.geoms))
+        self.assertAlmostEqual(100, triangles.area)
+
+    def test_process_lines_is_lazy(self):
+        operation = _get_operation(_build_parser().parse_args(["interpolate", "--gap", "1"]))
+        lines = iter([box(0, 0, 1, 1).wkb_hex] * 100)
+        output = process_lines(lines, operation, workers=2, chunksize=10)
+        next(output)
+        # two chunks per worker are read ahead at most
+        self.assertEqual(60, len(list(lines)))
+        with self.assertRaises(ValueError):
+            next(process_lines([], operation, input_format="csv"))
+
+    def test_bad_record(self):
+        good_line = box(0, 0, 10, 10).wkb_hex
+        lines = [good_line, "not hex", Point(0, 0).wkb_hex, good_line]
+        argv = ["mesh", "--interpolate-distance", "5", "--chunksize", "1"]
+        for workers in ["1", "2"]:
+            with self.assertRaises(Exception):
+                self._run(argv + ["--workers", workers], lines)
+
+            errors = io.StringIO()
+            with redirect_stderr(errors):
+                output = self._run(argv + ["--workers", workers, "--on-error", "emit"], lines)
+            self.assertEqual(4, len(output))
+            self.assertTrue(wkb_loads(output[1], hex=True).is_empty)
+            self.assertTrue(wkb_loads(output[2], hex=True).is_empty)
+            self.assertAlmostEqual(100, wkb_loads(output[3], hex=True).area)
+            messages = errors.getvalue().splitlines()
+            self.assertEqual(2, len(messages))
+            self.assertTrue(messages[0].startswith("shapely-ext: line 2: "))
+            self.assertIn("line 3: NotImplementedError", messages[1])
+
+            with redirect_stderr(io.StringIO()):
+                output = self._run(argv + ["--workers", workers, "--on-error", "skip"], lines)
+            self.assertEqual(2, len(output))
+
+    def test_bad_geojson_record(self):
+        lines = [json.dumps(box(0, 0, 1, 1).__geo_interface__), "{not json", json.dumps({"type": "Feature"})]
+        with redirect_stderr(io.StringIO()):
+            output = self._run(["interpolate", "--gap", "1", "--format", "geojson", "--on-error", "emit"], lines)
+        self.assertEqual(3, len(output))
+        self.assertEqual("Polygon", json.loads(output[0])["type"])
+        for line in output[1:]:
+            feature = json.loads(line)
+            self.assertIsNone(feature["geometry"])
+            self.assertIn("error", feature["properties"])
+
+    def test_stdin(self):
+        result = subprocess.run([sys.executable, "-m", "shapely_ext.cli", "interpolate", "--gap", "5"],
+                                input=box(0, 0, 10, 10).wkb_hex, capture_output=True, text=True, check=True)
+        self.assertEqual(9, len(wkb_loads(result.stdout.strip(), hex=True).exterior.coords))
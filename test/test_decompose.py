@@ -2,18 +2,23 @@ import math
 from typing import List
 from unittest import TestCase
 
-from shapely.geometry import box, LineString, Polygon, Point
+import numpy as np
+from shapely.geometry import box, LineString, Polygon, Point, MultiPolygon, GeometryCollection
 from shapely.geometry.base import BaseGeometry
 from shapely.ops import unary_union
 
+from shapely_ext.batch import GeometryBatch
 from shapely_ext.decompose import Decomposer
 from test.constant import MATH_EPS
+from test.util import recursion_limit_above_current
 
 
 class TestDecompose(TestCase):
     def setUp(self):
         self.decomposer1 = Decomposer()
         self.decomposer_angle_tol = Decomposer(min_corner_angle_degree=15)
+        self.numpy_decomposer1 = Decomposer(engine="numpy")
+        self.numpy_decomposer_angle_tol = Decomposer(min_corner_angle_degree=15, engine="numpy")
 
     def test_decompose_polygon(self):
         polygon1 = box(0, 0, 10, 5)
@@ -35,6 +40,88 @@ class TestDecompose(TestCase):
         self._test_objects_are_all_of_type(line3, LineString)
         self._test_objects_are_of_lens(line3, [1, math.pi / 2 + 2])
 
+    def test_numpy_engine_matches_python_engine(self):
+        circle = Point(0.5, 0.5).buffer(0.5)
+        geoms = [
+            box(0, 0, 10, 5),
+            Polygon([(0, 0), (1, 1), (0, 1)]),
+            unary_union([circle, box(0.5, 0, 1.5, 1)]),
+            Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (4, 6), (6, 6), (6, 4)]]),
+            LineString([(0, 0), (1, 0), (2, 0.1), (2, 3), (5, 3)]),
+            LineString([(0, 0), (1, 0)]),
+            Polygon([(0, 0, 1), (1, 0, 1), (0, 1, 2)]),
+            LineString([(0, 0, 1), (1, 0, 1), (1, 1, 2)]),
+        ]
+        for python_decomposer, numpy_decomposer in [(self.decomposer1, self.numpy_decomposer1),
+                                                    (self.decomposer_angle_tol, self.numpy_decomposer_angle_tol)]:
+            for geom in geoms:
+                expected = python_decomposer.decompose(geom)
+                lines = numpy_decomposer.decompose(geom)
+                self.assertEqual(len(expected), len(lines))
+                for expected_line, line in zip(expected, lines):
+                    self.assertTrue(expected_line.equals_exact(line, 1e-9))
+                    self.assertListEqual(list(expected_line.coords), list(line.coords))
+
+    def test_numpy_engine_raise_if_ring_has_no_corner(self):
+        with self.assertRaises(ValueError):
+            Decomposer(min_corner_angle_degree=90, engine="numpy").decompose(Point(0, 0).buffer(1))
+
+    def test_decompose_many(self):
+        circle = Point(0.5, 0.5).buffer(0.5)
+        geoms = [
+            MultiPolygon([box(0, 0, 10, 5), box(20, 0, 21, 1)]),
+            Point(0, 0),
+            unary_union([circle, box(0.5, 0, 1.5, 1)]),
+            LineString([(0, 0), (1, 0), (2, 0.1), (2, 3), (5, 3)]),
+            Polygon([(0, 0, 1), (1, 0, 1), (0, 1, 2)]),
+            LineString([(0, 0, 1), (1, 0, 1), (1, 1, 2)]),
+        ]
+        for decomposer in [self.decomposer1, self.decomposer_angle_tol]:
+            result = decomposer.decompose_many(geoms)
+            expected = [(geometry_i, line)
+                        for geometry_i, geom in enumerate(geoms)
+                        for line in decomposer.decompose(geom)]
+            self.assertEqual(len(expected), len(result))
+            self.assertListEqual([geometry_i for geometry_i, _ in expected], result.geometry_index.tolist())
+            for (_, expected_line), line in zip(expected, result):
+                self.assertTrue(expected_line.equals_exact(line, 1e-9))
+            for (_, expected_line), start, end in zip(expected, result.start_coords, result.end_coords):
+                self.assertListEqual(list(expected_line.coords[0][:2]), start.tolist())
+                self.assertListEqual(list(expected_line.coords[-1][:2]), end.tolist())
+
+            # a batch is not simplified
+            batch = GeometryBatch.from_geometries([geom.simplify(1e-6) for geom in geoms])
+            batch_result = decomposer.decompose_many(batch)
+            np.testing.assert_array_equal(result.coords, batch_result.coords)
+            np.testing.assert_array_equal(result.offsets, batch_result.offsets)
+            np.testing.assert_array_equal(result.geometry_index, batch_result.geometry_index)
+
+        result = self.decomposer1.decompose_many(geoms)
+        self.assertEqual(8, len(result.lines_of(0)))
+        self.assertListEqual([], result.lines_of(1))
+        self.assertEqual(len(result), len(result.lines()))
+
+        empty_result = self.decomposer1.decompose_many([])
+        self.assertEqual(0, len(empty_result))
+        self.assertListEqual([], empty_result.lines())
+
+    def test_iter_decompose(self):
+        geom = GeometryCollection([MultiPolygon([box(0, 0, 10, 5), box(20, 0, 21, 1)]),
+                                   LineString([(0, 0), (1, 0), (1, 1)]), Point(0, 0)])
+        lines = self.decomposer1.iter_decompose(geom)
+        self.assertTrue(isinstance(next(lines), LineString))
+        self.assertEqual(9, len(list(lines)))
+
+        nested = box(0, 0, 1, 1)
+        for i in range(300):
+            nested = GeometryCollection([nested, LineString([(i, 0), (i, 1)])])
+        with recursion_limit_above_current(100):
+            self.assertEqual(304, len(self.decomposer1.decompose(nested)))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Decomposer(engine="fortran")
+
     def _test_objects_are_all_of_type(self, geoms: List[BaseGeometry], type_class):
         return self.assertTrue(all(isinstance(g, type_class) for g in geoms))
 
@@ -2,7 +2,7 @@ from unittest import TestCase
 
 from shapely.geometry import box, GeometryCollection, LineString, Polygon, Point
 
-from shapely_ext.func import group, separate, classify
+from shapely_ext.func import group, separate, classify, group_geometries
 
 
 class TestGroup(TestCase):
@@ -27,6 +27,42 @@ class TestGroup(TestCase):
         self.assertListEqual([boxes[2]], groups[0])
         self.assertListEqual(boxes[:2], groups[1])
 
+    def test_group_with_bounds_prefilter(self):
+        boxes = [
+            box(0, 0, 1, 1),
+            box(1.1, 1, 2, 2),
+            box(-10, 0, -9, 1),
+        ]
+        called_pairs = []
+
+        def grouping_func(b1, b2):
+            called_pairs.append((b1, b2))
+            return b1.distance(b2) < 0.5
+
+        groups = group(boxes, grouping_func=grouping_func,
+                       bounds_func=lambda b: b.buffer(0.25).bounds)
+        self.assertEqual(2, len(groups))
+        groups.sort(key=len)
+        self.assertListEqual([boxes[2]], groups[0])
+        self.assertListEqual(boxes[:2], sorted(groups[1], key=lambda b: b.bounds))
+        self.assertTrue(all(boxes[2] not in pair for pair in called_pairs))
+
+    def test_group_geometries(self):
+        boxes = [
+            box(0, 0, 1, 1),
+            box(-10, 0, -9, 1),
+            box(1.1, 1, 2, 2),
+            box(2.3, 1, 3, 2),
+            box(-8.8, 0, -8, 1),
+        ]
+        groups = group_geometries(boxes, distance=0.2)
+        self.assertListEqual([[boxes[0], boxes[2]], [boxes[1], boxes[4]], [boxes[3]]], groups)
+
+        groups = group_geometries(boxes, distance=0.3)
+        self.assertListEqual([[boxes[0], boxes[2], boxes[3]], [boxes[1], boxes[4]]], groups)
+
+        self.assertListEqual([], group_geometries([], distance=1))
+
     def test_separate(self):
         nums = [*range(10)]
         even, odds = separate(nums, func=lambda num: num % 2 == 0)
@@ -42,11 +78,11 @@ class TestGroup(TestCase):
         nums = [*range(9)]
         groups = classify(nums, func=lambda num: num % 3)
         self.assertEqual(3, len(groups))
-        for group in groups:
-            self.assertEqual(3, len(group))
+        for num_group in groups:
+            self.assertEqual(3, len(num_group))
 
         geoms = GeometryCollection([box(0, 0, 1, 1), LineString([(0, 0), (1, 1)]), Point(0, 1)])
         groups = classify(geoms, func=lambda num: str(type(num)))
         self.assertEqual(3, len(groups))
-        for group in groups:
-            self.assertEqual(1, len(group))
+        for geom_group in groups:
+            self.assertEqual(1, len(geom_group))
@@ -0,0 +1,108 @@
+from unittest import TestCase
+
+import numpy as np
+from shapely.geometry import box, Point, Polygon, LineString
+
+from shapely_ext.geometry.vector_2d import Vector2D
+from shapely_ext.index import GridIndex, RayCaster, geometry_bounds, get_segments, ragged_arange
+
+
+class TestGridIndex(TestCase):
+    def test_ragged_arange(self):
+        self.assertListEqual([0, 1, 0, 1, 2, 0], ragged_arange(np.array([2, 3, 0, 1])).tolist())
+        self.assertListEqual([], ragged_arange(np.array([], dtype=int)).tolist())
+
+    def test_geometry_bounds(self):
+        bounds = geometry_bounds([box(0, 0, 1, 2), Polygon()])
+        self.assertListEqual([0, 0, 1, 2], bounds[0].tolist())
+        self.assertTrue(np.isnan(bounds[1]).all())
+
+    def test_query(self):
+        index = GridIndex(geometry_bounds([box(0, 0, 1, 1), box(5, 5, 6, 6), box(0.5, 0.5, 10, 10), Polygon()]))
+        self.assertListEqual([0, 2], index.query((0.8, 0.8, 0.9, 0.9)).tolist())
+        self.assertListEqual([1, 2], index.query((5.5, 5.5, 5.6, 5.6)).tolist())
+        self.assertListEqual([], index.query((20, 20, 21, 21)).tolist())
+        self.assertListEqual([0, 1, 2], index.query((-100, -100, 100, 100)).tolist())
+
+    def test_query_bulk_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        points = [Point(x, y) for x, y in rng.uniform(0, 100, (300, 2))]
+        bounds = geometry_bounds([point.buffer(r) for point, r in zip(points, rng.uniform(0, 3, 300))])
+        query_bounds = geometry_bounds([point.buffer(1) for point in points[:50]])
+
+        query_idx, item_idx = GridIndex(bounds).query_bulk(query_bounds)
+        expected = [(i, j)
+                    for i, q in enumerate(query_bounds)
+                    for j, b in enumerate(bounds)
+                    if q[0] <= b[2] and b[0] <= q[2] and q[1] <= b[3] and b[1] <= q[3]]
+        self.assertListEqual(expected, list(zip(query_idx.tolist(), item_idx.tolist())))
+
+    def test_query_bulk_of_points_matches_brute_force(self):
+        # queries within one cell skip deduplication and must still come sorted by query then item
+        rng = np.random.default_rng(0)
+        lows = rng.uniform(0, 100, (300, 2))
+        bounds = np.concatenate((lows, lows + rng.uniform(0, 10, (300, 2))), axis=1)
+        points = rng.uniform(0, 100, (200, 2))
+        query_bounds = np.concatenate((points, points), axis=1)
+
+        query_idx, item_idx = GridIndex(bounds).query_bulk(query_bounds)
+        expected = [(i, j)
+                    for i, q in enumerate(query_bounds)
+                    for j, b in enumerate(bounds)
+                    if q[0] <= b[2] and b[0] <= q[2] and q[1] <= b[3] and b[1] <= q[3]]
+        self.assertListEqual(expected, list(zip(query_idx.tolist(), item_idx.tolist())))
+
+    def test_points(self):
+        index = GridIndex(np.array([[0, 0, 0, 0], [1, 1, 1, 1], [1, 1, 1, 1]]))
+        self.assertListEqual([1, 2], index.query((0.5, 0.5, 1, 1)).tolist())
+
+    def test_long_and_tiny_boxes(self):
+        # the median box is tiny, a cell of its size would make the long box cover ten billion cells
+        bounds = np.array([[0, 0, 1e5, 1]] + [[x, 2, x + 1e-5, 2 + 1e-5] for x in range(100)])
+        index = GridIndex(bounds)
+        self.assertLess(len(index._items), 1000)
+        self.assertListEqual([0], index.query((5e4, 0.5, 5e4, 0.5)).tolist())
+        self.assertListEqual([0, 4], index.query((3, 0, 3.5, 2.5)).tolist())
+
+    def test_empty_index(self):
+        index = GridIndex(np.empty((0, 4)))
+        self.assertEqual(0, len(index))
+        self.assertListEqual([], index.query((0, 0, 1, 1)).tolist())
+
+
+class TestRayCaster(TestCase):
+    def test_get_segments(self):
+        starts, ends = get_segments(Polygon([(0, 0), (4, 0), (4, 4)], [[(1, 0.5), (3, 0.5), (3, 2.5)]]))
+        self.assertEqual((6, 2), starts.shape)
+        self.assertListEqual([4, 0], starts[1].tolist())
+        self.assertListEqual([3, 0.5], ends[3].tolist())
+        self.assertEqual((0, 2), get_segments(Point(0, 0))[0].shape)
+
+        starts, ends = get_segments(Polygon([(0, 0, 1), (10, 0, 1), (0, 10, 1)]))
+        self.assertListEqual([[0, 0], [10, 0], [0, 10]], starts.tolist())
+        self.assertListEqual([[10, 0], [0, 10], [0, 0]], ends.tolist())
+
+    def test_cast(self):
+        caster = RayCaster(*get_segments(box(2, 0, 4, 2)), direction=Vector2D(2, 0), max_length=10)
+        origins = np.array([(0, 1), (0, 3), (3, 1), (-9, 1), (0, 0)])
+        distances, segment_indices, params = caster.cast(origins)
+        self.assertListEqual([2, np.inf, 1, np.inf, 2], distances.tolist())
+        self.assertEqual(-1, segment_indices[1])
+        self.assertTrue(np.isnan(params[1]))
+        np.testing.assert_allclose([[2, 1], [4, 1]], caster.points_at(origins[[0, 2]], distances[[0, 2]]))
+        self.assertListEqual([2, 0, 1, 0], caster.count_crossings(origins[:4]).tolist())
+
+        # a ray through a corner meets two segments at once, the first of them wins
+        _, segment_indices, _ = caster.cast(np.array([(0, 0), (0, 2)]))
+        self.assertListEqual([2, 1], segment_indices.tolist())
+
+        hits = caster.candidate_hits(origins)
+        np.testing.assert_array_equal(distances, caster.cast(origins, hits)[0])
+        np.testing.assert_array_equal(caster.count_crossings(origins), caster.count_crossings(origins, hits))
+
+    def test_cast_rotated(self):
+        caster = RayCaster(*get_segments(LineString([(0, 4), (4, 0)])), direction=Vector2D(1, 1), max_length=100)
+        distances, segment_indices, params = caster.cast(np.array([(0, 0), (1, 0), (5, 5)]))
+        np.testing.assert_allclose([2 ** 0.5 * 2, 2 ** 0.5 * 1.5], distances[:2])
+        np.testing.assert_allclose([0.5, 0.625], params[:2])
+        self.assertListEqual([0, 0, -1], segment_indices.tolist())
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+import shapely_ext
+
+
+def _run_python(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip()
+
+
+class TestInit(TestCase):
+    def test_lazy_attributes(self):
+        self.assertIs(shapely_ext.TriMesher, __import__("shapely_ext.mesh").mesh.TriMesher)
+        self.assertIn("is_similar", dir(shapely_ext))
+        self.assertListEqual(sorted(shapely_ext.__all__), shapely_ext.__all__)
+        for name in shapely_ext.__all__:
+            self.assertTrue(hasattr(shapely_ext, name))
+        with self.assertRaises(AttributeError):
+            shapely_ext.not_an_attribute
+
+    def test_scipy_is_imported_on_first_use(self):
+        code = ("import sys, shapely_ext\n"
+                "from shapely.geometry import box\n"
+                "shapely_ext.is_similar(box(0, 0, 1, 1), box(0, 0, 1, 2))\n"
+                "mesher = shapely_ext.TriMesher(interpolate_distance=1)\n"
+                "shapely_ext.group, shapely_ext.Decomposer, shapely_ext.Projector, shapely_ext.interpolate_many\n"
+                "print('scipy' in sys.modules)\n"
+                "mesher.mesh(box(0, 0, 1, 1))\n"
+                "print('scipy' in sys.modules)")
+        self.assertEqual("False\nTrue", _run_python(code))
+
+    def test_import_without_scipy(self):
+        code = ("import sys\n"
+                "import shapely_ext.util, shapely_ext.interpolate, shapely_ext.decompose, shapely_ext.mesh\n"
+                "print('scipy' in sys.modules)")
+        self.assertEqual("False", _run_python(code))
@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+import numpy as np
+from shapely.geometry import box, Point, LineString, MultiPolygon
+
+from shapely_ext import instrument
+from shapely_ext.decompose import Decomposer
+from shapely_ext.geometry.vector_2d import Vector2D
+from shapely_ext.interpolate import interpolate
+from shapely_ext.mesh import TriMesher
+from shapely_ext.project import Projector
+from shapely_ext.util import is_similar
+
+
+class TestInstrument(TestCase):
+    def tearDown(self) -> None:
+        instrument.disable()
+        instrument.reset()
+
+    def test_disabled(self):
+        self.assertFalse(instrument.is_enabled())
+        with instrument.stage("stage", box(0, 0, 1, 1)):
+            pass
+        interpolate(box(0, 0, 10, 10), 1)
+        self.assertDictEqual({}, instrument.stats())
+
+    def test_stages(self):
+        records = []
+        instrument.enable(callback=lambda *record: records.append(record))
+        polygon = box(0, 0, 10, 10)
+        interpolate(polygon, 1)
+        Decomposer().decompose(MultiPolygon([polygon, box(20, 20, 21, 21)]))
+        TriMesher(interpolate_distance=2, constrained=True).mesh(polygon)
+        Projector(LineString([(0, 2), (1, 2)]), Vector2D(0, -1)).project_onto(LineString([(0, 0), (1, 0)]))
+        is_similar(polygon, box(0, 0.5, 10, 10.5))
+
+        stats = instrument.stats()
+        self.assertDictEqual({"calls": 1, "seconds": stats["interpolate.simplify"]["seconds"], "vertices": 5},
+                             stats["interpolate.simplify"])
+        self.assertEqual(2, stats["decompose.split"]["calls"])
+        self.assertEqual(10, stats["decompose.split"]["vertices"])
+        self.assertEqual(1, stats["mesh.delaunay"]["calls"])
+        self.assertEqual(20, stats["mesh.delaunay"]["vertices"])
+        for name in ["mesh.simplify", "mesh.interpolate", "mesh.filter_inside", "project.simplify",
+                     "project.insert_projections", "project.find_projecting_points", "is_similar.quick_check",
+                     "is_similar.overlay", "interpolate.densify", "decompose.simplify"]:
+            self.assertIn(name, stats)
+        self.assertEqual(sum(stage_stats["calls"] for stage_stats in stats.values()), len(records))
+        self.assertTrue(all(seconds >= 0 for _, seconds, _ in records))
+
+        instrument.reset()
+        self.assertDictEqual({}, instrument.stats())
+
+    def test_count_vertices(self):
+        self.assertEqual(0, instrument.count_vertices(None))
+        self.assertEqual(3, instrument.count_vertices(np.zeros((3, 2))))
+        self.assertEqual(1, instrument.count_vertices(Point(0, 0)))
+        polygon = box(0, 0, 10, 10).difference(box(2, 2, 3, 3))
+        self.assertEqual(15, instrument.count_vertices(MultiPolygon([polygon, box(20, 20, 21, 21)])))
@@ -1,8 +1,11 @@
 from unittest import TestCase
 
-from shapely.geometry import box, Polygon, LineString, MultiPoint, Point, GeometryCollection
+import numpy as np
+from shapely.geometry import box, Polygon, LineString, MultiPoint, Point, GeometryCollection, MultiPolygon
 
-from shapely_ext.interpolate import interpolate
+from shapely_ext.batch import GeometryBatch
+from shapely_ext.interpolate import interpolate, interpolate_coords_array, interpolate_coords_by_len, \
+    interpolate_many, interpolate_rings
 
 
 class TestInterpolate(TestCase):
@@ -41,9 +44,70 @@ class TestInterpolate(TestCase):
         collection = GeometryCollection([mp, point, line, polygon])
         interpolated_collection = interpolate(collection, 1)
         self.assertTrue(type(collection) is type(interpolated_collection))
-        self.assertEqual(len(collection), len(list(interpolated_collection)))
-        processed_polygon = list(filter(lambda geom: isinstance(geom, Polygon), list(interpolated_collection)))[0]
+        self.assertEqual(len(collection.geoms), len(interpolated_collection.geoms))
+        processed_polygon = list(filter(lambda geom: isinstance(geom, Polygon), interpolated_collection.geoms))[0]
         self.assertEqual(41, len(list(processed_polygon.exterior.coords)))
         self.assertEqual(9, len(list(processed_polygon.interiors[0].coords)))
-        processed_line = list(filter(lambda geom: isinstance(geom, LineString), list(interpolated_collection)))[0]
+        processed_line = list(filter(lambda geom: isinstance(geom, LineString), interpolated_collection.geoms))[0]
         self.assertEqual(11, len(processed_line.coords))
+
+    def test_interpolate_coords_array(self):
+        rng = np.random.default_rng(0)
+        coords = np.cumsum(rng.uniform(-10, 10, (50, 2)), axis=0)
+        for gap in [0.3, 1, 2.5, 100]:
+            expected = []
+            for i in range(len(coords) - 1):
+                expected.extend(interpolate_coords_by_len(tuple(coords[i]), tuple(coords[i + 1]), gap,
+                                                          result_include_coord2=i == len(coords) - 2))
+            result = interpolate_coords_array(coords, gap)
+            self.assertIsInstance(result, np.ndarray)
+            self.assertEqual((len(expected), 2), result.shape)
+            np.testing.assert_allclose(np.array(expected), result, atol=1e-9)
+
+        ring = np.array([(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)], dtype=float)
+        interpolated_ring = interpolate_coords_array(ring, 5)
+        self.assertEqual(9, len(interpolated_ring))
+        self.assertListEqual(interpolated_ring[0].tolist(), interpolated_ring[-1].tolist())
+
+        self.assertEqual((1, 2), interpolate_coords_array(np.array([(1., 2.)]), 1).shape)
+
+    def test_interpolate_rings(self):
+        coords = np.array([(0, 0), (10, 0), (3, 3), (0, 0), (0, 4), (1, 1)], dtype=float)
+        ring_offsets = np.array([0, 2, 3, 3, 6])
+        result, result_offsets = interpolate_rings(coords, ring_offsets, np.array([5, 1, 1, 2]))
+        self.assertListEqual([0, 3, 4, 4, 9], result_offsets.tolist())
+        np.testing.assert_allclose(interpolate_coords_array(coords[:2], 5), result[0:3])
+        np.testing.assert_allclose([[3, 3]], result[3:4])
+        np.testing.assert_allclose(interpolate_coords_array(coords[3:], 2), result[4:9])
+
+    def test_interpolate_many(self):
+        polygon = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (4, 6), (6, 6), (6, 4)]])
+        line = LineString([(0, 0), (10, 0)])
+        redundant_vertex_polygon = Polygon([(0, 0), (0.5, 0), (1, 0), (1, 1), (0, 1)])
+        geoms = [polygon, Point(0, 0), GeometryCollection([line, MultiPolygon([polygon, box(20, 20, 21, 21)])]),
+                 line, MultiPolygon([redundant_vertex_polygon]),
+                 GeometryCollection([LineString([(0, 0), (0.5, 0), (1, 0)]), redundant_vertex_polygon])]
+
+        for gaps in [1, [1, 2, 0.5, 3, 0.3, 0.3]]:
+            expected = [interpolate(geom, gap) for geom, gap in zip(geoms, np.broadcast_to(gaps, (len(geoms),)))]
+            result = interpolate_many(geoms, gaps)
+            self.assertEqual(len(expected), len(result))
+            for expected_geom, result_geom in zip(expected, result):
+                self.assertTrue(type(expected_geom) is type(result_geom))
+                self.assertTrue(expected_geom.equals_exact(result_geom, 1e-9))
+
+        # z is dropped like interpolate does
+        line_z = LineString([(0, 0, 1), (3, 0, 1), (3, 3, 1), (0, 3, 1)])
+        self.assertTrue(interpolate(line_z, 1).equals_exact(interpolate_many([line_z], 1)[0], 1e-9))
+        self.assertEqual(10, len(interpolate_many([line_z], 1)[0].coords))
+
+    def test_interpolate_many_batch(self):
+        polygon = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (4, 6), (6, 6), (6, 4)]])
+        geoms = [polygon, Point(0, 0), MultiPolygon([polygon, box(20, 20, 21, 21)]), LineString([(0, 0), (10, 0)])]
+        result = interpolate_many(GeometryBatch.from_geometries(geoms), [1, 2, 0.5, 3])
+        self.assertIsInstance(result, GeometryBatch)
+        for geom, gap, result_geom in zip(geoms, [1, 2, 0.5, 3], result):
+            self.assertTrue(interpolate(geom, gap).equals_exact(result_geom, 1e-9))
+
+        self.assertListEqual([], interpolate_many([], 1))
+        self.assertTrue(interpolate_many([Polygon()], 1)[0].is_empty)
@@ -1,8 +1,11 @@
 from unittest import TestCase
 
+import numpy as np
 from shapely.geometry import box, Polygon, Point
 
+from shapely_ext.batch import GeometryBatch
 from shapely_ext.mesh import TriMesher
+from test.constant import MATH_EPS
 
 
 class Test(TestCase):
@@ -24,3 +27,91 @@ class Test(TestCase):
         point = Point(0, 0)
         with self.assertRaises(NotImplementedError):
             self.mesher_11.mesh(point)
+
+    def test_constrained_mesh(self):
+        concave_polygon = Polygon([(0, 0), (10, 0), (10, 10), (8, 10), (8, 2), (2, 2), (2, 10), (0, 10)])
+        holed_polygon = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (4, 6), (6, 6), (6, 4)]])
+        unconstrained_faces = TriMesher(interpolate_distance=2).mesh(concave_polygon)
+        self.assertFalse(all(concave_polygon.buffer(MATH_EPS).contains(face) for face in unconstrained_faces))
+
+        for steiner_points in [False, True]:
+            mesher = TriMesher(interpolate_distance=2, constrained=True, steiner_points=steiner_points)
+            for polygon in [concave_polygon, holed_polygon, box(0, 0, 10, 10)]:
+                faces = mesher.mesh(polygon)
+                self.assertTrue(all(isinstance(face, Polygon) for face in faces))
+                self.assertTrue(all(polygon.buffer(MATH_EPS).contains(face) for face in faces))
+                self.assertAlmostEqual(polygon.area, sum(face.area for face in faces), delta=MATH_EPS)
+
+        triangle = Polygon([(0, 0), (10, 0), (0, 10)])
+        triangle_z = Polygon([(0, 0, 1), (10, 0, 1), (0, 10, 1)])
+        mesher = TriMesher(interpolate_distance=2, constrained=True)
+        np.testing.assert_array_equal(mesher.mesh_arrays(triangle).faces, mesher.mesh_arrays(triangle_z).faces)
+
+        rect = box(0, 0, 10, 10)
+        faces = TriMesher(interpolate_distance=2.5, constrained=True).mesh(rect)
+        faces_with_steiner_points = TriMesher(interpolate_distance=2.5, constrained=True,
+                                              steiner_points=True).mesh(rect)
+        self.assertTrue(len(faces) < len(faces_with_steiner_points))
+
+    def test_mesh_arrays(self):
+        polygon = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (4, 6), (6, 6), (6, 4)]])
+        for mesher in [self.mesher_5, TriMesher(interpolate_distance=2, constrained=True, steiner_points=True)]:
+            tri_mesh = mesher.mesh_arrays(polygon)
+            self.assertEqual(2, tri_mesh.vertices.shape[1])
+            self.assertEqual((len(tri_mesh), 3), tri_mesh.faces.shape)
+            self.assertEqual(np.int32, tri_mesh.faces.dtype)
+
+            faces = tri_mesh.polygons()
+            self.assertEqual(len(tri_mesh), len(faces))
+            np.testing.assert_allclose([face.area for face in faces], tri_mesh.areas)
+            np.testing.assert_allclose([face.centroid.coords[0] for face in faces], tri_mesh.centroids)
+            self.assertListEqual([list(face.exterior.coords) for face in mesher.mesh(polygon)],
+                                 [list(face.exterior.coords) for face in faces])
+
+        with self.assertRaises(NotImplementedError):
+            self.mesher_5.mesh_arrays(Point(0, 0))
+
+    def test_mesh_many(self):
+        polygons = [box(0, 0, 10, 10), Point(0, 0).buffer(10), box(0, 0, 3, 30), box(5, 5, 6, 6)]
+        mesher = TriMesher(interpolate_distance=2, constrained=True)
+        expected = [mesher.mesh_arrays(polygon) for polygon in polygons]
+        for workers in [None, 2]:
+            tri_meshes = mesher.mesh_many(polygons, workers=workers, chunksize=1)
+            self.assertEqual(len(expected), len(tri_meshes))
+            for expected_tri_mesh, tri_mesh in zip(expected, tri_meshes):
+                np.testing.assert_array_equal(expected_tri_mesh.vertices, tri_mesh.vertices)
+                np.testing.assert_array_equal(expected_tri_mesh.faces, tri_mesh.faces)
+
+        streamed = mesher.iter_mesh_many(iter(polygons), workers=2, chunksize=3)
+        self.assertEqual(len(expected[0]), len(next(streamed)))
+        self.assertEqual(len(polygons) - 1, len(list(streamed)))
+        self.assertListEqual([], mesher.mesh_many([], workers=2))
+
+        batch_meshes = mesher.mesh_many(GeometryBatch.from_geometries(polygons))
+        for expected_tri_mesh, tri_mesh in zip(expected, batch_meshes):
+            np.testing.assert_array_equal(expected_tri_mesh.faces, tri_mesh.faces)
+
+    def test_refined_mesh(self):
+        concave_polygon = Polygon([(0, 0), (10, 0), (10, 10), (8, 10), (8, 2), (2, 2), (2, 10), (0, 10)],
+                                  [[(4, 0.5), (6, 0.5), (6, 1.5), (4, 1.5)]])
+        polygons = [concave_polygon, box(0, 0, 100, 5), Point(0, 0).buffer(10)]
+        for polygon in polygons:
+            tri_mesh = TriMesher(interpolate_distance=10, max_area=0.5).mesh_arrays(polygon)
+            self.assertTrue((tri_mesh.areas <= 0.5).all())
+            self.assertAlmostEqual(polygon.area, tri_mesh.areas.sum(), delta=MATH_EPS)
+
+            tri_mesh = TriMesher(interpolate_distance=10, min_angle_degree=20).mesh_arrays(polygon)
+            self.assertTrue((tri_mesh.min_angles >= 20).all())
+            self.assertAlmostEqual(polygon.area, tri_mesh.areas.sum(), delta=MATH_EPS)
+
+            tri_mesh = TriMesher(interpolate_distance=10, target_count=200).mesh_arrays(polygon)
+            self.assertTrue(len(tri_mesh) >= 200)
+            self.assertAlmostEqual(polygon.area, tri_mesh.areas.sum(), delta=MATH_EPS)
+
+        # refinement only adds points where triangles are bad
+        tri_mesh = TriMesher(interpolate_distance=10, max_area=1, min_angle_degree=20).mesh_arrays(concave_polygon)
+        dense_mesher = TriMesher(interpolate_distance=1, constrained=True, steiner_points=True)
+        dense_tri_mesh = dense_mesher.mesh_arrays(concave_polygon)
+        self.assertTrue(len(tri_mesh) < len(dense_tri_mesh))
+        self.assertTrue((tri_mesh.areas <= 1).all())
+        self.assertTrue((tri_mesh.min_angles >= 20).all())
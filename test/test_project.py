@@ -1,10 +1,12 @@
 from unittest import TestCase
 
-from shapely.geometry import Polygon, LineString, Point
+import numpy as np
+from shapely.affinity import translate
+from shapely.geometry import Polygon, LineString, Point, box
 from shapely.wkt import loads as wkt_loads
 
 from shapely_ext.geometry.vector_2d import Vector2D
-from shapely_ext.project import Projector
+from shapely_ext.project import Projector, ProjectionTarget
 from test.constant import MATH_EPS
 from test.util import is_geom_equal
 
@@ -34,12 +36,52 @@ class TestProject(TestCase):
         self.assertEqual(6, len(coords))
         self.assertListEqual([(0.0, 0.0), (5.0, 0.0), (10.0, 0.0), (10.0, 5.0), (0.0, 5.0), (0.0, 0.0)], coords)
 
+    def test_insert_coord_on_vertex(self):
+        coords = [(0.0, 0.0), (10.0, 0.0), (10.0, 5.0), (0.0, 5.0), (0.0, 0.0)]
+        Projector._insert_into_coords(coords, (10, 1e-9), MATH_EPS)
+        self.assertEqual(5, len(coords))
+
+        # the corners of the box project onto the corners of the line, nothing is inserted
+        line = LineString([(0, 0), (0, 10)])
+        new_line = Projector(line, Vector2D(-1, 0))._insert_other_geom_projections_into_geom(
+            other_geom=box(5, 0, 6, 10), projecting_vector=Vector2D(-1, 0), geom=line)
+        self.assertListEqual([(0, 0), (0, 10)], list(new_line.coords))
+
+    def test_coincident_projections(self):
+        # the corners of the box on the same ray project onto the same point of the line
+        line = LineString([(10, 0), (10, 10)])
+        for engine in Projector.ENGINES:
+            projection = Projector(line, Vector2D(1, 0), engine=engine).project_onto(box(20, 2, 25, 5))
+            self.assertEqual(2, len(projection.coords))
+            self.assertTrue(projection.equals(LineString([(20, 2), (20, 5)])))
+
+            new_line = Projector(line, Vector2D(1, 0), engine=engine)._insert_other_geom_projections_into_geom(
+                other_geom=box(20, 2, 25, 5), projecting_vector=Vector2D(-1, 0), geom=line)
+            self.assertListEqual([(10, 0), (10, 2), (10, 5), (10, 10)], list(new_line.coords))
+
     def test_invalid_geometry_created_by_insert_coord(self):
         geom = wkt_loads("POLYGON ((1087.38777718021 587.6238258803972, 1066.990091678121 587.6238258803972, 1066.990091580104 587.6238258852126, 1066.990091483031 587.6238258996119, 1066.990091387836 587.6238259234569, 1066.990091295438 587.6238259565177, 1066.990091206724 587.623825998476, 1066.990091122551 587.6238260489276, 1066.990091043728 587.6238261073868, 1066.990090971014 587.6238261732905, 1066.990090905111 587.623826246004, 1066.990090846652 587.6238263248271, 1066.9900907962 587.6238264090005, 1066.990090754242 587.6238264977138, 1066.990090721181 587.6238265901126, 1066.990090697336 587.6238266853069, 1066.990090682936 587.6238267823801, 1066.990090678121 587.6238268803972, 1066.990090678121 615.1628893803972, 1066.990090682936 615.1628894784144, 1066.990090697336 615.1628895754876, 1066.990090721181 615.1628896706819, 1066.990090754242 615.1628897630807, 1066.9900907962 615.162889851794, 1066.990090846652 615.1628899359674, 1066.990090905111 615.1628900147905, 1066.990090971014 615.162890087504, 1066.990091043728 615.1628901534077, 1066.990091122551 615.1628902118669, 1066.990091206724 615.1628902623185, 1066.990091295438 615.1628903042767, 1066.990091387836 615.1628903373376, 1066.990091483031 615.1628903611826, 1066.990091580104 615.1628903755819, 1066.990091678121 615.1628903803972, 1087.38777718021 615.1628903803972, 1087.387777278227 615.1628903755819, 1087.3877773753 615.1628903611826, 1087.387777470495 615.1628903373376, 1087.387777562894 615.1628903042767, 1087.387777651607 615.1628902623185, 1087.38777773578 615.1628902118669, 1087.387777814603 615.1628901534077, 1087.387777887317 615.162890087504, 1087.387777953221 615.1628900147905, 1087.38777801168 615.1628899359674, 1087.387778062131 615.162889851794, 1087.38777810409 615.1628897630807, 1087.38777813715 615.1628896706819, 1087.387778160995 615.1628895754876, 1087.387778175395 615.1628894784144, 1087.38777818021 615.1628893803972, 1087.38777818021 587.6238268803972, 1087.387778175395 587.6238267823801, 1087.387778160995 587.6238266853069, 1087.38777813715 587.6238265901126, 1087.38777810409 587.6238264977138, 1087.387778062131 587.6238264090005, 1087.38777801168 587.6238263248271, 1087.387777953221 587.623826246004, 1087.387777887317 587.6238261732905, 1087.387777814603 587.6238261073868, 1087.38777773578 587.6238260489276, 1087.387777651607 587.623825998476, 1087.387777562894 587.6238259565177, 1087.387777470495 587.6238259234569, 1087.3877773753 587.6238258996119, 1087.387777278227 587.6238258852126, 1087.38777718021 587.6238258803972))")
         other_geom = wkt_loads("POLYGON ((1107.224685371296 596.8330699036721, 1097.188366375415 596.8330699036721, 1097.188366277398 596.8330699084875, 1097.188366180325 596.8330699228868, 1097.18836608513 596.8330699467318, 1097.188365992732 596.8330699797926, 1097.188365904018 596.8330700217509, 1097.188365819845 596.8330700722025, 1097.188365741022 596.8330701306617, 1097.188365668308 596.8330701965654, 1097.188365602405 596.8330702692789, 1097.188365543946 596.833070348102, 1097.188365493494 596.8330704322753, 1097.188365451536 596.8330705209887, 1097.188365418475 596.8330706133875, 1097.18836539463 596.8330707085818, 1097.18836538023 596.833070805655, 1097.188365375415 596.8330709036721, 1097.188365375415 602.9854146536721, 1097.18836538023 602.9854147516893, 1097.18836539463 602.9854148487625, 1097.188365418475 602.9854149439568, 1097.188365451536 602.9854150363556, 1097.188365493494 602.9854151250689, 1097.188365543946 602.9854152092423, 1097.188365602405 602.9854152880654, 1097.188365668308 602.9854153607789, 1097.188365741022 602.9854154266826, 1097.188365819845 602.9854154851417, 1097.188365904018 602.9854155355933, 1097.188365992732 602.9854155775516, 1097.18836608513 602.9854156106124, 1097.188366180325 602.9854156344575, 1097.188366277398 602.9854156488568, 1097.188366375415 602.9854156536721, 1107.224685371296 602.9854156536721, 1107.224685469313 602.9854156488568, 1107.224685566386 602.9854156344575, 1107.22468566158 602.9854156106124, 1107.224685753979 602.9854155775516, 1107.224685842692 602.9854155355933, 1107.224685926866 602.9854154851417, 1107.224686005689 602.9854154266826, 1107.224686078403 602.9854153607789, 1107.224686144306 602.9854152880654, 1107.224686202765 602.9854152092423, 1107.224686253217 602.9854151250689, 1107.224686295175 602.9854150363556, 1107.224686328236 602.9854149439568, 1107.224686352081 602.9854148487625, 1107.22468636648 602.9854147516893, 1107.224686371296 602.9854146536721, 1107.224686371296 596.8330709036721, 1107.22468636648 596.833070805655, 1107.224686352081 596.8330707085818, 1107.224686328236 596.8330706133875, 1107.224686295175 596.8330705209887, 1107.224686253217 596.8330704322753, 1107.224686202765 596.833070348102, 1107.224686144306 596.8330702692789, 1107.224686078403 596.8330701965654, 1107.224686005689 596.8330701306617, 1107.224685926866 596.8330700722025, 1107.224685842692 596.8330700217509, 1107.224685753979 596.8330699797926, 1107.22468566158 596.8330699467318, 1107.224685566386 596.8330699228868, 1107.224685469313 596.8330699084875, 1107.224685371296 596.8330699036721))")
-        projector = Projector(geom, None)
-        new_geom = projector._insert_other_geom_projections_into_geom(other_geom, Vector2D(-1, 0), geom)
-        self.assertTrue(new_geom.is_valid)
+        for engine in Projector.ENGINES:
+            projector = Projector(geom, None, engine=engine)
+            new_geom = projector._insert_other_geom_projections_into_geom(other_geom, Vector2D(-1, 0), geom)
+            self.assertTrue(new_geom.is_valid)
+
+    def test_insert_other_geom_projections_into_geom_with_numpy(self):
+        polygon1 = Polygon([(3.5, 1), (6, 1), (6, 3), (3.5, 3)])
+        polygon2 = Polygon([(1, 1), (3, 1), (3, 4), (4, 4), (4, 5), (0, 5),
+                            (0, 4), (1, 4), (1, 1)])
+        expected = Projector(polygon2, Vector2D(1, 0))._insert_other_geom_projections_into_geom(
+            other_geom=polygon1, projecting_vector=Vector2D(-1, 0), geom=polygon2)
+        result = Projector(polygon2, Vector2D(1, 0), engine="numpy")._insert_other_geom_projections_into_geom(
+            other_geom=polygon1, projecting_vector=Vector2D(-1, 0), geom=polygon2)
+        self.assertEqual(len(expected.exterior.coords), len(result.exterior.coords))
+        self.assertTrue(is_geom_equal(expected, result))
+
+        line = LineString([(0, 0), (10, 0)])
+        new_line = Projector(line, Vector2D(0, 1), engine="numpy")._insert_other_geom_projections_into_geom(
+            other_geom=LineString([(7, 3), (2, 3), (0, 3), (5, 3)]), projecting_vector=Vector2D(0, -1), geom=line)
+        self.assertListEqual([(0, 0), (2, 0), (5, 0), (7, 0), (10, 0)], list(new_line.coords))
 
     def test_insert_other_geom_projections_into_geom(self):
         polygon1 = Polygon([(3.5, 1), (6, 1), (6, 3), (3.5, 3)])
@@ -65,3 +107,95 @@ class TestProject(TestCase):
         ref_point = Point(0, 1)
         new_point = projector._construct_by_coords_according_to(ref_point, [(1, 0)])
         self.assertListEqual([(1, 0)], list(new_point.coords))
+
+    def test_numpy_engine_matches_python_engine(self):
+        polygon1 = Polygon([(3.5, 1), (6, 1), (6, 3), (3.5, 3)])
+        polygon2 = Polygon([(1, 1), (3, 1), (3, 4), (4, 4), (4, 5), (0, 5),
+                            (0, 4), (1, 4), (1, 1)])
+        cases = [
+            (polygon1, Vector2D(-1, 0), polygon2),
+            (polygon2, Vector2D(1, 0), polygon1),
+            (box(0, 0, 2, 2), Vector2D(0, 1), LineString([(-1, 5), (3, 6)])),
+            (Point(0, 0).buffer(1, 8), Vector2D(1, 1), box(3, 3, 5, 5)),
+            (box(0, 0, 2, 2), Vector2D(2, 0), box(1, 0.5, 5, 1.5)),
+            (box(0, 0, 2, 2), Vector2D(0, -1), box(10, 10, 11, 11)),
+            (box(0, 0, 2, 2), Vector2D(1, 0), Polygon([(5, -1, 1), (8, -1, 1), (8, 3, 1), (5, 3, 1)])),
+        ]
+        for geom, projecting_vector, other_geom in cases:
+            expected = Projector(geom, projecting_vector).project_onto(other_geom)
+            result = Projector(geom, projecting_vector, engine="numpy").project_onto(other_geom)
+            if expected is None:
+                self.assertIsNone(result)
+            else:
+                self.assertTrue(type(expected) is type(result))
+                self.assertTrue(expected.equals_exact(result, MATH_EPS))
+
+    def test_engines_agree_on_random_geometries(self):
+        # rays from the vertices inserted for the other geometry graze its coords, both engines take them as hits
+        rng = np.random.default_rng(0)
+
+        def star(center_y):
+            n = int(rng.integers(4, 40))
+            angles = (np.arange(n) + rng.uniform(0, 0.9, n)) * (2 * np.pi / n)
+            radii = rng.uniform(5, 10, n)
+            return Polygon(np.stack([radii * np.cos(angles), center_y + radii * np.sin(angles)], axis=1))
+
+        for i in range(60):
+            if i % 2:
+                geom, other_geom = star(0), translate(star(rng.uniform(-8, 8)), 30)
+            else:
+                geom = Point(0, 0).buffer(rng.uniform(5, 10), int(rng.integers(2, 16)))
+                other_geom = Point(30, rng.uniform(-8, 8)).buffer(rng.uniform(5, 10), int(rng.integers(2, 16)))
+            angle = rng.uniform(-0.3, 0.3)
+            projecting_vector = Vector2D(np.cos(angle), np.sin(angle))
+            expected = Projector(geom, projecting_vector).project_onto(other_geom)
+            result = Projector(geom, projecting_vector, engine="numpy").project_onto(other_geom)
+            if expected is None:
+                self.assertIsNone(result)
+            else:
+                self.assertLess(expected.hausdorff_distance(result), MATH_EPS)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Projector(box(0, 0, 1, 1), Vector2D(1, 0), engine="fortran")
+
+
+class TestProjectionTarget(TestCase):
+    def setUp(self):
+        self.road = LineString([(0, 10), (5, 11), (10, 10), (20, 10)])
+        self.footprints = [box(x, 0, x + 2, 3) for x in range(0, 20, 3)] + [box(30, 0, 32, 3), Point(1, 1)]
+        self.target = ProjectionTarget(self.road, Vector2D(0, 1))
+
+    def _assert_geoms_equal(self, expected_geoms, geoms):
+        self.assertEqual(len(expected_geoms), len(geoms))
+        for expected, geom in zip(expected_geoms, geoms):
+            if expected is None:
+                self.assertIsNone(geom)
+            else:
+                self.assertTrue(expected.equals_exact(geom, MATH_EPS))
+
+    def test_project_many(self):
+        expected = [Projector(footprint, Vector2D(0, 1), engine="numpy").project_onto(self.road)
+                    for footprint in self.footprints]
+        self.assertIsNone(expected[-2])
+        self.assertTrue(isinstance(expected[-1], Point))
+        self._assert_geoms_equal(expected, self.target.project_many(self.footprints))
+        self._assert_geoms_equal(expected, self.target.project_many(self.footprints, workers=2, chunksize=3))
+
+    def test_python_engine_target(self):
+        target = ProjectionTarget(self.road, Vector2D(0, 1), engine="python")
+        expected = [Projector(footprint, Vector2D(0, 1)).project_onto(self.road) for footprint in self.footprints]
+        self._assert_geoms_equal(expected, target.project_many(self.footprints))
+
+    def test_is_reachable_from(self):
+        self.assertTrue(self.target.is_reachable_from(box(0, 0, 1, 1)))
+        self.assertFalse(self.target.is_reachable_from(box(30, 0, 31, 1)))
+        self.assertFalse(self.target.is_reachable_from(box(0, 20, 1, 21)))
+
+    def test_target_of_other_parameters(self):
+        with self.assertRaises(ValueError):
+            Projector(box(0, 0, 1, 1), Vector2D(1, 0)).project_onto(self.target)
+        with self.assertRaises(ValueError):
+            Projector(box(0, 0, 1, 1), Vector2D(0, 1), max_projecting_length=5).project_onto(self.target)
+        with self.assertRaises(ValueError):
+            Projector(box(0, 0, 1, 1), Vector2D(0, 1), eps=1e-3).project_onto(self.target)
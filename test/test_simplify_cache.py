@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+from shapely.geometry import Point, LineString, LinearRing, box
+
+from shapely_ext import simplify_cache
+from shapely_ext.decompose import Decomposer
+from shapely_ext.interpolate import interpolate
+from shapely_ext.mesh import TriMesher
+
+
+class TestSimplifyCache(TestCase):
+    def tearDown(self) -> None:
+        simplify_cache.disable()
+
+    def test_disabled(self):
+        circle = Point(0, 0).buffer(1)
+        self.assertFalse(simplify_cache.is_enabled())
+        self.assertTrue(circle.simplify(0.1).equals_exact(simplify_cache.simplify(circle, 0.1), 0))
+        self.assertDictEqual({"hits": 0, "misses": 0, "entries": 0, "bytes": 0}, simplify_cache.stats())
+
+    def test_shared_between_modules(self):
+        simplify_cache.enable()
+        polygon = Point(0, 0).buffer(10)
+        expected_lines = Decomposer().decompose(polygon)
+        interpolate(polygon, 1)
+        TriMesher(interpolate_distance=1).mesh(polygon)
+        lines = Decomposer().decompose(polygon)
+        stats = simplify_cache.stats()
+        self.assertEqual(1, stats["misses"])
+        self.assertEqual(3, stats["hits"])
+        self.assertEqual(1, stats["entries"])
+        self.assertListEqual([list(line.coords) for line in expected_lines], [list(line.coords) for line in lines])
+
+        simplify_cache.simplify(polygon, 0.5)
+        self.assertEqual(2, simplify_cache.stats()["misses"])
+
+        simplify_cache.clear()
+        self.assertDictEqual({"hits": 0, "misses": 0, "entries": 0, "bytes": 0}, simplify_cache.stats())
+
+    def test_type_is_part_of_key(self):
+        simplify_cache.enable()
+        coords = [(0, 0), (1, 0), (1, 1), (0, 0)]
+        self.assertTrue(isinstance(simplify_cache.simplify(LineString(coords), 1e-6), LineString))
+        self.assertTrue(isinstance(simplify_cache.simplify(LinearRing(coords), 1e-6), LinearRing))
+        self.assertEqual(2, simplify_cache.stats()["misses"])
+
+    def test_lru_eviction_by_bytes(self):
+        boxes = [box(i, 0, i + 1, 1) for i in range(3)]
+        entry_size = 2 * len(boxes[0].wkb)
+        simplify_cache.enable(max_bytes=2 * entry_size)
+        for geom in [boxes[0], boxes[1], boxes[0], boxes[2]]:
+            simplify_cache.simplify(geom, 1e-6)
+        self.assertDictEqual({"hits": 1, "misses": 3, "entries": 2, "bytes": 2 * entry_size}, simplify_cache.stats())
+
+        # boxes[1] was the least recently used one
+        simplify_cache.simplify(boxes[0], 1e-6)
+        simplify_cache.simplify(boxes[1], 1e-6)
+        self.assertEqual(2, simplify_cache.stats()["hits"])
+        self.assertEqual(4, simplify_cache.stats()["misses"])
+
+        simplify_cache.enable(max_bytes=1)
+        simplify_cache.simplify(boxes[0], 1e-6)
+        self.assertEqual(0, simplify_cache.stats()["entries"])
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+import numpy as np
+from shapely.geometry import box, Point, LineString, Polygon, MultiPoint, GeometryCollection
+
+from shapely_ext.batch import GeometryBatch
+from shapely_ext.snap import snap_to, SnapReference
+
+
+class TestSnap(TestCase):
+    def test_snap_to(self):
+        geoms = [LineString([(0.05, 5), (5, 10.05), (20, 20)]),
+                 Point(10.02, 0.01),
+                 Polygon([(0.03, 0.03), (5, 0.01), (5, 5), (0, 5)]),
+                 MultiPoint([(3, 3), (9.99, 3)]),
+                 GeometryCollection([Point(1, -0.01)]),
+                 Polygon()]
+        snapped = snap_to(geoms, [box(0, 0, 10, 10)], 0.1)
+        self.assertTrue(snapped[0].equals(LineString([(0, 5), (5, 10), (20, 20)])))
+        self.assertTrue(snapped[1].equals(Point(10, 0)))
+        self.assertTrue(snapped[2].equals(Polygon([(0, 0), (5, 0), (5, 5), (0, 5)])))
+        self.assertTrue(snapped[3].equals(MultiPoint([(3, 3), (10, 3)])))
+        self.assertEqual("GeometryCollection", snapped[4].geom_type)
+        self.assertTrue(snapped[4].geoms[0].equals(Point(1, 0)))
+        self.assertTrue(snapped[5].is_empty)
+
+    def test_snap_to_vertex_first(self):
+        reference = [LineString([(0, 0), (10, 0)]), Point(5, 0.08)]
+        snapped = snap_to([Point(5.05, 0.01)], reference, 0.1)
+        self.assertTrue(snapped[0].equals(Point(5, 0.08)))
+        snapped = snap_to([Point(5.05, 0.01)], reference, 0.05)
+        self.assertTrue(snapped[0].equals(Point(5.05, 0)))
+
+    def test_snap_to_repairs_polygon(self):
+        # the two middle vertices meet, leaving a bow tie
+        polygon = Polygon([(0, 0), (4, 0), (2.05, 1), (1.95, 1), (0, 2)])
+        snapped = snap_to([polygon], [Point(2, 1)], 0.1)[0]
+        self.assertTrue(snapped.is_valid)
+        self.assertAlmostEqual(polygon.area, snapped.area, delta=0.2)
+
+    def test_snap_to_batch(self):
+        geoms = [box(0.01, 0.01, 5, 5), LineString([(-0.02, 2), (3, 3)])]
+        snapped = snap_to(GeometryBatch.from_geometries(geoms), [box(0, 0, 10, 10)], 0.1, chunksize=3)
+        self.assertIsInstance(snapped, GeometryBatch)
+        for snapped_geom, expected in zip(snapped, snap_to(geoms, [box(0, 0, 10, 10)], 0.1)):
+            self.assertTrue(snapped_geom.equals(expected))
+
+    def test_snap_coords(self):
+        rng = np.random.default_rng(0)
+        coords = rng.uniform(0, 20, (300, 2))
+        reference = [box(x, y, x + 1, y + 1) for x in range(0, 20, 2) for y in range(0, 20, 2)]
+        snapped = SnapReference(reference, 0.2).snap_coords(coords, chunksize=64)
+        for coord, snapped_coord in zip(coords, snapped):
+            distance = min(Point(coord).distance(geom.exterior) for geom in reference)
+            if distance <= 0.2:
+                self.assertAlmostEqual(0, min(Point(snapped_coord).distance(geom.exterior) for geom in reference))
+                self.assertLessEqual(np.hypot(*(snapped_coord - coord)), 0.2 + 1e-9)
+            else:
+                np.testing.assert_array_equal(coord, snapped_coord)
+        self.assertTupleEqual((0, 2), SnapReference([], 1).snap_coords(np.empty((0, 2))).shape)
+        np.testing.assert_array_equal(coords, SnapReference([], 1).snap_coords(coords))
@@ -1,8 +1,11 @@
 from unittest import TestCase
 
-from shapely.geometry import box, Polygon, MultiPolygon, GeometryCollection, Point
+import numpy as np
+from shapely.geometry import box, Polygon, MultiPolygon, GeometryCollection, Point, LineString
 
-from shapely_ext.util import is_similar, flatten
+from shapely_ext.batch import GeometryBatch
+from shapely_ext.util import is_similar, flatten, iter_flatten, contains_points, match_similar
+from test.util import recursion_limit_above_current
 
 
 class UtilTest(TestCase):
@@ -20,6 +23,39 @@ class UtilTest(TestCase):
         geom_col2 = GeometryCollection([geom1, geom2])
         self.assertFalse(is_similar(geom_col1, geom_col2))
         self.assertFalse(is_similar(geom_col2, geom_col1))
+        self.assertTrue(is_similar(geom_col1, GeometryCollection([geom2, geom1, Point(0, 1)])))
+
+    def test_is_similar_quick_checks(self):
+        line = LineString([(0, 0), (1, 0), (1, 1)])
+        self.assertTrue(is_similar(line, LineString([(0, 0), (1, 0), (1, 1)])))
+        self.assertTrue(is_similar(line, LineString([(1, 1), (1, 0), (0, 0)])))
+        self.assertTrue(is_similar(line, LineString([(0, 0), (1, 0), (1, 1 + 1e-7)])))
+        self.assertFalse(is_similar(line, LineString([(0, 0), (1, 0), (1, 2)])))
+        self.assertFalse(is_similar(line, LineString([(0, 0), (0, 1), (1, 1)])))
+        self.assertFalse(is_similar(line, LineString([(0, 0), (1, 0), (1, 1)]), eps=0))
+        self.assertFalse(is_similar(LineString(), LineString()))
+
+        polygon = box(0, 0, 1, 1)
+        self.assertTrue(is_similar(polygon, box(0, 0, 1, 1 + 1e-7)))
+        self.assertFalse(is_similar(polygon, box(0, 0, 1, 2)))
+        self.assertFalse(is_similar(polygon, box(0.5, 0, 1.5, 1)))
+        self.assertTrue(is_similar(Polygon(), Polygon()))
+
+    def test_match_similar(self):
+        old_geoms = [box(0, 0, 1, 1), box(2, 0, 3, 1), LineString([(5, 5), (6, 6)]), box(10, 10, 11, 11), Point(20, 20),
+                     box(0, 0, 1, 1)]
+        new_geoms = [Point(20, 20), box(0, 0, 1, 1), box(2, 0, 3, 1.5), LineString([(6, 6), (5, 5)]),
+                     box(30, 30, 31, 31), Polygon()]
+        for workers in [None, 2]:
+            changes = match_similar(old_geoms, new_geoms, workers=workers, chunksize=2)
+            self.assertListEqual([[0, 1], [2, 3], [4, 0]], sorted(changes.matched.tolist()))
+            self.assertListEqual([[1, 2]], changes.modified.tolist())
+            self.assertListEqual([4, 5], changes.added.tolist())
+            self.assertListEqual([3, 5], changes.deleted.tolist())
+
+        changes = match_similar([], new_geoms)
+        self.assertEqual((0, 2), changes.matched.shape)
+        self.assertEqual(len(new_geoms), len(changes.added))
 
     def test_flatten(self):
         polygon = box(0, 0, 1, 1)
@@ -30,4 +66,38 @@ class UtilTest(TestCase):
         geoms = GeometryCollection([MultiPolygon([box(0, 0, 1, 1)]), box(0, 0, 1, 1)])
         result2 = flatten(geoms)
         self.assertTrue(isinstance(result2, list))
-        self.assertEqual(2, len(result2))
\ No newline at end of file
+        self.assertEqual(2, len(result2))
+
+        batch = flatten(GeometryBatch.from_geometries([MultiPolygon([box(0, 0, 1, 1), box(2, 2, 3, 3)]), polygon]))
+        self.assertTrue(isinstance(batch, GeometryBatch))
+        self.assertEqual(3, len(batch))
+        self.assertTrue(box(2, 2, 3, 3).equals_exact(batch[1], 0))
+
+    def test_iter_flatten(self):
+        geoms = GeometryCollection([MultiPolygon([box(0, 0, 1, 1), box(2, 2, 3, 3)]), Point(5, 5),
+                                    GeometryCollection([LineString([(0, 0), (1, 1)])])])
+        flattened = iter_flatten(geoms)
+        self.assertTrue(isinstance(next(flattened), Polygon))
+        self.assertListEqual(["Polygon", "Point", "LineString"], [geom.geom_type for geom in flattened])
+
+        nested = box(0, 0, 1, 1)
+        for i in range(300):
+            nested = GeometryCollection([nested, Point(i, i)])
+        with recursion_limit_above_current(100):
+            flattened = flatten(nested)
+        self.assertEqual(301, len(flattened))
+        self.assertTrue(isinstance(flattened[0], Polygon))
+        self.assertListEqual([], flatten(GeometryCollection()))
+
+    def test_contains_points(self):
+        polygon = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(4, 4), (4, 6), (6, 6), (6, 4)]])
+        multi_polygon = MultiPolygon([polygon, box(20, 0, 21, 1)])
+        rng = np.random.default_rng(0)
+        points = rng.uniform(-2, 22, (500, 2))
+        for geom in [polygon, multi_polygon, Point(5, 5).buffer(3)]:
+            expected = [geom.contains(Point(point)) for point in points]
+            self.assertListEqual(expected, contains_points(geom, points).tolist())
+        self.assertEqual(0, len(contains_points(polygon, np.empty((0, 2)))))
+        self.assertListEqual([False], contains_points(Polygon(), np.array([(0, 0)])).tolist())
+        triangle_z = Polygon([(0, 0, 1), (10, 0, 1), (0, 10, 1)])
+        self.assertListEqual([True, False], contains_points(triangle_z, np.array([(1, 1), (9, 9)])).tolist())
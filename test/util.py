@@ -1,3 +1,7 @@
+import sys
+import traceback
+from contextlib import contextmanager
+
 from shapely.geometry.base import BaseGeometry
 
 from test.constant import MATH_EPS
@@ -5,3 +9,16 @@ from test.constant import MATH_EPS
 
 def is_geom_equal(geom1: BaseGeometry, geom2: BaseGeometry):
     return geom1.symmetric_difference(geom2).area < MATH_EPS
+
+
+@contextmanager
+def recursion_limit_above_current(frames: int):
+    """
+    allow only frames more nested calls, so deep inputs can be tested without building huge ones
+    """
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(traceback.extract_stack()) + frames)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(limit)